@@ -1,4 +1,3 @@
-import time
 from typing import Dict, List, Tuple, Any, Optional
 from app.input_processor import InputProcessor
 from app.category_matcher import CategoryMatcher
@@ -6,6 +5,7 @@ from app.task_planner import TaskPlanner
 from app.browser_controller import BrowserController
 from utils.ui_analyzer import UIAnalyzer
 from utils.step_executor import StepExecutor
+from app.config import Config
 
 class AutomationAgent:
     def __init__(self):
@@ -29,7 +29,8 @@ class AutomationAgent:
     
     def process_task(self, text_input: Optional[str] = None, 
                     audio_file: Optional[str] = None, 
-                    transcript_file: Optional[str] = None) -> Dict[str, Any]:
+                    transcript_file: Optional[str] = None,
+                    load_profile: Optional[str] = None) -> Dict[str, Any]:
         """
         Main method to process and execute automation tasks
         """
@@ -54,20 +55,27 @@ class AutomationAgent:
             
             # Step 4: Initialize browser if needed
             self.initialize_browser()
+            self.browser_controller.set_load_profile(load_profile or self.category_matcher.get_load_profile(category_id))
             
             # Step 5: Execute initial action
             initial_action = self.category_matcher.get_initial_action(category_id)
             execution_result = self._execute_initial_action(initial_action)
+            self.browser_controller.report_page_load()
             
             # Step 6: Execute remaining steps
             final_result = self._execute_task_steps(task_steps, processed_text)
+            final_screenshot = final_result.get("final_screenshot")
+            if Config.SCREENSHOT_POLICY == "final" or not final_screenshot:
+                final_screenshot = self.browser_controller.take_screenshot("final", event="final") or final_screenshot
+            # Screenshots are written in the background; make sure the UI can open it
+            self.browser_controller.flush_screenshots()
             
             return {
                 "status": "completed",
                 "message": f"Task executed successfully. Category: {category_info['name']} (confidence: {confidence:.2f})",
                 "category": f"{category_info['name']} ({category_id})",
                 "steps": self._format_execution_log(),
-                "screenshot": final_result.get("final_screenshot"),
+                "screenshot": final_screenshot,
                 "original_input": processed_text
             }
             
@@ -121,17 +129,22 @@ class AutomationAgent:
                 # Execute the step
                 success, message, screenshot = self.step_executor.execute_step(step, page_context)
                 
+                # Wait until the page settles instead of a fixed pause
+                settle_ms = self.browser_controller.wait_until_ready()
+                print(f"[INFO] Step settled in {settle_ms} ms")
+                
                 results.append({
                     "step": step,
                     "success": success,
                     "message": message,
-                    "screenshot": screenshot
+                    "screenshot": screenshot,
+                    "settle_ms": settle_ms,
+                    "page_load": self.browser_controller.report_page_load()
                 })
                 
-                final_screenshot = screenshot
-                
-                # Wait between steps
-                time.sleep(0.2)
+                if not success and not screenshot:
+                    screenshot = self.browser_controller.take_screenshot("step_failed", event="failure")
+                final_screenshot = screenshot or final_screenshot
                 
                 # Handle manual input scenarios
                 if not success and "manual" in message.lower():
@@ -186,7 +199,9 @@ class AutomationAgent:
         Take screenshot of current state
         """
         if self.browser_controller:
-            return self.browser_controller.take_screenshot("manual_screenshot")
+            path = self.browser_controller.take_screenshot("manual_screenshot", event="manual")
+            self.browser_controller.flush_screenshots()
+            return path
         return None
     
     def analyze_current_ui(self) -> Dict[str, Any]:
@@ -12,12 +12,25 @@ import os
 from app.config import Config
 import glob
 import utils.logger as Logger
+from utils.screenshot_writer import ScreenshotWriter
+from utils.readiness import PageReadiness
+from browser.load_profiles import LoadProfile
+from browser.profiles import ProfileManager
 
 class BrowserController:
-    def __init__(self):
+    def __init__(self, profile: str = None):
         self.driver = None
+        self.profile = profile if profile is not None else Config.BROWSER_PROFILE
         self.wait = None
         self.actions = None
+        self.readiness = None
+        self.load_profile = None
+        self.screenshot_writer = ScreenshotWriter(
+            image_format=Config.SCREENSHOT_FORMAT,
+            max_width=Config.SCREENSHOT_MAX_WIDTH,
+            quality=Config.SCREENSHOT_QUALITY,
+            queue_size=Config.SCREENSHOT_QUEUE_SIZE
+        )
         self._setup_driver()
     
     def _setup_driver(self):
@@ -39,8 +52,18 @@ class BrowserController:
         # Create screenshots directory
         os.makedirs(Config.SCREENSHOT_DIR, exist_ok=True)
         
+        # Persistent profile keeps Gmail logins and the HTTP cache between runs
+        if self.profile:
+            user_data_dir = ProfileManager.shared().acquire(self.profile)
+            chrome_options.add_argument(f"--user-data-dir={os.path.abspath(user_data_dir)}")
+        
         service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        try:
+            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        except Exception:
+            if self.profile:
+                ProfileManager.shared().release(self.profile)
+            raise
         self.driver.implicitly_wait(Config.IMPLICIT_WAIT)
         self.driver.maximize_window()
         
@@ -49,6 +72,9 @@ class BrowserController:
         
         self.wait = WebDriverWait(self.driver, Config.EXPLICIT_WAIT)
         self.actions = ActionChains(self.driver)
+        self.readiness = PageReadiness(self.driver, max_wait=Config.READINESS_MAX_WAIT)
+        self.readiness.install()
+        self.load_profile = LoadProfile(self.driver, Config.DEFAULT_LOAD_PROFILE)
     
     def open_gmail(self):
         """
@@ -98,8 +124,9 @@ class BrowserController:
                 element = self.wait.until(EC.element_to_be_clickable((By.XPATH, xpath)))
             
             if element:
-                self.driver.execute_script("arguments[0].scrollIntoView(true);", element)
-                time.sleep(0.5)
+                # Instant scroll; only wait if the scroll triggers lazy loading or animation
+                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', behavior: 'instant'});", element)
+                self.readiness.wait_until_ready(max_wait=Config.SCROLL_SETTLE_MAX_WAIT)
                 element.click()
                 return True
                 
@@ -157,6 +184,25 @@ class BrowserController:
             print(f"Search failed: {e}")
             return None
     
+    def set_load_profile(self, name: str):
+        """
+        Block resources per the named load profile for subsequent page loads
+        """
+        return self.load_profile.apply(name)
+
+    def report_page_load(self):
+        """
+        Bytes/time of the current page if it loaded since the last report (None otherwise)
+        """
+        return self.load_profile.report_page_load()
+
+    def wait_until_ready(self):
+        """
+        Wait for the page to settle; returns settle time in milliseconds
+        """
+        ready, settle_time = self.readiness.wait_until_ready()
+        return int(settle_time * 1000)
+
     def wait_for_manual_input(self, timeout: int = 60, success_indicator: str = None):
         """
         Wait for user to manually complete an action (like login)
@@ -175,16 +221,26 @@ class BrowserController:
             time.sleep(timeout)
             return True
     
-    def take_screenshot(self, name: str = None) -> str:
+    def take_screenshot(self, name: str = None, event: str = "step") -> str:
         """
-        Take screenshot and return file path
+        Grab screenshot bytes and queue them for the background writer.
+        Returns the file path, or None when SCREENSHOT_POLICY skips this event
+        ('step', 'failure', 'final' or 'manual').
         """
+        if not ScreenshotWriter.wants(event, Config.SCREENSHOT_POLICY):
+            return None
+
         if not name:
             name = f"screenshot_{int(time.time())}"
         
         screenshot_path = os.path.join(Config.SCREENSHOT_DIR, f"{name}.png")
-        self.driver.save_screenshot(screenshot_path)
-        return screenshot_path
+        return self.screenshot_writer.submit(self.driver.get_screenshot_as_png(), screenshot_path)
+    
+    def flush_screenshots(self, timeout: float = 5) -> bool:
+        """
+        Wait for queued screenshots to reach disk (before they are displayed)
+        """
+        return self.screenshot_writer.flush(timeout)
     
     def get_page_source(self) -> str:
         """
@@ -203,4 +259,7 @@ class BrowserController:
         Close browser
         """
         if self.driver:
-            self.driver.quit()
\ No newline at end of file
+            self.driver.quit()
+            self.driver = None
+            if self.profile:
+                ProfileManager.shared().release(self.profile)
\ No newline at end of file
@@ -65,4 +65,11 @@ class CategoryMatcher:
         Get the initial action for a category
         """
         category_info = self.get_category_info(category_id)
-        return category_info.get("initial_action", "open_browser")
\ No newline at end of file
+        return category_info.get("initial_action", "open_browser")
+    
+    def get_load_profile(self, category_id: str) -> str:
+        """
+        Get the resource load profile for a category
+        """
+        category_info = self.get_category_info(category_id)
+        return category_info.get("load_profile", Config.DEFAULT_LOAD_PROFILE)
@@ -7,7 +7,16 @@ class Config:
     # Browser settings
     IMPLICIT_WAIT = 10
     EXPLICIT_WAIT = 30
+    READINESS_MAX_WAIT = 2  # Hard cap (seconds) on waiting for the page to settle between steps
+    SCROLL_SETTLE_MAX_WAIT = 0.5  # Cap after scrolling an element into view
     SCREENSHOT_DIR = "screenshots"
+    BROWSER_PROFILE = None  # Persistent Chrome profile name (e.g. "app") under data/profiles to keep logins and cache; None for a blank profile each run
+    DEFAULT_LOAD_PROFILE = "full"  # 'full', 'no-media' or 'text-only'; categories may set their own
+    SCREENSHOT_POLICY = "always"  # 'always', 'on_failure' or 'final'
+    SCREENSHOT_FORMAT = "jpeg"  # 'png', 'jpeg' or 'webp'
+    SCREENSHOT_MAX_WIDTH = 1280  # None keeps full resolution
+    SCREENSHOT_QUALITY = 80
+    SCREENSHOT_QUEUE_SIZE = 16
     
     # Audio settings
     AUDIO_SAMPLE_RATE = 16000
@@ -23,35 +32,40 @@ class Config:
             "name": "Email Operations",
             "description": "Compose, send, manage emails",
             "keywords": ["email", "gmail", "compose", "send", "inbox", "mail", "message"],
-            "initial_action": "open_gmail"
+            "initial_action": "open_gmail",
+            "load_profile": "no-media"
         },
         "web": {
             "name": "Web Browsing",
             "description": "Navigate, interact with websites",
             "keywords": ["web", "browse", "website", "navigate", "search", "google", "url"],
-            "initial_action": "open_browser"
+            "initial_action": "open_browser",
+            "load_profile": "full"
         },
         "file": {
             "name": "File Operations",
             "description": "Create, edit, delete files",
             "keywords": ["file", "document", "create", "edit", "delete", "folder", "save"],
-            "initial_action": "open_file_manager"
+            "initial_action": "open_file_manager",
+            "load_profile": "full"
         },
         "app": {
             "name": "Application Control",
             "description": "Launch/control applications",
             "keywords": ["app", "application", "launch", "open", "program", "software"],
-            "initial_action": "launch_app"
+            "initial_action": "launch_app",
+            "load_profile": "full"
         },
         "search": {
             "name": "Search Operations",
             "description": "Retrieve info via search",
             "keywords": ["search", "find", "look", "query", "information", "data"],
-            "initial_action": "perform_search"
+            "initial_action": "perform_search",
+            "load_profile": "no-media"
         }
     }
     
-    # Chrome options
+    # Chrome options (not applied to the driver; resource blocking uses the load profiles above)
     CHROME_OPTIONS = [
         "--no-sandbox",
         "--disable-dev-shm-usage",
@@ -0,0 +1,79 @@
+"""Benchmark UICapturer capture modes on large synthetic pages.
+
+Usage:
+    python benchmarks/capture_benchmark.py [node_count ...]
+
+Builds a page with the requested number of DOM nodes (a mix of inputs, links,
+buttons, role/tabindex divs, hidden elements and one iframe), then times each
+UI_CAPTURE_MODE against it in headless Chrome.
+"""
+import os
+import sys
+import statistics
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from config import Config
+from gui_capturer.ui_capturer import UICapturer
+
+MODES = ['selectors', 'snapshot', 'cdp', 'incremental']
+RUNS = 5
+
+
+def build_page(node_count):
+    """Return HTML with roughly node_count elements"""
+    rows = []
+    for i in range(node_count // 5):
+        rows.append(
+            f"<div class='row'>"
+            f"<input type='text' placeholder='Field {i}'>"
+            f"<a href='#item{i}'>Item {i}</a>"
+            f"<button style='display:{'none' if i % 7 == 0 else 'inline'}'>Action {i}</button>"
+            f"<div role='button' tabindex='0' aria-label='Toggle {i}'>T</div>"
+            f"</div>"
+        )
+    frame = "<iframe srcdoc=\"<input placeholder='Inside frame'><button>Frame button</button>\"></iframe>"
+    return f"<html><body>{frame}{''.join(rows)}</body></html>"
+
+
+def create_driver():
+    options = Options()
+    options.add_argument('--headless=new')
+    options.add_argument('--window-size=1920,1080')
+    return webdriver.Chrome(options=options)
+
+
+def run(node_counts):
+    driver = create_driver()
+    try:
+        capturer = UICapturer(driver)
+        for node_count in node_counts:
+            with tempfile.NamedTemporaryFile('w', suffix='.html', delete=False) as page:
+                page.write(build_page(node_count))
+            driver.get(f"file://{page.name}")
+            total_nodes = driver.execute_script("return document.getElementsByTagName('*').length")
+            print(f"\n--- {total_nodes} DOM nodes ---")
+
+            for mode in MODES:
+                Config.UI_CAPTURE_MODE = mode
+                timings = []
+                elements = 0
+                for _ in range(RUNS):
+                    start = time.perf_counter()
+                    ui_tree = capturer.capture_ui_tree()
+                    timings.append((time.perf_counter() - start) * 1000)
+                    elements = len(ui_tree['elements'])
+                print(f"{mode:>12}: median {statistics.median(timings):9.1f} ms  "
+                      f"first {timings[0]:9.1f} ms  elements {elements}")
+            os.unlink(page.name)
+    finally:
+        driver.quit()
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [1000, 5000, 20000]
+    run(counts)
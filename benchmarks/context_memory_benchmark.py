@@ -0,0 +1,84 @@
+"""Compare memory of browser contexts vs one Chrome per task.
+
+Usage:
+    python benchmarks/context_memory_benchmark.py [task_count ...]
+
+For each task count, opens that many concurrent sessions two ways - one
+headless Chrome per task, and one Chrome hosting a browser context per task -
+loads the same page in each, and reports total and per-task RSS of the
+chromedriver + Chrome process trees. Requires psutil.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from browser.contexts import BrowserContextHost
+
+PAGE = "<html><body>" + "".join(
+    f"<div><input placeholder='Field {i}'><a href='#{i}'>Link {i}</a></div>" for i in range(500)
+) + "</body></html>"
+
+
+def create_driver():
+    options = Options()
+    options.add_argument('--headless=new')
+    options.add_argument('--window-size=1920,1080')
+    return webdriver.Chrome(options=options)
+
+
+def tree_rss(driver):
+    """RSS in bytes of chromedriver and every process it started"""
+    root = psutil.Process(driver.service.process.pid)
+    total = 0
+    for process in [root] + root.children(recursive=True):
+        try:
+            total += process.memory_info().rss
+        except psutil.NoSuchProcess:
+            pass
+    return total
+
+
+def process_per_task(task_count, url):
+    drivers = [create_driver() for _ in range(task_count)]
+    try:
+        for driver in drivers:
+            driver.get(url)
+        return sum(tree_rss(driver) for driver in drivers)
+    finally:
+        for driver in drivers:
+            driver.quit()
+
+
+def context_per_task(task_count, url):
+    host = BrowserContextHost(create_driver())
+    try:
+        contexts = [host.new_context() for _ in range(task_count)]
+        for context in contexts:
+            context.get(url)
+        return tree_rss(host.driver)
+    finally:
+        host.quit()
+
+
+def run(task_counts):
+    with tempfile.NamedTemporaryFile('w', suffix='.html', delete=False) as page:
+        page.write(PAGE)
+    url = f"file://{page.name}"
+    try:
+        for task_count in task_counts:
+            print(f"\n--- {task_count} concurrent tasks ---")
+            for name, measure in (("process per task", process_per_task), ("context per task", context_per_task)):
+                rss = measure(task_count, url) / (1024 * 1024)
+                print(f"{name:>17}: total {rss:8.0f} MB  per task {rss / task_count:7.0f} MB")
+    finally:
+        os.unlink(page.name)
+
+
+if __name__ == "__main__":
+    counts = [int(arg) for arg in sys.argv[1:]] or [1, 4, 8]
+    run(counts)
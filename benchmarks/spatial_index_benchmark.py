@@ -0,0 +1,88 @@
+"""Benchmark SpatialIndex hit testing against a linear scan.
+
+Usage:
+    python benchmarks/spatial_index_benchmark.py [rect_count ...]
+
+Generates random element rectangles on a 1920x10000 page (a long scrolled
+document), then times point-in-rect and nearest-element queries through the
+grid index and through a brute-force scan, checking both agree.
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gui_capturer.spatial_index import SpatialIndex
+
+PAGE_WIDTH, PAGE_HEIGHT = 1920, 10000
+QUERIES = 1000
+
+
+def random_elements(count, rng):
+    elements = []
+    for i in range(count):
+        width, height = rng.randint(20, 300), rng.randint(10, 60)
+        x, y = rng.randint(0, PAGE_WIDTH - width), rng.randint(0, PAGE_HEIGHT - height)
+        elements.append({
+            "label": f"element {i}",
+            "bounds": [x, y, width, height],
+            "coordinates": [x + width // 2, y + height // 2],
+            "z": rng.choice([0, 0, 0, 1, 10])
+        })
+    return elements
+
+
+def linear_element_at(elements, x, y):
+    best = None
+    for order, element in enumerate(elements):
+        ex, ey, width, height = element["bounds"]
+        if ex <= x <= ex + width and ey <= y <= ey + height:
+            if best is None or (element["z"], order) > best[0]:
+                best = ((element["z"], order), element)
+    return best[1] if best else None
+
+
+def linear_nearest(elements, x, y):
+    best = None
+    for order, element in enumerate(elements):
+        ex, ey, width, height = element["bounds"]
+        dx = max(ex - x, 0, x - (ex + width))
+        dy = max(ey - y, 0, y - (ey + height))
+        key = (dx * dx + dy * dy, -element["z"], -order)
+        if best is None or key < best[0]:
+            best = (key, element)
+    return best[1]
+
+
+def timed(label, fn, points):
+    start = time.perf_counter()
+    results = [fn(x, y) for x, y in points]
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<22} {elapsed * 1000:9.1f} ms total  {elapsed / len(points) * 1e6:8.1f} us/query")
+    return results
+
+
+def run(counts):
+    rng = random.Random(42)
+    for count in counts:
+        elements = random_elements(count, rng)
+        points = [(rng.uniform(0, PAGE_WIDTH), rng.uniform(0, PAGE_HEIGHT)) for _ in range(QUERIES)]
+
+        start = time.perf_counter()
+        index = SpatialIndex(elements)
+        print(f"\n--- {count} rects (build {(time.perf_counter() - start) * 1000:.1f} ms) ---")
+
+        grid_hits = timed("index element_at", index.element_at, points)
+        scan_hits = timed("linear element_at", lambda x, y: linear_element_at(elements, x, y), points)
+        grid_near = timed("index nearest", index.nearest, points)
+        scan_near = timed("linear nearest", lambda x, y: linear_nearest(elements, x, y), points)
+
+        assert grid_hits == scan_hits, "element_at mismatch"
+        assert grid_near == scan_near, "nearest mismatch"
+        print("  results match linear scan")
+
+
+if __name__ == "__main__":
+    run([int(arg) for arg in sys.argv[1:]] or [1000, 5000, 20000])
@@ -0,0 +1,224 @@
+import threading
+import time
+from contextlib import contextmanager
+from config import Config
+from utils.logger import Logger
+from browser.driver_factory import create_driver, prepare_target, resolve_chromedriver_path
+
+# A flag on the document being navigated away from: the new document has not replaced it while it is set
+MARK_NAVIGATING_SCRIPT = "window.__shizaNavigating = true;"
+LOADED_SCRIPT = "return !window.__shizaNavigating && document.readyState === 'complete';"
+
+
+class BrowserContextHost:
+    """One Chrome instance hosting isolated browser contexts (separate cookies and storage).
+
+    A WebDriver session executes one command at a time against its current
+    window, so the host serializes access with a lock and switches windows on
+    behalf of the ContextDriver that holds it.
+    """
+
+    def __init__(self, driver):
+        self.logger = Logger()
+        self.driver = driver
+        self.lock = threading.RLock()
+        self.active_handle = driver.current_window_handle
+        self.home_handle = self.active_handle
+
+    def new_context(self):
+        """Create a browser context with one tab; returns its ContextDriver"""
+        with self.lock:
+            context_id = self.driver.execute_cdp_cmd(
+                'Target.createBrowserContext', {'disposeOnDetach': False}
+            )['browserContextId']
+            target_id = self.driver.execute_cdp_cmd('Target.createTarget', {
+                'url': 'about:blank', 'browserContextId': context_id, 'newWindow': True
+            })['targetId']
+            handle = self._handle_for_target(target_id)
+            self._switch(handle)
+            prepare_target(self.driver)
+        self.logger.log(f"BrowserContextHost: Created context {context_id}.")
+        return ContextDriver(self, context_id, handle)
+
+    def dispose(self, context_driver):
+        """Close a context's tab and drop its cookies and storage"""
+        with self.lock:
+            try:
+                self.driver.execute_cdp_cmd('Target.disposeBrowserContext',
+                                            {'browserContextId': context_driver.browser_context_id})
+            except Exception as e:
+                self.logger.log(f"BrowserContextHost: Could not dispose context: {e}")
+            if self.active_handle == context_driver.window_handle:
+                self._switch(self.home_handle)
+
+    def activate(self, handle):
+        """Make handle the window WebDriver commands go to (caller holds the lock)"""
+        if self.active_handle != handle:
+            self._switch(handle)
+
+    def alive(self):
+        """False when the browser or its chromedriver no longer answers"""
+        try:
+            with self.lock:
+                self.driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    def quit(self):
+        with self.lock:
+            self.driver.quit()
+
+    def _switch(self, handle):
+        self.driver.switch_to.window(handle)
+        self.active_handle = handle
+
+    def _handle_for_target(self, target_id):
+        # chromedriver uses the DevTools target id as window handle; the new
+        # tab may take a moment to show up in window_handles
+        deadline = time.monotonic() + Config.EXPLICIT_WAIT
+        while True:
+            for handle in self.driver.window_handles:
+                if handle == target_id or handle.endswith(target_id):
+                    return handle
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Tab for target {target_id} did not appear in window handles")
+            time.sleep(0.05)
+
+
+class ContextDriver:
+    """Driver facade bound to one browser context's tab.
+
+    Attribute access and method calls are forwarded to the host's WebDriver
+    after switching to this context's tab, under the host lock, so UICapturer
+    and ActionExecutor can use it like a driver. WebElements talk to the real
+    driver directly: wrap sequences that act on elements in exclusive().
+    get() and refresh() hold the lock only to start the navigation and poll for
+    the load between commands, so a page load never blocks other contexts.
+    """
+
+    def __init__(self, host, browser_context_id, window_handle):
+        self._host = host
+        self.browser_context_id = browser_context_id
+        self.window_handle = window_handle
+
+    @contextmanager
+    def exclusive(self):
+        """Hold this context's tab active for a sequence of commands"""
+        with self._host.lock:
+            self._host.activate(self.window_handle)
+            yield self
+
+    def quit(self):
+        self._host.dispose(self)
+
+    def get(self, url):
+        self._navigate('Page.navigate', {'url': url})
+
+    def refresh(self):
+        self._navigate('Page.reload', {})
+
+    def _navigate(self, command, params):
+        """Start a navigation of this tab over CDP, then wait for the new document to load"""
+        driver = self._host.driver
+        with self.exclusive():
+            driver.execute_script(MARK_NAVIGATING_SCRIPT)
+            result = driver.execute_cdp_cmd(command, params) or {}
+        if command == 'Page.navigate' and not result.get('loaderId'):
+            return  # same-document navigation (fragment change): nothing to load
+        deadline = time.monotonic() + Config.CONTEXT_NAVIGATION_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                if self.execute_script(LOADED_SCRIPT):
+                    return
+            except Exception:
+                pass  # document is being replaced
+            time.sleep(Config.READINESS_POLL_INTERVAL)
+        self._host.logger.log(f"ContextDriver: Page not loaded after {Config.CONTEXT_NAVIGATION_TIMEOUT}s "
+                              f"({command} {params}).")
+
+    def __getattr__(self, name):
+        driver = self._host.driver
+        if isinstance(getattr(type(driver), name, None), property):
+            # current_url, title, page_source, ... depend on the active tab
+            with self.exclusive():
+                return getattr(driver, name)
+        value = getattr(driver, name)
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            with self.exclusive():
+                return value(*args, **kwargs)
+        return call
+
+
+class ContextPool:
+    """BrowserPool counterpart for EXECUTION_MODE 'contexts'.
+
+    One warm Chrome instance serves every task; checkout() creates a fresh
+    browser context (nothing to reset, it starts empty) and release()
+    disposes of it. A host that has died is relaunched on the next checkout.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self.logger = Logger()
+        self.host = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def warm(self, background=True):
+        """Launch the host browser"""
+        if background:
+            threading.Thread(target=self.warm, args=(False,), name="ContextPoolWarm", daemon=True).start()
+            return
+        try:
+            self._ensure_host()
+        except Exception as e:
+            self.logger.log(f"ContextPool: Could not launch host browser: {e}")
+
+    def checkout(self, timeout=None):
+        host = self._ensure_host()
+        try:
+            return host.new_context()
+        except Exception as e:
+            if host.alive():
+                raise
+            self.logger.log(f"ContextPool: Host browser is gone ({e}); relaunching.")
+            self._discard_host(host)
+            return self._ensure_host().new_context()
+
+    def release(self, driver):
+        driver.quit()
+
+    def close(self):
+        with self._lock:
+            if self.host:
+                self.host.quit()
+                self.host = None
+
+    def _discard_host(self, host):
+        with self._lock:
+            if self.host is host:
+                self.host = None
+        try:
+            host.driver.quit()  # stop the chromedriver process if it is still around
+        except Exception:
+            pass
+
+    def _ensure_host(self):
+        with self._lock:
+            if self.host is None:
+                start = time.time()
+                self.host = BrowserContextHost(create_driver(resolve_chromedriver_path(self.logger)))
+                self.logger.log(f"ContextPool: Launched host browser in {time.time() - start:.1f}s.")
+            return self.host
@@ -0,0 +1,167 @@
+import os
+import glob
+import json
+import re
+import subprocess
+import sys
+from config import Config
+from utils.logger import Logger
+from utils.readiness import PageReadiness
+
+# selenium and webdriver_manager are imported inside the functions below so that
+# importing this module (at startup, via the browser pool) stays cheap.
+
+CHROME_VERSION_COMMANDS = [
+    ['google-chrome', '--version'],
+    ['google-chrome-stable', '--version'],
+    ['chromium', '--version'],
+    ['chromium-browser', '--version'],
+    ['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome', '--version'],
+]
+
+
+def installed_chrome_version():
+    """Installed Chrome version string without launching the browser, or None if unknown"""
+    if sys.platform.startswith('win'):
+        try:
+            import winreg
+            for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+                try:
+                    with winreg.OpenKey(root, r"Software\Google\Chrome\BLBeacon") as key:
+                        return winreg.QueryValueEx(key, 'version')[0]
+                except OSError:
+                    continue
+        except ImportError:
+            pass
+        return None
+    for command in CHROME_VERSION_COMMANDS:
+        try:
+            output = subprocess.run(command, capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r'\d+(\.\d+)+', output)
+        if match:
+            return match.group(0)
+    return None
+
+
+def _driver_fingerprint(driver_path, chrome_version):
+    stat = os.stat(driver_path)
+    return {"chrome_version": chrome_version, "size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+
+def _cached_chromedriver_path(chrome_version):
+    """Path from CHROMEDRIVER_CACHE_PATH if the binary and the installed Chrome are unchanged"""
+    try:
+        with open(Config.CHROMEDRIVER_CACHE_PATH, 'r') as f:
+            cached = json.load(f)
+        if cached["fingerprint"] == _driver_fingerprint(cached["path"], chrome_version):
+            return cached["path"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _store_chromedriver_path(driver_path, chrome_version, logger):
+    try:
+        os.makedirs(os.path.dirname(Config.CHROMEDRIVER_CACHE_PATH), exist_ok=True)
+        temp_path = f"{Config.CHROMEDRIVER_CACHE_PATH}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump({"path": driver_path, "fingerprint": _driver_fingerprint(driver_path, chrome_version)}, f, indent=1)
+        os.replace(temp_path, Config.CHROMEDRIVER_CACHE_PATH)
+    except Exception as e:
+        logger.log(f"Could not cache ChromeDriver path: {e}")
+
+
+def resolve_chromedriver_path(logger=None):
+    """Locate the chromedriver binary: cached path when still valid, webdriver_manager otherwise"""
+    logger = logger or Logger()
+
+    chrome_version = installed_chrome_version()
+    cached_path = _cached_chromedriver_path(chrome_version)
+    if cached_path:
+        logger.log(f"Using cached ChromeDriver path: {cached_path} (Chrome {chrome_version or 'version unknown'})")
+        return cached_path
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    # --- CRITICAL FIX START: Robust ChromeDriver Path Finding (Copied from Executor) ---
+    logger.log("Main Agent: Attempting to install/locate ChromeDriver...")
+    driver_candidate_path = ChromeDriverManager().install()
+
+    actual_driver_path = None
+
+    if not driver_candidate_path.lower().endswith('.exe'):
+        logger.log(f"Main Agent: WebDriverManager returned an unexpected path: {driver_candidate_path}")
+
+        found_exe = glob.glob(os.path.join(driver_candidate_path, 'chromedriver.exe'))
+
+        if not found_exe:
+            parent_dir = os.path.dirname(driver_candidate_path)
+            found_exe = glob.glob(os.path.join(parent_dir, 'chromedriver.exe'))
+
+        if found_exe:
+            actual_driver_path = found_exe[0]
+            logger.log(f"Main Agent: Corrected ChromeDriver path to: {actual_driver_path}")
+        else:
+            raise FileNotFoundError(
+                f"Main Agent: Could not find 'chromedriver.exe' after webdriver_manager install. "
+                f"WebDriverManager returned: {driver_candidate_path}"
+            )
+    else:
+        actual_driver_path = driver_candidate_path
+        logger.log(f"Main Agent: WebDriverManager returned a direct path to chromedriver.exe: {actual_driver_path}")
+
+    logger.log(f"Main Agent: Final ChromeDriver path used: {actual_driver_path}")
+    # --- CRITICAL FIX END ---
+    _store_chromedriver_path(actual_driver_path, chrome_version, logger)
+    return actual_driver_path
+
+
+def build_chrome_options(user_data_dir=None):
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    if user_data_dir:
+        # Persistent profile (cookies, logins, HTTP cache); see browser/profiles.py
+        chrome_options.add_argument(f"--user-data-dir={os.path.abspath(user_data_dir)}")
+    if Config.REPLAY_PROXY_MODE:
+        from browser.replay_proxy import ReplayProxy
+        for argument in ReplayProxy.shared().chrome_arguments():
+            chrome_options.add_argument(argument)
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    chrome_options.add_experimental_option('useAutomationExtension', False)
+
+    if Config.CHROME_HEADLESS:
+        chrome_options.add_argument('--headless=new')
+        chrome_options.add_argument('--window-size=1920,1080')
+    else:
+        # For non-headless, ensure the window starts maximized
+        chrome_options.add_argument('--start-maximized')
+    return chrome_options
+
+
+def create_driver(driver_path=None, user_data_dir=None):
+    """Launch a configured Chrome session (no page loaded yet); user_data_dir makes it persistent"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+
+    logger = Logger()
+    os.makedirs(Config.SCREENSHOTS_DIR, exist_ok=True)
+
+    service = Service(executable_path=driver_path or resolve_chromedriver_path(logger))
+    driver = webdriver.Chrome(service=service, options=build_chrome_options(user_data_dir))
+    driver.implicitly_wait(Config.IMPLICIT_WAIT)
+
+    prepare_target(driver)
+    return driver
+
+
+def prepare_target(driver):
+    """Per-tab setup for the driver's current window (also used for new browser-context tabs)"""
+    # Hide webdriver property
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+
+    # Track network/DOM activity from the first request of every page, for readiness waits
+    PageReadiness(driver).install()
@@ -0,0 +1,209 @@
+import threading
+import weakref
+from urllib.parse import urlparse
+from utils.logger import Logger
+
+# CDP Network.ResourceType values; matched by the request's type, not its URL
+MEDIA_TYPES = ['Image', 'Media', 'Font']
+
+# URL suffix guesses at the same types, used only when request interception is unavailable:
+# they over-match (a query string or script URL containing '.png') and miss extensionless endpoints
+IMAGE_PATTERNS = ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*', '*.bmp*']
+MEDIA_PATTERNS = ['*.mp4*', '*.webm*', '*.ogg*', '*.mp3*', '*.wav*', '*.m4a*', '*.m3u8*']
+FONT_PATTERNS = ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*']
+TRACKER_PATTERNS = [
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*googlesyndication.com*',
+    '*facebook.net*', '*connect.facebook.com*', '*hotjar.com*', '*segment.io*', '*scorecardresearch.com*',
+]
+
+FALLBACK_PATTERNS = {'Image': IMAGE_PATTERNS, 'Media': MEDIA_PATTERNS, 'Font': FONT_PATTERNS, 'Stylesheet': ['*.css*']}
+
+# Profile name -> resource types failed by ResourceTypeBlocker, and URL patterns (tracker hosts)
+# blocked with Network.setBlockedURLs ('*' is a wildcard).
+# text-only also drops stylesheets: faster, but visibility checks then see unstyled pages.
+LOAD_PROFILES = {
+    'full': {'resource_types': [], 'urls': []},
+    'no-media': {'resource_types': MEDIA_TYPES, 'urls': TRACKER_PATTERNS},
+    'text-only': {'resource_types': MEDIA_TYPES + ['Stylesheet'], 'urls': TRACKER_PATTERNS},
+}
+
+# Transfer size and load time of the current document, from the Navigation/Resource Timing APIs
+PAGE_LOAD_STATS_SCRIPT = r"""
+var nav = performance.getEntriesByType('navigation')[0];
+if (!nav || !nav.loadEventEnd) return null;
+var bytes = nav.transferSize || 0;
+var resources = performance.getEntriesByType('resource');
+for (var i = 0; i < resources.length; i++) bytes += resources[i].transferSize || 0;
+return {timeOrigin: performance.timeOrigin, bytes: bytes, loadMs: nav.loadEventEnd, requests: resources.length + 1};
+"""
+
+
+class ResourceTypeBlocker:
+    """Fails requests of given resource types in one tab through CDP Fetch interception.
+
+    Fetch.enable pauses only requests whose type matches, and each paused
+    request has to be answered, which takes a CDP event stream that
+    execute_cdp_cmd cannot receive. A daemon thread therefore holds its own
+    DevTools session to the tab (selenium's trio-based CDP client) and fails
+    every paused request with BlockedByClient. Interception ends with that
+    session, so a dead thread or closed tab never leaves requests hanging.
+    """
+
+    START_TIMEOUT = 5
+
+    def __init__(self, driver_instance, resource_types):
+        self.logger = Logger()
+        self.driver = driver_instance
+        self.resource_types = list(resource_types)
+        self.error = None
+        self._ready = threading.Event()
+        self._cancel_scope = None
+        self._trio_token = None
+
+    def start(self):
+        """Attach and enable interception before returning (so the next page load is covered); True on success"""
+        version, ws_url = self.driver._get_cdp_details()
+        # chromedriver window handles are the DevTools target id (older releases prefix it with 'CDwindow-')
+        target_id = self.driver.current_window_handle.split('CDwindow-')[-1]
+        threading.Thread(target=self._run, args=(version, ws_url, target_id),
+                         name="ResourceTypeBlocker", daemon=True).start()
+        if not self._ready.wait(self.START_TIMEOUT):
+            self.error = self.error or TimeoutError("Fetch interception did not start")
+        if self.error:
+            self.stop()
+            raise self.error
+        return True
+
+    def stop(self):
+        try:
+            import trio
+            trio.from_thread.run_sync(self._cancel_scope.cancel, trio_token=self._trio_token)
+        except Exception:
+            pass  # not started, or already ended with its session
+
+    def _run(self, version, ws_url, target_id):
+        import trio
+        try:
+            trio.run(self._intercept, version, ws_url, target_id)
+        except Exception as e:
+            self.error = e
+            if self._ready.is_set():
+                self.logger.log(f" LoadProfile: Resource blocking stopped: {e}")
+        finally:
+            self._ready.set()
+
+    async def _intercept(self, version, ws_url, target_id):
+        import trio
+        from selenium.webdriver.common.bidi.cdp import import_devtools, open_cdp
+
+        devtools = import_devtools(version)
+        types = [devtools.network.ResourceType(name) for name in self.resource_types]
+        with trio.CancelScope() as self._cancel_scope:
+            self._trio_token = trio.lowlevel.current_trio_token()
+            async with open_cdp(ws_url) as connection:
+                async with connection.open_session(target_id) as session:
+                    paused = session.listen(devtools.fetch.RequestPaused, buffer_size=256)
+                    await session.execute(devtools.fetch.enable(patterns=[
+                        devtools.fetch.RequestPattern(url_pattern='*', resource_type=resource_type,
+                                                      request_stage=devtools.fetch.RequestStage.REQUEST)
+                        for resource_type in types
+                    ]))
+                    self._ready.set()
+                    async for event in paused:
+                        if event.resource_type in types:
+                            await session.execute(devtools.fetch.fail_request(
+                                event.request_id, devtools.network.ErrorReason.BLOCKED_BY_CLIENT))
+                        else:
+                            await session.execute(devtools.fetch.continue_request(event.request_id))
+
+
+class LoadProfile:
+    """Blocks resource types and tracker URLs for a driver and reports what page loads cost.
+
+    Resource types are blocked by a ResourceTypeBlocker; when interception is
+    unavailable the profile falls back to URL suffix patterns. Savings are
+    measured against a per-host baseline: the average of loads of that host
+    under the 'full' profile, shared by every LoadProfile in the process.
+    """
+
+    _baselines = {}  # host -> [loads, total bytes, total load ms] under 'full'
+    _baselines_lock = threading.Lock()
+    _blockers = weakref.WeakKeyDictionary()  # driver -> its running ResourceTypeBlocker (one per tab at a time)
+    _blockers_lock = threading.Lock()
+
+    def __init__(self, driver_instance, name='full'):
+        self.logger = Logger()
+        self.driver = driver_instance
+        self.name = None
+        self._last_time_origin = None
+        self.apply(name)
+
+    def apply(self, name):
+        """Switch to the named profile; unknown names fall back to 'full'"""
+        if name not in LOAD_PROFILES:
+            self.logger.log(f" LoadProfile: Unknown profile '{name}', using 'full'.")
+            name = 'full'
+        profile = LOAD_PROFILES[name]
+        urls = list(profile['urls'])
+        if not self._block_resource_types(profile['resource_types']):
+            for resource_type in profile['resource_types']:
+                urls.extend(FALLBACK_PATTERNS[resource_type])
+        try:
+            self.driver.execute_cdp_cmd('Network.enable', {})
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': urls})
+            self.name = name
+        except Exception as e:
+            self.logger.log(f" LoadProfile: Could not apply '{name}' (CDP unavailable?): {e}")
+            self._block_resource_types([])
+            self.name = 'full'
+        return self.name
+
+    def _block_resource_types(self, resource_types):
+        """Replace the driver's running blocker; False when interception could not start"""
+        with self._blockers_lock:
+            previous = self._blockers.pop(self.driver, None)
+            if previous:
+                previous.stop()
+            if not resource_types:
+                return True
+            blocker = ResourceTypeBlocker(self.driver, resource_types)
+            try:
+                blocker.start()
+            except Exception as e:
+                self.logger.log(f" LoadProfile: Request interception unavailable, blocking by URL suffix instead: {e}")
+                return False
+            self._blockers[self.driver] = blocker
+            return True
+
+    def report_page_load(self):
+        """Log bytes and time of the current document if it loaded since the last report; returns the stats"""
+        try:
+            stats = self.driver.execute_script(PAGE_LOAD_STATS_SCRIPT)
+            host = urlparse(self.driver.current_url).netloc
+        except Exception:
+            return None
+        if not stats or stats['timeOrigin'] == self._last_time_origin:
+            return None
+        self._last_time_origin = stats['timeOrigin']
+        stats['host'] = host
+        stats['profile'] = self.name
+
+        with self._baselines_lock:
+            baseline = self._baselines.setdefault(host, [0, 0, 0.0])
+            if self.name == 'full':
+                baseline[0] += 1
+                baseline[1] += stats['bytes']
+                baseline[2] += stats['loadMs']
+            loads, total_bytes, total_ms = baseline
+
+        message = (f" Page load {host} [{self.name}]: {stats['bytes'] / 1024:.0f} KB, "
+                   f"{stats['requests']} requests, {stats['loadMs']:.0f} ms")
+        if self.name != 'full' and loads:
+            stats['bytes_saved'] = total_bytes / loads - stats['bytes']
+            stats['ms_saved'] = total_ms / loads - stats['loadMs']
+            message += (f"; saved {stats['bytes_saved'] / 1024:.0f} KB and {stats['ms_saved']:.0f} ms "
+                        f"vs 'full' average of {loads} load(s)")
+        elif self.name != 'full':
+            message += "; no 'full' baseline for this host yet"
+        self.logger.log(message)
+        return stats
@@ -0,0 +1,226 @@
+import queue
+import threading
+import time
+from urllib.parse import urlparse
+from config import Config
+from utils.logger import Logger
+from browser.driver_factory import create_driver, prepare_target, resolve_chromedriver_path
+
+
+class BrowserPoolError(Exception):
+    """Raised when no session can be checked out (launches failing or all sessions busy)"""
+
+
+class PooledSession:
+    """A pooled driver plus the bookkeeping used to decide when to recycle it"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.tasks = 0
+
+
+class BrowserPool:
+    """Pre-launched Chrome sessions shared across tasks.
+
+    checkout() hands out a warm session that has been reset (cookies, storage
+    and extra windows cleared, parked on about:blank); release() returns it.
+    Storage is cleared for every origin the task's tabs navigated to or framed,
+    and the task's tabs are replaced by a fresh one so no sessionStorage survives.
+    A session is recycled (quit and replaced) after BROWSER_MAX_TASKS_PER_SESSION
+    tasks or once its JS heap exceeds BROWSER_MAX_HEAP_MB.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, size=None):
+        self.logger = Logger()
+        self.size = size or Config.BROWSER_POOL_SIZE
+        self.idle = queue.LifoQueue()  # most recently used first: its caches are warmest
+        self.sessions = {}  # id(driver) -> PooledSession, checked out or idle
+        self.driver_path = None
+        self.last_launch_error = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def warm(self, background=True):
+        """Launch sessions until the pool is full"""
+        if background:
+            threading.Thread(target=self.warm, args=(False,), name="BrowserPoolWarm", daemon=True).start()
+            return
+        while True:
+            session = self._grow()
+            if session is None:
+                return
+            self.idle.put(session)
+
+    def checkout(self, timeout=None):
+        """Warm, reset driver for one task; launches one if the pool is not full yet"""
+        try:
+            session = self.idle.get_nowait()
+        except queue.Empty:
+            session = self._grow() or self._wait_for_idle(timeout or Config.BROWSER_POOL_CHECKOUT_TIMEOUT)
+        session.tasks += 1
+        self.logger.log(f"BrowserPool: Checked out session (task {session.tasks}, {self.idle.qsize()} idle).")
+        return session.driver
+
+    def _wait_for_idle(self, timeout):
+        with self._lock:
+            nothing_to_wait_for = not self.sessions
+        if nothing_to_wait_for and self.last_launch_error is not None:
+            # No session exists and none could be launched: waiting would only burn the timeout
+            raise BrowserPoolError(f"Could not launch a browser session: {self.last_launch_error}")
+        try:
+            return self.idle.get(timeout=timeout)
+        except queue.Empty:
+            detail = f"; last launch failed: {self.last_launch_error}" if self.last_launch_error else ""
+            raise BrowserPoolError(
+                f"No browser session became free within {timeout}s ({len(self.sessions)} of {self.size} in use{detail})"
+            ) from None
+
+    def release(self, driver):
+        """Return a driver after a task; it is reset, or recycled when worn out"""
+        with self._lock:
+            session = self.sessions.get(id(driver))
+        if session is None:
+            driver.quit()
+            return
+
+        reason = self._recycle_reason(session)
+        if reason is None and not self._reset(driver):
+            reason = "reset failed"
+        if reason:
+            self.logger.log(f"BrowserPool: Recycling session after {session.tasks} tasks ({reason}).")
+            self._discard(session)
+            if not self._closed:
+                self.warm()
+            return
+        self.idle.put(session)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._discard(self.idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def _grow(self):
+        """Launch one more session if the pool has room; returns it, or None"""
+        with self._lock:
+            if self._closed or len(self.sessions) >= self.size:
+                return None
+            # Reserve the slot so concurrent launches do not overfill the pool
+            placeholder = object()
+            self.sessions[id(placeholder)] = None
+        session = None
+        try:
+            session = self._launch()
+        finally:
+            with self._lock:
+                del self.sessions[id(placeholder)]
+                if session is not None:
+                    self.sessions[id(session.driver)] = session
+        return session
+
+    def _launch(self):
+        try:
+            if self.driver_path is None:
+                self.driver_path = resolve_chromedriver_path(self.logger)
+            start = time.time()
+            session = PooledSession(create_driver(self.driver_path))
+            self.logger.log(f"BrowserPool: Launched session in {time.time() - start:.1f}s.")
+            self.last_launch_error = None
+            return session
+        except Exception as e:
+            self.logger.log(f"BrowserPool: Could not launch session: {e}")
+            self.last_launch_error = e
+            return None
+
+    def _discard(self, session):
+        with self._lock:
+            self.sessions.pop(id(session.driver), None)
+        try:
+            session.driver.quit()
+        except Exception:
+            pass
+
+    def _recycle_reason(self, session):
+        if session.tasks >= Config.BROWSER_MAX_TASKS_PER_SESSION:
+            return f"task limit {Config.BROWSER_MAX_TASKS_PER_SESSION}"
+        heap_mb = self._heap_mb(session.driver)
+        if heap_mb is not None and heap_mb > Config.BROWSER_MAX_HEAP_MB:
+            return f"JS heap {heap_mb:.0f} MB > {Config.BROWSER_MAX_HEAP_MB} MB"
+        return None
+
+    def _heap_mb(self, driver):
+        """Used JS heap of the current page in MB via CDP, or None when unavailable"""
+        try:
+            driver.execute_cdp_cmd('Performance.enable', {})
+            metrics = driver.execute_cdp_cmd('Performance.getMetrics', {})['metrics']
+        except Exception:
+            return None
+        for metric in metrics:
+            if metric['name'] == 'JSHeapUsedSize':
+                return metric['value'] / (1024 * 1024)
+        return None
+
+    def _reset(self, driver):
+        """Clear cookies and storage, replace the task's windows with one blank tab"""
+        try:
+            old_handles = driver.window_handles
+            origins = set()
+            for handle in old_handles:
+                driver.switch_to.window(handle)
+                origins |= self._visited_origins(driver)
+
+            # sessionStorage lives with the tab: closing every task tab drops it for all origins
+            driver.switch_to.new_window('tab')
+            fresh = driver.current_window_handle
+            for handle in old_handles:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(fresh)
+            prepare_target(driver)
+
+            for origin in origins:
+                driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+            try:
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            except Exception:
+                driver.delete_all_cookies()
+            return True
+        except Exception as e:
+            self.logger.log(f"BrowserPool: Session reset failed: {e}")
+            return False
+
+    def _visited_origins(self, driver):
+        """http(s) origins in the active tab's navigation history and current frame tree"""
+        urls = []
+        try:
+            history = driver.execute_cdp_cmd('Page.getNavigationHistory', {})
+            urls.extend(entry['url'] for entry in history.get('entries', []))
+        except Exception:
+            urls.append(driver.current_url)
+        try:
+            frames = [driver.execute_cdp_cmd('Page.getFrameTree', {})['frameTree']]
+            while frames:
+                node = frames.pop()
+                urls.append(node['frame'].get('url', ''))
+                frames.extend(node.get('childFrames', []))
+        except Exception:
+            pass
+        origins = set()
+        for url in urls:
+            parsed = urlparse(url)
+            if parsed.scheme in ('http', 'https'):
+                origins.add(f"{parsed.scheme}://{parsed.netloc}")
+        return origins
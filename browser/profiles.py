@@ -0,0 +1,204 @@
+import json
+import os
+import re
+import shutil
+import socket
+import threading
+import time
+from config import Config
+from utils.logger import Logger
+
+LOCK_FILE = '.automation.lock'
+# Chrome's own per-instance lock files; never part of a snapshot
+CHROME_SINGLETON_FILES = ('SingletonLock', 'SingletonCookie', 'SingletonSocket', 'lockfile')
+
+
+class ProfileLockedError(Exception):
+    """Raised when a profile is still in use by another worker after the timeout"""
+
+
+def _pid_alive(pid):
+    if pid is None or pid <= 0:
+        return False
+    if os.name == 'nt':
+        return _pid_alive_windows(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # PermissionError: exists but belongs to another user
+        return True
+    return True
+
+
+def _pid_alive_windows(pid):
+    # os.kill(pid, 0) calls TerminateProcess on Windows, so query the process instead
+    import ctypes
+    from ctypes import wintypes
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    STILL_ACTIVE = 259
+    ERROR_ACCESS_DENIED = 5
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        # Access denied means the process exists but is protected
+        return ctypes.get_last_error() == ERROR_ACCESS_DENIED
+    try:
+        exit_code = wintypes.DWORD()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)):
+            return True
+        return exit_code.value == STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+class ProfileManager:
+    """Persistent Chrome user-data directories, one per site or account.
+
+    Profiles live under PROFILES_DIR/<name> and keep cookies, logins and the
+    HTTP cache between runs. A lock file (atomically created) guarantees at
+    most one browser per profile across threads and processes; locks left by
+    dead processes on this host are reclaimed. snapshot()/restore() copy a
+    profile to and from PROFILE_SNAPSHOTS_DIR so a worker can start from a
+    known logged-in, warm-cache state.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, root=None, snapshots_root=None):
+        self.logger = Logger()
+        self.root = root or Config.PROFILES_DIR
+        self.snapshots_root = snapshots_root or Config.PROFILE_SNAPSHOTS_DIR
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def path(self, name):
+        if not re.fullmatch(r'[A-Za-z0-9_.@-]+', name or ''):
+            raise ValueError(f"Invalid profile name: {name!r}")
+        return os.path.join(self.root, name)
+
+    def acquire(self, name, timeout=None, restore_snapshot=None):
+        """Lock a profile for this worker; returns its user-data-dir.
+
+        restore_snapshot replaces the profile with that snapshot first.
+        """
+        profile_dir = self.path(name)
+        os.makedirs(profile_dir, exist_ok=True)
+        lock_path = os.path.join(profile_dir, LOCK_FILE)
+        deadline = time.monotonic() + (Config.PROFILE_LOCK_TIMEOUT if timeout is None else timeout)
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                with os.fdopen(fd, 'w') as f:
+                    json.dump({"pid": os.getpid(), "host": socket.gethostname(),
+                               "thread": threading.get_ident(), "since": time.time()}, f)
+                break
+            except FileExistsError:
+                if self._reclaim_stale_lock(lock_path):
+                    continue
+                if time.monotonic() > deadline:
+                    raise ProfileLockedError(f"Profile '{name}' is in use ({self._lock_owner(lock_path)})")
+                time.sleep(0.5)
+
+        if restore_snapshot:
+            try:
+                self._copy_profile(self._snapshot_path(name, restore_snapshot), profile_dir)
+                self.logger.log(f"ProfileManager: Restored '{name}' from snapshot '{restore_snapshot}'.")
+            except Exception:
+                self.release(name)
+                raise
+        self.logger.log(f"ProfileManager: Acquired profile '{name}'.")
+        return profile_dir
+
+    def release(self, name):
+        """Unlock a profile (call after the browser using it has quit)"""
+        try:
+            os.remove(os.path.join(self.path(name), LOCK_FILE))
+        except FileNotFoundError:
+            pass
+
+    def snapshot(self, name, snapshot_name='default', locked=False):
+        """Copy a profile to a named snapshot.
+
+        The profile must not be open in a browser: either idle (it is locked
+        for the copy) or locked=True when the caller holds it and its browser has quit.
+        """
+        target = self._snapshot_path(name, snapshot_name)
+        if not locked:
+            self.acquire(name, timeout=0)
+        try:
+            self._copy_profile(self.path(name), target)
+        finally:
+            if not locked:
+                self.release(name)
+        self.logger.log(f"ProfileManager: Saved snapshot '{snapshot_name}' of '{name}'.")
+        return target
+
+    def restore(self, name, snapshot_name='default'):
+        """Replace a profile (not in use) with a snapshot"""
+        self.acquire(name, timeout=0, restore_snapshot=snapshot_name)
+        self.release(name)
+
+    def snapshots(self, name):
+        try:
+            return sorted(os.listdir(os.path.join(self.snapshots_root, name)))
+        except FileNotFoundError:
+            return []
+
+    def _snapshot_path(self, name, snapshot_name):
+        self.path(snapshot_name)  # same naming rules
+        return os.path.join(self.snapshots_root, name, snapshot_name)
+
+    def _copy_profile(self, source, target):
+        if not os.path.isdir(source):
+            raise FileNotFoundError(f"No profile or snapshot at {source}")
+        os.makedirs(target, exist_ok=True)
+        # Clear everything except the lock file, which the caller holds throughout
+        for entry in os.listdir(target):
+            entry_path = os.path.join(target, entry)
+            if entry == LOCK_FILE:
+                continue
+            if os.path.isdir(entry_path) and not os.path.islink(entry_path):
+                shutil.rmtree(entry_path)
+            else:
+                os.remove(entry_path)
+        shutil.copytree(source, target, dirs_exist_ok=True,
+                        ignore=shutil.ignore_patterns(LOCK_FILE, *CHROME_SINGLETON_FILES))
+
+    def _lock_owner(self, lock_path):
+        try:
+            with open(lock_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _reclaim_stale_lock(self, lock_path):
+        owner = self._lock_owner(lock_path)
+        if owner is None or owner.get("host") != socket.gethostname() or _pid_alive(owner.get("pid", -1)):
+            return False
+        # Another waiter may have reclaimed it already and taken the profile with a new lock.
+        # Move the file aside atomically and only discard it if it is still the dead owner's.
+        tombstone = f"{lock_path}.stale.{os.getpid()}.{threading.get_ident()}"
+        try:
+            os.replace(lock_path, tombstone)
+        except FileNotFoundError:
+            return True  # reclaimed by someone else; retry the exclusive create
+        if self._lock_owner(tombstone) != owner:
+            try:
+                os.link(tombstone, lock_path)  # put the live lock back; fails rather than overwrite
+            except FileExistsError:
+                self.logger.log(f"ProfileManager: Lock {lock_path} was re-created while being restored.")
+            os.remove(tombstone)
+            return False
+        os.remove(tombstone)
+        self.logger.log(f"ProfileManager: Reclaimed lock left by dead process {owner['pid']}.")
+        return True
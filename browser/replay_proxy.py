@@ -0,0 +1,348 @@
+import base64
+import hashlib
+import http.client
+import json
+import os
+import select
+import socket
+import ssl
+import subprocess
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl, urlencode
+from config import Config
+from utils.logger import Logger
+
+RECORD = 'record'            # forward to the network and save every response
+REPLAY = 'replay'            # answer only from recordings; misses get 504, nothing leaves the host
+PASSTHROUGH = 'passthrough'  # plain forwarding proxy, nothing saved
+
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'proxy-connection',
+    'te', 'trailer', 'transfer-encoding', 'upgrade',
+}
+
+
+def request_key(method, url, body=b''):
+    """Recording key: method, URL with sorted query (minus REPLAY_PROXY_IGNORE_PARAMS) and body hash"""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k not in Config.REPLAY_PROXY_IGNORE_PARAMS)
+    normalized = f"{method.upper()} {parts.scheme}://{parts.netloc}{parts.path}?{urlencode(query)}"
+    if body:
+        normalized += " " + hashlib.sha256(body).hexdigest()
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def _der_element(data, offset):
+    """(tag, content start, end) of the DER element at offset"""
+    tag = data[offset]
+    length = data[offset + 1]
+    start = offset + 2
+    if length & 0x80:
+        size = length & 0x7f
+        length = int.from_bytes(data[start:start + size], 'big')
+        start += size
+    return tag, start, start + length
+
+
+def spki_fingerprint(cert_path):
+    """base64 SHA-256 of the certificate's SubjectPublicKeyInfo, as Chrome's SPKI allow-list expects"""
+    with open(cert_path) as f:
+        der = ssl.PEM_cert_to_DER_cert(f.read())
+    _, cert_start, _ = _der_element(der, 0)
+    _, offset, _ = _der_element(der, cert_start)  # tbsCertificate
+    if der[offset] == 0xa0:  # explicit [0] version
+        offset = _der_element(der, offset)[2]
+    # serialNumber, signature, issuer, validity, subject, then subjectPublicKeyInfo
+    for _ in range(5):
+        offset = _der_element(der, offset)[2]
+    _, _, end = _der_element(der, offset)
+    return base64.b64encode(hashlib.sha256(der[offset:end]).digest()).decode('ascii')
+
+
+class RecordingStore:
+    """HAR-style recordings: one HAR 1.2 entry per line in entries.jsonl (append-only, crash-safe).
+
+    Bodies are base64 in response.content.text; the extra _key field is the
+    request_key used for replay lookups. Later recordings of a key win.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = os.path.join(directory, 'entries.jsonl')
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry['_key']] = entry
+        except FileNotFoundError:
+            pass
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def add(self, key, method, url, request_headers, status, reason, response_headers, body, elapsed):
+        entry = {
+            "_key": key,
+            "startedDateTime": datetime.now(timezone.utc).isoformat(),
+            "time": round(elapsed * 1000, 1),
+            "request": {
+                "method": method, "url": url, "httpVersion": "HTTP/1.1",
+                "headers": [{"name": k, "value": v} for k, v in request_headers],
+            },
+            "response": {
+                "status": status, "statusText": reason, "httpVersion": "HTTP/1.1",
+                "headers": [{"name": k, "value": v} for k, v in response_headers],
+                "content": {"size": len(body), "encoding": "base64",
+                            "text": base64.b64encode(body).decode('ascii')},
+            },
+        }
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+            self.entries[key] = entry
+
+    def export_har(self, path):
+        """Write the current recordings as a standard HAR file"""
+        with self._lock:
+            entries = [{k: v for k, v in entry.items() if k != '_key'} for entry in self.entries.values()]
+        with open(path, 'w') as f:
+            json.dump({"log": {"version": "1.2", "creator": {"name": "replay_proxy", "version": "1.0"},
+                               "entries": entries}}, f)
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    tls_origin = None  # "host:port" once a CONNECT tunnel has been intercepted
+
+    def log_message(self, format, *args):
+        pass  # per-request logging would flood the automation log
+
+    def do_CONNECT(self):
+        proxy = self.server.replay_proxy
+        if not proxy.intercepts_tls:
+            self._tunnel()
+            return
+        # Intercept: terminate TLS with our self-signed certificate (Chrome trusts exactly
+        # this certificate's key via chrome_arguments()) and keep reading requests from the decrypted stream
+        self.send_response(200, 'Connection Established')
+        self.end_headers()
+        try:
+            self.connection = proxy.server_tls_context().wrap_socket(self.connection, server_side=True)
+        except (ssl.SSLError, OSError):
+            self.close_connection = True
+            return
+        self.rfile = self.connection.makefile('rb', self.rbufsize)
+        self.wfile = self.connection.makefile('wb', self.wbufsize)
+        self.tls_origin = self.path[:-len(':443')] if self.path.endswith(':443') else self.path
+        self.close_connection = False
+
+    def _tunnel(self):
+        host, _, port = self.path.partition(':')
+        try:
+            upstream = socket.create_connection((host, int(port or 443)), timeout=Config.REPLAY_PROXY_TIMEOUT)
+        except OSError as e:
+            self.send_error(502, f"Upstream connect failed: {e}")
+            return
+        self.send_response(200, 'Connection Established')
+        self.end_headers()
+        sockets = [self.connection, upstream]
+        try:
+            while True:
+                readable, _, errored = select.select(sockets, [], sockets, Config.REPLAY_PROXY_TIMEOUT)
+                if errored or not readable:
+                    break
+                for sock in readable:
+                    data = sock.recv(65536)
+                    if not data:
+                        return
+                    (upstream if sock is self.connection else self.connection).sendall(data)
+        except OSError:
+            pass
+        finally:
+            upstream.close()
+            self.close_connection = True
+
+    def _handle(self):
+        proxy = self.server.replay_proxy
+        # Neither can be recorded or replayed as a single request/response pair; refuse
+        # them outright instead of forwarding a half-read stream
+        if 'chunked' in (self.headers.get('Transfer-Encoding') or '').lower():
+            proxy.count('rejected')
+            self.close_connection = True
+            self._respond(411, 'Length Required', [('Content-Type', 'text/plain')],
+                          b"Chunked request bodies are not supported by the replay proxy")
+            return
+        if self.headers.get('Upgrade'):
+            proxy.count('rejected')
+            self.close_connection = True
+            self._respond(501, 'Not Implemented', [('Content-Type', 'text/plain')],
+                          b"Protocol upgrades (e.g. websockets) are not supported by the replay proxy")
+            return
+        url = f"https://{self.tls_origin}{self.path}" if self.tls_origin else self.path
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        key = request_key(self.command, url, body)
+
+        if proxy.mode == REPLAY:
+            entry = proxy.store.get(key)
+            if entry is None:
+                proxy.count('misses')
+                self._respond(504, 'Not Recorded', [('Content-Type', 'text/plain')],
+                              f"No recording for {self.command} {url}".encode())
+                return
+            proxy.count('replayed')
+            response = entry['response']
+            self._respond(response['status'], response['statusText'],
+                          [(h['name'], h['value']) for h in response['headers']],
+                          base64.b64decode(response['content']['text']))
+            return
+
+        request_headers = [(k, v) for k, v in self.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS]
+        start = time.monotonic()
+        try:
+            status, reason, response_headers, response_body = self._forward(url, request_headers, body)
+        except Exception as e:
+            proxy.count('errors')
+            self._respond(502, 'Bad Gateway', [('Content-Type', 'text/plain')], f"Upstream error: {e}".encode())
+            return
+        if proxy.mode == RECORD:
+            proxy.store.add(key, self.command, url, request_headers, status, reason,
+                            response_headers, response_body, time.monotonic() - start)
+            proxy.count('recorded')
+        else:
+            proxy.count('forwarded')
+        self._respond(status, reason, response_headers, response_body)
+
+    def _forward(self, url, headers, body):
+        parts = urlsplit(url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        connection = connection_class(parts.netloc, timeout=Config.REPLAY_PROXY_TIMEOUT)
+        try:
+            path = parts.path or '/'
+            if parts.query:
+                path += '?' + parts.query
+            connection.request(self.command, path, body=body or None, headers=dict(headers))
+            response = connection.getresponse()
+            response_body = response.read()  # de-chunked, still content-encoded
+            response_headers = [(k, v) for k, v in response.getheaders()
+                                if k.lower() not in HOP_BY_HOP_HEADERS and k.lower() != 'content-length']
+            return response.status, response.reason, response_headers, response_body
+        finally:
+            connection.close()
+
+    def _respond(self, status, reason, headers, body):
+        self.send_response(status, reason)
+        for name, value in headers:
+            if name.lower() not in HOP_BY_HOP_HEADERS and name.lower() != 'content-length':
+                self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _handle
+
+
+class ReplayProxy:
+    """Local record/replay HTTP(S) proxy for deterministic, offline-capable runs.
+
+    record: forward and save responses; replay: serve only saved responses;
+    passthrough: forward only. HTTPS is intercepted with one self-signed
+    certificate (generated with openssl), which Chrome accepts because
+    chrome_arguments() allow-lists that certificate's public key; all other
+    certificates are still validated. Without openssl, and in passthrough
+    mode, HTTPS is tunneled untouched and therefore neither recorded nor
+    replayed. Chunked request bodies and protocol upgrades are rejected.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, mode=None, directory=None, port=None):
+        self.logger = Logger()
+        self.mode = mode or Config.REPLAY_PROXY_MODE
+        if self.mode not in (RECORD, REPLAY, PASSTHROUGH):
+            raise ValueError(f"Unknown replay proxy mode: {self.mode!r}")
+        self.directory = directory or Config.REPLAY_PROXY_DIR
+        self.store = RecordingStore(self.directory)
+        self.certificate = self._ensure_certificate() if self.mode != PASSTHROUGH else None
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+        self._tls_context = None
+        self.server = ThreadingHTTPServer(('127.0.0.1', Config.REPLAY_PROXY_PORT if port is None else port), _ProxyHandler)
+        self.server.daemon_threads = True
+        self.server.replay_proxy = self
+        self.port = self.server.server_address[1]
+        self._thread = None
+
+    @classmethod
+    def shared(cls):
+        """Process-wide proxy in Config.REPLAY_PROXY_MODE, started on first use"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls().start()
+            return cls._shared
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="ReplayProxy", daemon=True)
+        self._thread.start()
+        self.logger.log(f"ReplayProxy: {self.mode} mode on 127.0.0.1:{self.port} "
+                        f"({len(self.store.entries)} recordings in {self.directory}).")
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.logger.log(f"ReplayProxy: Stopped ({self.stats}).")
+
+    def chrome_arguments(self):
+        arguments = [f"--proxy-server=http://127.0.0.1:{self.port}"]
+        if self.intercepts_tls:
+            # Trusts only the proxy's own key (needs --user-data-dir, which chromedriver always sets)
+            arguments.append(f"--ignore-certificate-errors-spki-list={spki_fingerprint(self.certificate[0])}")
+        return arguments
+
+    @property
+    def intercepts_tls(self):
+        return self.mode != PASSTHROUGH and self.certificate is not None
+
+    def count(self, name):
+        with self._stats_lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+
+    def server_tls_context(self):
+        if self._tls_context is None:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.set_alpn_protocols(['http/1.1'])  # the handler speaks HTTP/1.1 only
+            context.load_cert_chain(*self.certificate)
+            self._tls_context = context
+        return self._tls_context
+
+    def _ensure_certificate(self):
+        cert_path = os.path.join(self.directory, 'proxy_cert.pem')
+        key_path = os.path.join(self.directory, 'proxy_key.pem')
+        if os.path.exists(cert_path) and os.path.exists(key_path):
+            return cert_path, key_path
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            subprocess.run(
+                ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '3650',
+                 '-subj', '/CN=replay-proxy', '-keyout', key_path, '-out', cert_path],
+                check=True, capture_output=True, timeout=60
+            )
+            return cert_path, key_path
+        except (OSError, subprocess.SubprocessError) as e:
+            self.logger.log(f"ReplayProxy: Could not create a certificate with openssl ({e}); "
+                            f"HTTPS will be tunneled without recording.")
+            return None
@@ -2,19 +2,71 @@ import os
 
 class Config:
     # ADDITIONAL CONFIGURATION
-    ACTION_DELAY = 2 # Seconds to pause between actions for visual observation
+    READINESS_MAX_WAIT = 2 # Hard cap in seconds on waiting for the page to settle after an action (the old fixed ACTION_DELAY)
+    READINESS_QUIET_MS = 300 # DOM must be free of mutations this long (ms) to count as settled
+    READINESS_POLL_INTERVAL = 0.05 # Seconds between readiness checks
+    POST_ACTION_GRACE = 0.15 # Seconds to watch for a delayed effect before treating an action as having none
     MAX_UI_ELEMENTS_TO_CAPTURE = 20 # Limit the number of elements in UI tree for LLM context
     MAX_AUTOMATION_STEPS = 10  # Maximum steps to prevent infinite loops  
+    DETECT_SCREEN_CHANGES = True # Skip UI tree capture / LLM calls when the screen did not change
+    MAX_UNCHANGED_STEPS = 3 # Stop as stuck after this many consecutive steps without a screen change
+    MANUAL_INPUT_TIMEOUT = 60 # Seconds a 'wait' action gives the user to act in the browser before the run continues
+    UI_CAPTURE_MODE = 'incremental' # 'incremental' (MutationObserver diff), 'snapshot' (one injected script),
+                                    # 'cdp' (Chrome DOMSnapshot, includes iframes) or 'selectors' (per-element WebDriver calls)
+    SPATIAL_INDEX_CELL_SIZE = 64 # Grid cell size in pixels for the per-capture spatial index
+    PROMPT_COMPILER_ENABLED = True # Relevance-ranked element table in the prompt instead of the raw ui_tree JSON
+    PROMPT_UI_TOKEN_BUDGET = 600 # Estimated tokens the element table may use
+    PROMPT_OFFSCREEN_MARGIN = 200 # Pixels beyond the viewport still treated as on screen
 
     # API Configuration
     OPENAI_API_KEY = ''
     OPENAI_API_URL = 'https://api.openai.com/v1/chat/completions'
+    LLM_CONNECT_TIMEOUT = 5 # Seconds to establish a connection to the API
+    LLM_READ_TIMEOUT = 60 # Seconds to wait for response data before giving up on an attempt
+    LLM_MAX_RETRIES = 3 # Retries on 429/5xx and connection errors (exponential backoff with jitter)
+    LLM_BACKOFF_BASE = 0.5 # Seconds before the first retry; doubles per attempt
+    LLM_BACKOFF_MAX = 20 # Cap on a single retry delay, including Retry-After
+    LLM_POOL_SIZE = 4 # Keep-alive connections kept open to the API host
+    LLM_STREAMING = True # Stream completions and dispatch the action as soon as its fields are complete
+    LLM_MAX_CONCURRENT_REQUESTS = 8 # In-flight LLM calls per event loop (EXECUTION_MODE 'async')
+    LLM_LATENCY_HISTORY = 200 # Recent calls kept for latency_summary()
+    LLM_CACHE_ENABLED = True # Reuse responses for identical prompts instead of calling the API again
+    LLM_CACHE_MEMORY_ENTRIES = 256 # In-memory LRU tier in front of the SQLite tier
+    LLM_CACHE_TTL = 7 * 24 * 3600 # Seconds a cached response stays valid
     
     # Selenium Configuration
     IMPLICIT_WAIT = 2
     EXPLICIT_WAIT = 2
+    ELEMENT_RESOLVE_TIMEOUT = 2 # Overall deadline for resolving a target element (all strategies at once)
+    ELEMENT_RESOLVE_POLL_INTERVAL = 0.25 # Seconds between resolver attempts while the element is missing
+    COORDINATE_FAST_PATH = True # Act on ui_tree coordinates when target_element matches a captured label
+    COORDINATE_MATCH_THRESHOLD = 0.85 # Minimum label similarity (0-1) for the coordinate fast path
+    COORDINATE_MATCH_MARGIN = 0.1 # Best match must beat matches at other coordinates by this much
+    SPATIAL_NEAREST_MAX_DISTANCE = 40 # Pixels a target point may miss every captured element by and still pick the nearest
     CHROME_HEADLESS = False
+    BROWSER_PROFILE = None # Persistent user-data-dir name (e.g. 'gmail') to keep logins and cache; None uses pooled blank sessions
+    PROFILE_LOCK_TIMEOUT = 60 # Seconds to wait for a profile another worker is using
+    PROFILE_RESTORE_SNAPSHOT = None # Snapshot name to restore into the profile before each run (None keeps its live state)
+    REPLAY_PROXY_MODE = None # None (direct), 'record', 'replay' or 'passthrough' via the local proxy in browser/replay_proxy.py
+    REPLAY_PROXY_PORT = 0 # 0 picks a free port
+    REPLAY_PROXY_TIMEOUT = 30 # Seconds for upstream connections and idle tunnels
+    REPLAY_PROXY_IGNORE_PARAMS = ['_', 'cb', 'rnd'] # Cache-busting query params ignored when matching recordings
+    LOAD_PROFILE = 'full' # Resource blocking per run: 'full', 'no-media' or 'text-only' (see browser/load_profiles.py)
+    BROWSER_POOL_SIZE = 2 # Pre-launched Chrome sessions kept warm between tasks (keep >= SCHEDULER_WORKERS)
+    BROWSER_POOL_CHECKOUT_TIMEOUT = 120 # Seconds a task waits for a free session when all are busy
+    BROWSER_MAX_TASKS_PER_SESSION = 20 # Recycle (relaunch) a session after this many tasks
+    BROWSER_MAX_HEAP_MB = 512 # Recycle a session whose page JS heap grows beyond this
     
+    # Job Scheduler Configuration
+    EXECUTION_MODE = 'threads' # 'threads' (worker threads in this process), 'processes' (one worker process per slot)
+                               # or 'contexts' (worker threads sharing one Chrome, one browser context per task)
+                               # or 'async' (one event loop awaiting LLM calls, browser work on a thread pool)
+    SCHEDULER_WORKERS = 2 # Automations run in parallel, each with its own agent and browser session
+    SCHEDULER_QUEUE_SIZE = 8 # Pending jobs beyond this are rejected instead of queued
+    SCHEDULER_JOB_HISTORY = 50 # Finished jobs kept for status queries
+    SCHEDULER_PROCESS_STOP_TIMEOUT = 30 # Seconds a worker process gets to finish before it is terminated
+    CONTEXT_NAVIGATION_TIMEOUT = 30 # 'contexts' mode: cap on waiting for a tab's page load (outside the host lock)
+
     # Retrieval Configuration
     TOP_K_RESULTS = 3
     
@@ -23,7 +75,29 @@ class Config:
     DATA_DIR = os.path.join(BASE_DIR, 'data')
     SCREENSHOTS_DIR = os.path.join(DATA_DIR, 'screenshots')
     DATASET_PATH = os.path.join(DATA_DIR, 'gui_demos.json')
+    LOCATOR_CACHE_PATH = os.path.join(DATA_DIR, 'locator_cache.json')
+    PROFILES_DIR = os.path.join(DATA_DIR, 'profiles') # Persistent Chrome user-data-dirs
+    PROFILE_SNAPSHOTS_DIR = os.path.join(DATA_DIR, 'profile_snapshots')
+    REPLAY_PROXY_DIR = os.path.join(DATA_DIR, 'replay') # Recorded responses (entries.jsonl) and the proxy certificate
+    LLM_CACHE_PATH = os.path.join(DATA_DIR, 'llm_cache.sqlite3') # Persistent LLM response cache
+    CHROMEDRIVER_CACHE_PATH = os.path.join(DATA_DIR, 'chromedriver_cache.json') # Resolved driver path + Chrome version fingerprint
+
+    # Locator Cache
+    LOCATOR_CACHE_MAX_ENTRIES = 1000 # Least recently used entries are evicted beyond this
+    LOCATOR_CACHE_MAX_AGE = 30 * 24 * 3600 # Seconds an entry may go unused before eviction
+    LOCATOR_CACHE_MAX_EXCESS_MISSES = 3 # Drop an entry once misses exceed hits by more than this
     
+    # Screenshot Configuration
+    SCREENSHOT_POLICY = 'always' # 'always', 'on_failure' or 'final'
+    SCREENSHOT_FORMAT = 'jpeg' # 'png', 'jpeg' or 'webp' (re-encoding needs Pillow)
+    SCREENSHOT_MAX_WIDTH = 1280 # Downscale wider frames; None keeps full resolution
+    SCREENSHOT_QUALITY = 80 # JPEG/WebP quality
+    SCREENSHOT_QUEUE_SIZE = 16 # Frames waiting for the background writer before new ones are dropped
+    SCREENSHOT_STORE_ENABLED = True # Content-addressed store in SCREENSHOTS_DIR instead of step{n} files
+    SCREENSHOT_PHASH_THRESHOLD = 3 # Max differing perceptual-hash bits for a candidate duplicate, confirmed by a pixel diff (-1: byte-identical frames only)
+    SCREENSHOT_STORE_MAX_BYTES = 500 * 1024 * 1024 # LRU eviction above this total size
+    SCREENSHOT_STORE_MAX_AGE = 7 * 24 * 3600 # Seconds a frame may go unused before eviction
+
     # UI Configuration
     GRADIO_PORT = 7860
     GRADIO_SHARE = False
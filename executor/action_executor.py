@@ -1,16 +1,16 @@
-import time
-import pyautogui
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import re
+from contextlib import nullcontext
 # Removed Service, ChromeDriverManager, Options as they are now handled by main.py
 from config import Config
 from utils.logger import Logger
+from executor.element_resolver import ElementResolver
+from executor.locator_cache import LocatorCache, CACHED_LOOKUP_SCRIPT, page_key_for_url
+from executor.coordinate_resolver import CoordinateResolver
+from executor.post_action import PostActionWaiter
 from selenium.webdriver.common.action_chains import ActionChains
-import os
-import glob
+
+# target_element given as a page point, e.g. "398, 190" or "(398, 190)"
+POINT_TARGET = re.compile(r'^\(?\s*(\d+(?:\.\d+)?)\s*,\s*(\d+(?:\.\d+)?)\s*\)?$')
 
 
 class ActionExecutor:
@@ -18,8 +18,11 @@ class ActionExecutor:
     def __init__(self, driver_instance):
         self.logger = Logger()
         self.driver = driver_instance # ASSIGN: Use the provided driver instance
-        self.wait = WebDriverWait(self.driver, Config.EXPLICIT_WAIT) # INITIALIZE: Wait object here
         self.actions = ActionChains(self.driver) # INITIALIZE: ActionChains here
+        self.resolver = ElementResolver(self.driver)
+        self.locator_cache = LocatorCache.shared()
+        self.coordinate_resolver = CoordinateResolver(self.driver)
+        self.post_action = PostActionWaiter(self.driver)
         self.logger.log("ActionExecutor initialized with shared driver.")
 
 
@@ -28,18 +31,20 @@ class ActionExecutor:
     #    ... (this logic is now in main.py)
 
 
-    def execute_action(self, action_suggestion):
-        """Execute suggested action"""
+    def execute_action(self, action_suggestion, ui_tree=None, spatial_index=None):
+        """Execute suggested action; ui_tree (the capture the suggestion was based on) enables the coordinate fast path
+        and spatial_index (built from the same capture) resolves targets given as points"""
         # No need for an internal driver check/init, driver is guaranteed to be set
         action_type = action_suggestion.get('action_type', 'wait')
         target_element = action_suggestion.get('target_element', '')
         additional_input = action_suggestion.get('additional_input', '')
+        point = self._target_point(action_suggestion)
 
         try:
             if action_type == 'click':
-                return self._execute_click(target_element)
+                return self._execute_click(target_element, ui_tree, point, spatial_index)
             elif action_type == 'type':
-                return self._execute_type(target_element, additional_input)
+                return self._execute_type(target_element, additional_input, ui_tree, point, spatial_index)
             elif action_type == 'navigate':
                 return self._execute_navigate(additional_input)
             elif action_type == 'wait':
@@ -55,33 +60,29 @@ class ActionExecutor:
             self.logger.log(f"Error executing action: {str(e)}")
             return False
 
-    def _execute_click(self, target_element):
+    def _execute_click(self, target_element, ui_tree=None, point=None, spatial_index=None):
         """Execute click action"""
-        element = self._find_element(target_element)
+        element = self._locate_element(target_element, 'click', ui_tree, point, spatial_index)
         if element:
-            self.logger.log(f"Attempting to click: {target_element} at coordinates {element.location['x']},{element.location['y']}")
-            self.driver.execute_script("arguments[0].style.border='3px solid lime; background-color: yellow;'", element) # custom added 25 June
-            try:
-                # Try using ActionChains for better reliability
-                self.actions.move_to_element(element).click().perform()
-                self.logger.log(f"Clicked: {target_element}")
-            except Exception as click_error:
-                self.logger.log(f"Failed direct click for {target_element}: {click_error}. Trying JS click.")
+            with self._exclusive():
+                self.logger.log(f"Attempting to click: {target_element} at coordinates {element.location['x']},{element.location['y']}")
+                self.driver.execute_script("arguments[0].style.border='3px solid lime; background-color: yellow;'", element) # custom added 25 June
+                self.post_action.arm(element)
                 try:
-                    self.driver.execute_script("arguments[0].click();", element)
-                    self.logger.log(f"Clicked (JS): {target_element}")
-                except Exception as js_click_error:
-                    self.logger.log(f"Failed JS click for {target_element}: {js_click_error}")
-                    return False
-
-            #  Post-click: Wait for Google search result page (if applicable)
-            try:
-                self.logger.log("Waiting for search result container to load...")
-                self.wait.until(EC.presence_of_element_located((By.ID, "search")))
-                self.logger.log(" Search results page detected.")
-            except Exception as wait_error:
-                self.logger.log(f" Search results container not detected: {wait_error}")
-
+                    # Try using ActionChains for better reliability
+                    self.actions.move_to_element(element).click().perform()
+                    self.logger.log(f"Clicked: {target_element}")
+                except Exception as click_error:
+                    self.logger.log(f"Failed direct click for {target_element}: {click_error}. Trying JS click.")
+                    try:
+                        self.driver.execute_script("arguments[0].click();", element)
+                        self.logger.log(f"Clicked (JS): {target_element}")
+                    except Exception as js_click_error:
+                        self.logger.log(f"Failed JS click for {target_element}: {js_click_error}")
+                        return False
+
+            # Post-click: wait only for what the click caused (navigation, DOM change or nothing)
+            self.post_action.wait()
             return True
 
         return False
@@ -89,13 +90,17 @@ class ActionExecutor:
         
 
 
-    def _execute_type(self, target_element, text):
+    def _execute_type(self, target_element, text, ui_tree=None, point=None, spatial_index=None):
         """Execute type action"""
-        element = self._find_element(target_element)
+        element = self._locate_element(target_element, 'type', ui_tree, point, spatial_index)
         if element:
-            element.clear()
-            element.send_keys(text)
+            with self._exclusive():
+                self.post_action.arm(element)
+                element.clear()
+                element.send_keys(text)
             self.logger.log(f"Typed '{text}' in: {target_element}")
+            # Suggestions or validation may react to the input; plain typing returns right away
+            self.post_action.wait()
             return True
         return False
 
@@ -105,6 +110,8 @@ class ActionExecutor:
             url = 'https://' + url
         self.driver.get(url)
         self.logger.log(f"Navigated to: {url}")
+        self.post_action.readiness.wait_until_ready()
+        self.post_action.wait_for_completion()
         return True
 
     def _execute_wait(self):
@@ -112,184 +119,87 @@ class ActionExecutor:
         self.logger.log("Manual intervention required")
         return True
 
-    # def _find_element(self, target_description):
-        """Find element by various strategies"""
-        if not target_description or not target_description.strip():
-            self.logger.log("Empty or invalid target description — skipping element search.")
-            return None
-
-        # ADDED: Lowercase target_description for case-insensitive matching in some strategies
-        target_description = target_description.strip() # Added custom 26 June
-        target_description_lower = target_description.lower()
-
-        strategies = [
-            # By exact placeholder (case-insensitive for safety, though exact is often needed)
-            (By.CSS_SELECTOR, f"input[placeholder='{target_description}']"),
-            (By.CSS_SELECTOR, f"input[placeholder*='{target_description}']"), # Contains
-
-            # By exact aria-label
-            (By.CSS_SELECTOR, f"[aria-label='{target_description}']"),
-            (By.CSS_SELECTOR, f"[aria-label*='{target_description}']"), # Contains
-
-            # By text content (case-insensitive for robustness)
-            (By.XPATH, f"//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{target_description_lower}')]"),
-            (By.XPATH, f"//*[normalize-space(.)='{target_description}']"), # Exact visible text
-
-            # By name attribute
-            (By.NAME, target_description),
-            # By id
-            (By.ID, target_description),
-            # Common search box patterns (these are often generic)
-            (By.CSS_SELECTOR, "input[type='search']"),
-            (By.CSS_SELECTOR, "input[name='q']"),
-            (By.CSS_SELECTOR, "input[name='search']"),
-            # By title attribute
-            (By.CSS_SELECTOR, f"[title*='{target_description}']"),
-            # By value attribute (for inputs)
-            (By.CSS_SELECTOR, f"input[value*='{target_description}']"),
-        ]
-
-        for strategy in strategies:
+    def _exclusive(self):
+        """Keep a browser-context tab active while WebElements are in use (no-op for plain drivers).
+
+        Only the calls on a located element need it: locating and the post-action
+        waits go through the driver facade, which takes the host lock per command,
+        so other contexts can use the browser while this one waits.
+        """
+        exclusive = getattr(self.driver, 'exclusive', None)
+        return exclusive() if exclusive else nullcontext()
+
+    def _target_point(self, action_suggestion):
+        """(x, y) when the target is a point: target_element "x, y", or a demo-style 'coordinates' field"""
+        match = POINT_TARGET.match(str(action_suggestion.get('target_element') or '').strip())
+        if match:
+            return float(match.group(1)), float(match.group(2))
+        coordinates = action_suggestion.get('coordinates')
+        if isinstance(coordinates, (list, tuple)) and len(coordinates) >= 2:
             try:
-                # Use self.wait for finding elements to ensure they are present/visible
-                element = self.wait.until(EC.presence_of_element_located(strategy))
-                if element.is_displayed() and element.is_enabled():
-                    self.logger.log(f"Found element by strategy {strategy}: {element.tag_name} - {self._get_element_label_for_logging(element)}")
-                    return element
-            except Exception as e:
-                # self.logger.log(f"ActionExecutor: No element found with strategy {strategy}: {e}") # Too verbose
-                continue
-
-        self.logger.log(f"ActionExecutor: No element found for target: {target_description}")
+                return float(coordinates[0]), float(coordinates[1])
+            except (TypeError, ValueError):
+                return None
         return None
 
-    
-        """Find element by various strategies"""
-        if not target_description or not target_description.strip():
-            self.logger.log(" Empty or invalid target description — skipping element search.")
-            return None
-
-        target_description = target_description.strip()
-        target_description_lower = target_description.lower()
-
-        strategies = [
-            # By exact placeholder
-            (By.CSS_SELECTOR, f"input[placeholder='{target_description}']"),
-            (By.CSS_SELECTOR, f"input[placeholder*='{target_description}']"),
-
-            # By aria-label
-            (By.CSS_SELECTOR, f"[aria-label='{target_description}']"),
-            (By.CSS_SELECTOR, f"[aria-label*='{target_description}']"),
-
-            # By visible text (case-insensitive, normalized)
-            (By.XPATH, f"//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{target_description_lower}')]"),
-            (By.XPATH, f"//*[normalize-space(.)='{target_description}']"),
-
-            # By name, id, title, value
-            (By.NAME, target_description),
-            (By.ID, target_description),
-            (By.CSS_SELECTOR, f"[title*='{target_description}']"),
-            (By.CSS_SELECTOR, f"input[value*='{target_description}']"),
-
-            # Common input patterns
-            (By.CSS_SELECTOR, "input[type='search']"),
-            (By.CSS_SELECTOR, "input[name='q']"),
-            (By.CSS_SELECTOR, "input[name='search']"),
-
-            #  Final fallback: <a> link text match (like 'Sign into Gmail')
-            (By.XPATH, f"//a[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{target_description_lower}')]")
-        ]
-
-        for strategy in strategies:
-            try:
-                element = self.wait.until(EC.presence_of_element_located(strategy))
-                if element.is_displayed() and element.is_enabled():
-                    self.logger.log(f" Found element by strategy {strategy}: {element.tag_name} - {self._get_element_label_for_logging(element)}")
+    def _locate_element(self, target_description, action_type, ui_tree=None, point=None, spatial_index=None):
+        """Element from the captured ui_tree coordinates when confident, DOM search otherwise.
+
+        A point-only target is resolved through the spatial index; a label with
+        extra coordinates falls back to the point when the label finds nothing.
+        """
+        point_only = point is not None and POINT_TARGET.match(str(target_description or '').strip())
+        if not point_only:
+            if ui_tree and Config.COORDINATE_FAST_PATH:
+                element = self.coordinate_resolver.resolve(target_description, ui_tree, action_type)
+                if element:
                     return element
-            except Exception:
-                continue
-
-        self.logger.log(f" No element found for target: '{target_description}'")
-        return None
+            element = self._find_element(target_description)
+            if element or point is None:
+                return element
+        if spatial_index is None:
+            self.logger.log(f" No spatial index to resolve point target {point}.")
+            return None
+        return self.coordinate_resolver.resolve_point(point[0], point[1], spatial_index, action_type)
 
-    # Custom added 26 June
     def _find_element(self, target_description):
-        """Find element by various strategies"""
+        """Find the best-scoring visible, enabled element in one resolver pass per attempt"""
         if not target_description or not target_description.strip():
             self.logger.log(" Empty or invalid target description — skipping element search.")
             return None
 
         target_description = target_description.strip()
-        target_description_lower = target_description.lower()
-
-        strategies = [
-            (By.CSS_SELECTOR, f"input[placeholder='{target_description}']"),
-            (By.CSS_SELECTOR, f"input[placeholder*='{target_description}']"),
-            (By.CSS_SELECTOR, f"[aria-label='{target_description}']"),
-            (By.CSS_SELECTOR, f"[aria-label*='{target_description}']"),
-            (By.XPATH, f"//*[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{target_description_lower}')]"),
-            (By.XPATH, f"//*[normalize-space(.)='{target_description}']"),
-            (By.NAME, target_description),
-            (By.ID, target_description),
-            (By.CSS_SELECTOR, "input[type='search']"),
-            (By.CSS_SELECTOR, "input[name='q']"),
-            (By.CSS_SELECTOR, "input[name='search']"),
-            (By.CSS_SELECTOR, f"[title*='{target_description}']"),
-            (By.CSS_SELECTOR, f"input[value*='{target_description}']"),
-
-            #  FINAL fallback for links (anchors) with partial text match
-            (By.XPATH, f"//a[contains(translate(text(), 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{target_description_lower}')]"),
-            (By.XPATH, f"//a[normalize-space(text())='{target_description}']")
-        ]
+        host, page_type = page_key_for_url(self.driver.current_url)
 
-        for strategy in strategies:
+        # Learned locator first: one lookup instead of a full resolver pass
+        cached = self.locator_cache.lookup(host, page_type, target_description)
+        if cached:
             try:
-                # self.logger.log(f" Trying strategy {strategy} for target '{target_description}'")
-                element = self.wait.until(EC.presence_of_element_located(strategy))
-                if element.is_displayed() and element.is_enabled():
-                    self.logger.log(f" Found element by {strategy}: {self._get_element_label_for_logging(element)}")
-                    return element
-            except Exception as e:
-                self.logger.log(f" Strategy {strategy} failed: {e}")
-                continue
-        # 26 June custom added  - Brute force
-        try:
-            anchors = self.driver.find_elements(By.TAG_NAME, "a")
-            for anchor in anchors:
-                visible_text = anchor.text.strip().lower()
-                if visible_text == target_description.lower():
-                    self.logger.log(f" Matched via brute-force <a> tag text: '{visible_text}' == '{target_description}'")
-                    self.driver.execute_script("arguments[0].style.border='3px solid red'", anchor)
-                    return anchor
-
-        except Exception as e:
-            self.logger.log(f" Fallback <a> tag match failed: {e}")
-        
-        try:
-            links = self.driver.find_elements(By.TAG_NAME, "a")
-            for link in links:
-                text = link.text.strip()
-                if text:
-                    self.logger.log(f"[A]  Found link text: '{text}'")
-        except Exception as e:
-                    self.logger.log(f"Error while listing <a> tags: {e}")
+                element = self.driver.execute_script(
+                    CACHED_LOOKUP_SCRIPT, cached['by'], cached['selector'], target_description
+                )
+            except Exception:
+                element = None
+            if element:
+                self.locator_cache.record_hit(host, page_type, target_description)
+                self.logger.log(f" Found element for '{target_description}' by cached {cached['by']} '{cached['selector']}'")
+                return element
+        self.locator_cache.record_miss(host, page_type, target_description)
+
+        match = self.resolver.resolve(target_description)
+        if match:
+            self.logger.log(
+                f" Found element for '{target_description}' by {match['reason']} "
+                f"(score {match['score']}): '{match['matched']}'"
+            )
+            # The generic search-box fallback does not carry the target, so it could never be re-verified
+            if match['selector'] and match['reason'] != 'search_box':
+                self.locator_cache.store(host, page_type, target_description, 'css', match['selector'])
+            return match['element']
 
         self.logger.log(f" No element found for target: '{target_description}'")
-        
         return None
 
-
-    def _get_element_label_for_logging(self, element):
-        """Helper to get a log-friendly label for found elements"""
-        # Prioritize easily identifiable attributes for logging
-        for attr in ['id', 'name', 'aria-label', 'placeholder', 'title', 'value']:
-            value = element.get_attribute(attr)
-            if value:
-                return f"{attr}='{value[:50]}'" # Truncate for logging
-        if element.text:
-            return f"text='{element.text[:50]}'"
-        return f"tag='{element.tag_name}'"
-
     # REMOVED: cleanup method, as the shared driver is cleaned up by main.py
     # def cleanup(self):
     #    ...
@@ -0,0 +1,119 @@
+import difflib
+from config import Config
+from utils.logger import Logger
+from gui_capturer.capture_scripts import JS_HELPERS
+
+TYPEABLE_TYPES = ('textarea', 'role_textbox', 'role_combobox', 'role_searchbox')
+NON_TEXT_INPUTS = ('input_submit', 'input_button', 'input_checkbox', 'input_radio', 'input_image', 'input_reset', 'input_file')
+
+# Element under page coordinates (scrolling them into view first) and its capture label,
+# so the caller can confirm it is still the element the ui_tree described.
+# arguments[0], arguments[1]: page x, y
+ELEMENT_AT_POINT_SCRIPT = JS_HELPERS + r"""
+var x = arguments[0], y = arguments[1];
+var viewX = x - window.scrollX, viewY = y - window.scrollY;
+if (viewX < 0 || viewY < 0 || viewX >= window.innerWidth || viewY >= window.innerHeight) {
+    window.scrollTo(Math.max(0, x - window.innerWidth / 2), Math.max(0, y - window.innerHeight / 2));
+    viewX = x - window.scrollX;
+    viewY = y - window.scrollY;
+}
+var hit = document.elementFromPoint(viewX, viewY);
+if (!hit) return null;
+var el = hit.closest('input, textarea, select, button, a, [role], [tabindex], [onclick], [contenteditable="true"]') || hit;
+return [el, __shizaLabel(el)];
+"""
+
+
+class CoordinateResolver:
+    """Fast path from an LLM target_element to a live element via the ui_tree just captured.
+
+    The target is fuzzy-matched against the captured labels; on a confident,
+    unambiguous match the element is taken straight from its captured center
+    with document.elementFromPoint, skipping the DOM search entirely. A target
+    given as a point (LLM or retrieved demo coordinates) is mapped to the
+    captured element under or nearest to it through the capture's SpatialIndex.
+    """
+
+    def __init__(self, driver_instance):
+        self.logger = Logger()
+        self.driver = driver_instance
+
+    def match(self, target_description, ui_tree, action_type=None):
+        """Best confident ui_tree element for the target, or None"""
+        target = (target_description or '').strip().lower()
+        if not target or not ui_tree:
+            return None
+
+        scored = []
+        for element in ui_tree.get('elements', []):
+            if action_type == 'type' and not self._is_typeable(element):
+                continue
+            label = str(element.get('label', '')).strip().lower()
+            if not label:
+                continue
+            score = 1.0 if label == target else difflib.SequenceMatcher(None, label, target).ratio()
+            scored.append((score, element))
+        if not scored:
+            return None
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        best_score, best = scored[0]
+        if best_score < Config.COORDINATE_MATCH_THRESHOLD:
+            return None
+        # Ambiguous: another element at a different spot matches almost as well
+        for score, other in scored[1:]:
+            if best_score - score >= Config.COORDINATE_MATCH_MARGIN:
+                break
+            if other.get('coordinates') != best.get('coordinates'):
+                return None
+        return best
+
+    def match_point(self, x, y, spatial_index, action_type=None):
+        """Captured element under (x, y), topmost first, else the nearest one within SPATIAL_NEAREST_MAX_DISTANCE"""
+        for element in spatial_index.elements_at(x, y):
+            if action_type != 'type' or self._is_typeable(element):
+                return element
+        element = spatial_index.nearest(x, y, max_distance=Config.SPATIAL_NEAREST_MAX_DISTANCE)
+        if element and (action_type != 'type' or self._is_typeable(element)):
+            return element
+        return None
+
+    def resolve(self, target_description, ui_tree, action_type=None):
+        """Live element for the target from captured coordinates, or None to fall back to DOM search"""
+        element_data = self.match(target_description, ui_tree, action_type)
+        if not element_data:
+            return None
+        return self._live_element(element_data, target_description)
+
+    def resolve_point(self, x, y, spatial_index, action_type=None):
+        """Live element for a target point via the capture's spatial index, or None"""
+        element_data = self.match_point(x, y, spatial_index, action_type)
+        if not element_data:
+            self.logger.log(f" CoordinateResolver: No captured element at or near ({x}, {y}).")
+            return None
+        return self._live_element(element_data, f"({x}, {y})")
+
+    def _live_element(self, element_data, target_description):
+        x, y = element_data['coordinates']
+        try:
+            result = self.driver.execute_script(ELEMENT_AT_POINT_SCRIPT, x, y)
+        except Exception as e:
+            self.logger.log(f" CoordinateResolver: Point lookup failed: {e}")
+            return None
+        if not result:
+            return None
+
+        element, label = result
+        if label != element_data['label']:
+            # Something else (overlay, re-render) is at that point now
+            self.logger.log(f" CoordinateResolver: Element at ({x}, {y}) is '{label}', expected '{element_data['label']}'.")
+            return None
+
+        self.logger.log(f" Found element for '{target_description}' at captured coordinates ({x}, {y}): '{label}'")
+        return element
+
+    def _is_typeable(self, element):
+        element_type = element.get('type', '')
+        if element_type.startswith('input_'):
+            return element_type not in NON_TEXT_INPUTS
+        return element_type in TYPEABLE_TYPES
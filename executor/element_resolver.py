@@ -0,0 +1,152 @@
+import time
+from config import Config
+from utils.logger import Logger
+from gui_capturer.capture_scripts import JS_HELPERS
+
+# Scores every locator strategy the executor used to try one by one (placeholder,
+# aria-label, visible/link text, name, id, title, value, generic search boxes)
+# in a single pass and returns the best visible, enabled element.
+# arguments[0]: target description
+RESOLVE_SCRIPT = JS_HELPERS + r"""
+var target = arguments[0].trim();
+var lower = target.toLowerCase();
+var best = null;
+var INTERACTIVE = 'input, textarea, select, button, a, [role="button"], [role="link"], [role="textbox"], [role="tab"], [role="menuitem"]';
+
+function consider(el, score, reason, matched) {
+    if (!el || el.nodeType !== 1) return;
+    var interactive = el.closest(INTERACTIVE);
+    if (interactive && interactive !== el && reason.indexOf('text') === 0) el = interactive;
+    if (!__shizaIsVisible(el) || !__shizaIsEnabled(el)) return;
+    if (el.matches(INTERACTIVE)) score += 10;
+    var r = el.getBoundingClientRect();
+    if (r.bottom > 0 && r.right > 0 && r.top < window.innerHeight && r.left < window.innerWidth) score += 5;
+    if (!best || score > best.score) {
+        best = {element: el, score: score, reason: reason, matched: String(matched).substring(0, 80)};
+    }
+}
+
+// Short CSS selector that finds el again (cached by LocatorCache)
+function uniqueSelector(el) {
+    function unique(sel) {
+        try { return document.querySelectorAll(sel).length === 1 && document.querySelector(sel) === el; }
+        catch (e) { return false; }
+    }
+    if (el.id && unique('#' + CSS.escape(el.id))) return '#' + CSS.escape(el.id);
+    var attrs = ['name', 'aria-label', 'placeholder', 'title', 'data-testid'];
+    for (var a = 0; a < attrs.length; a++) {
+        var v = el.getAttribute(attrs[a]);
+        if (!v) continue;
+        var sel = el.localName + '[' + attrs[a] + '="' + v.replace(/\\/g, '\\\\').replace(/"/g, '\\"') + '"]';
+        if (unique(sel)) return sel;
+    }
+    var parts = [];
+    for (var node = el; node && node.nodeType === 1 && node !== document.documentElement; node = node.parentElement) {
+        if (node !== el && node.id && unique('#' + CSS.escape(node.id))) {
+            parts.unshift('#' + CSS.escape(node.id));
+            break;
+        }
+        var index = 1, sib = node;
+        while ((sib = sib.previousElementSibling)) {
+            if (sib.localName === node.localName) index++;
+        }
+        parts.unshift(node.localName + ':nth-of-type(' + index + ')');
+    }
+    return parts.join(' > ');
+}
+
+function scoreValue(value, exactScore, containsScore) {
+    if (!value) return 0;
+    var v = String(value).trim();
+    if (!v) return 0;
+    if (v === target) return exactScore;
+    var vl = v.toLowerCase();
+    if (vl === lower) return exactScore - 2;
+    if (vl.indexOf(lower) !== -1) return containsScore;
+    return 0;
+}
+
+if (target) {
+    var attrStrategies = [
+        ['placeholder', 100, 80],
+        ['aria-label', 95, 75],
+        ['title', 85, 65],
+        ['name', 70, 0],
+        ['id', 70, 0]
+    ];
+    var nodes = document.querySelectorAll('[placeholder], [aria-label], [title], [name], [id], input[value]');
+    for (var i = 0; i < nodes.length; i++) {
+        var el = nodes[i];
+        for (var s = 0; s < attrStrategies.length; s++) {
+            var attr = attrStrategies[s][0];
+            var score = scoreValue(el.getAttribute(attr), attrStrategies[s][1], attrStrategies[s][2]);
+            if (score) consider(el, score, attr, el.getAttribute(attr));
+        }
+        if (el.localName === 'input') {
+            var valueScore = scoreValue(el.value, 60, 50);
+            if (valueScore) consider(el, valueScore, 'value', el.value);
+        }
+    }
+
+    // Visible text (covers link text): exact normalized text beats a substring match.
+    // Interactive elements are compared on their whole text so split text nodes still match.
+    function considerText(el) {
+        var text = (el.innerText || el.textContent || '').replace(/\s+/g, ' ').trim();
+        var textLower = text.toLowerCase();
+        if (textLower.indexOf(lower) === -1) return;
+        var reason = el.localName === 'a' ? 'link_text' : 'text';
+        if (text === target) consider(el, 90, reason, text);
+        else if (textLower === lower) consider(el, 88, reason, text);
+        else consider(el, 60 - Math.min(20, Math.floor((text.length - target.length) / 10)), reason, text);
+    }
+
+    var textElements = new Set(document.querySelectorAll(INTERACTIVE));
+    var walker = document.createTreeWalker(document.body || document.documentElement, NodeFilter.SHOW_TEXT);
+    while (walker.nextNode()) {
+        var parent = walker.currentNode.parentElement;
+        if (!parent || ['script', 'style', 'noscript', 'template'].indexOf(parent.localName) !== -1) continue;
+        if (walker.currentNode.nodeValue.toLowerCase().indexOf(lower) !== -1) textElements.add(parent);
+    }
+    textElements.forEach(considerText);
+
+    // Generic search boxes: last resort, as in the old strategy list
+    var generic = document.querySelectorAll("input[type='search'], input[name='q'], input[name='search']");
+    for (var g = 0; g < generic.length; g++) consider(generic[g], 15, 'search_box', generic[g].getAttribute('name') || 'search');
+}
+
+return best ? [best.element, best.score, best.reason, best.matched, uniqueSelector(best.element)] : null;
+"""
+
+
+class ElementResolver:
+    """Resolve a target description to an element with one injected script per attempt.
+
+    The script is re-run until it finds a match or one overall deadline passes,
+    instead of waiting EXPLICIT_WAIT on every strategy in turn.
+    """
+
+    def __init__(self, driver_instance):
+        self.logger = Logger()
+        self.driver = driver_instance
+
+    def resolve(self, target_description, timeout=None):
+        """Return {"element", "score", "reason", "matched", "selector"} for the best match, or None"""
+        if timeout is None:
+            timeout = Config.ELEMENT_RESOLVE_TIMEOUT
+        deadline = time.monotonic() + timeout
+
+        while True:
+            try:
+                result = self.driver.execute_script(RESOLVE_SCRIPT, target_description)
+            except Exception as e:
+                # Page may be mid-navigation; retry until the deadline
+                self.logger.log(f" ElementResolver: Resolve script failed: {e}")
+                result = None
+
+            if result:
+                element, score, reason, matched, selector = result
+                return {"element": element, "score": score, "reason": reason, "matched": matched, "selector": selector}
+
+            if time.monotonic() + Config.ELEMENT_RESOLVE_POLL_INTERVAL > deadline:
+                return None
+            time.sleep(Config.ELEMENT_RESOLVE_POLL_INTERVAL)
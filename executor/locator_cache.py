@@ -0,0 +1,184 @@
+import atexit
+import json
+import os
+import threading
+import time
+from urllib.parse import urlparse
+from config import Config
+from utils.logger import Logger
+
+# Re-find a cached locator in one call, without the implicit wait find_elements would apply.
+# The element must still carry the target in the attributes or text the resolver matches on:
+# a positional selector survives layout changes but may then point at a different element.
+# arguments[0]: 'css', 'xpath' or 'name', arguments[1]: selector, arguments[2]: target description
+CACHED_LOOKUP_SCRIPT = r"""
+var by = arguments[0], selector = arguments[1], target = (arguments[2] || '').trim().toLowerCase(), el = null;
+try {
+    if (by === 'xpath') {
+        el = document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    } else if (by === 'name') {
+        el = document.getElementsByName(selector)[0];
+    } else {
+        el = document.querySelector(selector);
+    }
+} catch (e) {
+    return null;
+}
+if (!el || el.nodeType !== 1 || !el.isConnected || el.disabled) return null;
+var style = window.getComputedStyle(el);
+if (style.display === 'none' || style.visibility === 'hidden' || el.getClientRects().length === 0) return null;
+if (!target) return el;
+function norm(value) { return value ? String(value).replace(/\s+/g, ' ').trim().toLowerCase() : ''; }
+var partial = [el.getAttribute('placeholder'), el.getAttribute('aria-label'), el.getAttribute('title'),
+               el.localName === 'input' ? el.value : null, el.innerText || el.textContent];
+for (var i = 0; i < partial.length; i++) {
+    if (norm(partial[i]).indexOf(target) !== -1) return el;
+}
+if (norm(el.getAttribute('name')) === target || norm(el.id) === target) return el;
+return null;
+"""
+
+
+def page_key_for_url(url):
+    """(host, page type) for a URL; page type is the first path segment, e.g. 'search' or 'mail'"""
+    parsed = urlparse(url or '')
+    segments = [segment for segment in parsed.path.split('/') if segment]
+    return parsed.netloc.lower(), (segments[0].lower() if segments else 'root')
+
+
+class LocatorCache:
+    """Learned locators keyed by (host, page type, target description).
+
+    Remembers which selector resolved a target so the next lookup can try it
+    first. Entries track hit/miss counts, persist to LOCATOR_CACHE_PATH between
+    runs and are evicted when stale (unused for LOCATOR_CACHE_MAX_AGE seconds,
+    or failing more often than they succeed) or when the cache is full (LRU).
+    New selectors are written at once; hit/miss counters are written at most
+    every SAVE_INTERVAL seconds and at exit.
+    """
+
+    SAVE_INTERVAL = 10
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path=None, max_entries=None, max_age=None):
+        self.logger = Logger()
+        self.path = path or Config.LOCATOR_CACHE_PATH
+        self.max_entries = max_entries or Config.LOCATOR_CACHE_MAX_ENTRIES
+        self.max_age = max_age or Config.LOCATOR_CACHE_MAX_AGE
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._last_save = 0.0
+        self._load()
+        atexit.register(self.flush)
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def key(self, host, page_type, target):
+        return f"{host}|{page_type}|{target.strip().lower()}"
+
+    def lookup(self, host, page_type, target):
+        """Cached {"by", "selector", ...} entry for the target, or None"""
+        with self._lock:
+            return self.entries.get(self.key(host, page_type, target))
+
+    def record_hit(self, host, page_type, target):
+        """The cached selector found the element"""
+        with self._lock:
+            entry = self.entries.get(self.key(host, page_type, target))
+            if entry:
+                entry["hits"] += 1
+                entry["last_used"] = time.time()
+            self.hits += 1
+            self._log_outcome("hit", target)
+            self._save_soon()
+
+    def record_miss(self, host, page_type, target):
+        """No cached selector, or the cached selector no longer finds the element"""
+        with self._lock:
+            key = self.key(host, page_type, target)
+            entry = self.entries.get(key)
+            if entry:
+                entry["misses"] += 1
+                if entry["misses"] > entry["hits"] + Config.LOCATOR_CACHE_MAX_EXCESS_MISSES:
+                    del self.entries[key]
+                self._save_soon()
+            self.misses += 1
+            self._log_outcome("miss", target)
+
+    def store(self, host, page_type, target, by, selector):
+        """Remember the selector that resolved the target"""
+        with self._lock:
+            key = self.key(host, page_type, target)
+            entry = self.entries.get(key)
+            if entry and entry["selector"] == selector and entry["by"] == by:
+                entry["last_used"] = time.time()
+            else:
+                self.entries[key] = {
+                    "by": by, "selector": selector,
+                    "hits": 0, "misses": 0, "last_used": time.time()
+                }
+            self._evict()
+            self._save()
+
+    def flush(self):
+        """Write pending hit/miss updates"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _log_outcome(self, outcome, target):
+        self.logger.log(
+            f" Locator cache {outcome} for '{target}' "
+            f"(hit rate {self.hit_rate():.0%}, {self.hits}/{self.hits + self.misses})"
+        )
+
+    def _evict(self):
+        now = time.time()
+        for key in [k for k, e in self.entries.items() if now - e["last_used"] > self.max_age]:
+            del self.entries[key]
+        if len(self.entries) > self.max_entries:
+            by_use = sorted(self.entries, key=lambda k: self.entries[k]["last_used"])
+            for key in by_use[:len(self.entries) - self.max_entries]:
+                del self.entries[key]
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+            self._evict()
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.log(f" LocatorCache: Could not read {self.path}, starting empty: {e}")
+            self.entries = {}
+
+    def _save_soon(self):
+        self._dirty = True
+        if time.monotonic() - self._last_save >= self.SAVE_INTERVAL:
+            self._save()
+
+    def _save(self):
+        self._dirty = False
+        self._last_save = time.monotonic()
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(self.entries, f, indent=1)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            self.logger.log(f" LocatorCache: Could not save {self.path}: {e}")
@@ -0,0 +1,141 @@
+import time
+from urllib.parse import urlparse
+from selenium.webdriver.support.ui import WebDriverWait
+from config import Config
+from utils.logger import Logger
+from utils.readiness import PageReadiness
+
+# Arm effect tracking before an action: a token on the current document (gone after a
+# new document loads) and a mutation counter scoped to the target's region. Mutations
+# of direct children of <body> are counted too, since dialogs and popups attach there.
+# arguments[0]: target element or null
+ARM_SCRIPT = r"""
+var el = arguments[0];
+var previous = window.__shizaAction;
+if (previous && previous.observer) previous.observer.disconnect();
+var region = (el && el.closest('form, dialog, [role="dialog"], main, [role="main"], section, article')) || document.body;
+var state = window.__shizaAction = {mutations: 0, url: location.href};
+state.observer = new MutationObserver(function (records) {
+    for (var i = 0; i < records.length; i++) {
+        var target = records[i].target;
+        if (region.contains(target) || target === document.body) state.mutations++;
+    }
+});
+state.observer.observe(document.body, {
+    subtree: true, childList: true, characterData: true,
+    attributeFilter: ['aria-expanded', 'aria-selected', 'aria-hidden', 'hidden', 'open', 'disabled']
+});
+"""
+
+EFFECT_SCRIPT = r"""
+var state = window.__shizaAction;
+return {armed: !!state, mutations: state ? state.mutations : 0, url: location.href};
+"""
+
+NAVIGATION = 'navigation'      # a new document was loaded
+URL_CHANGE = 'url_change'      # same document, new URL (client-side routing)
+DOM_MUTATION = 'dom_mutation'  # same URL, the target's region changed
+NO_EFFECT = 'none'
+
+# host -> [(path prefix, description, predicate(driver) -> bool)]
+_COMPLETION_PREDICATES = {}
+
+
+def register_completion_predicate(host, predicate, path_prefix='/', description=None):
+    """Register a check that tells when a page on host (and path prefix) has finished loading its content"""
+    _COMPLETION_PREDICATES.setdefault(host.lower(), []).append(
+        (path_prefix, description or getattr(predicate, '__name__', 'predicate'), predicate)
+    )
+
+
+def selector_present(css_selector):
+    """Predicate: an element matching css_selector exists"""
+    def predicate(driver):
+        return bool(driver.execute_script("return !!document.querySelector(arguments[0]);", css_selector))
+    predicate.__name__ = f"'{css_selector}' present"
+    return predicate
+
+
+def completion_predicates_for(url):
+    """Registered predicates matching the URL's host (or a parent domain) and path"""
+    parsed = urlparse(url or '')
+    host = (parsed.hostname or '').lower()
+    path = parsed.path or '/'
+    matches = []
+    for registered_host, predicates in _COMPLETION_PREDICATES.items():
+        if host == registered_host or host.endswith('.' + registered_host):
+            matches.extend(p for p in predicates if path.startswith(p[0]))
+    return matches
+
+
+register_completion_predicate('google.com', selector_present('#search'), path_prefix='/search',
+                              description='search results container')
+
+
+class PostActionWaiter:
+    """Wait after an action only for what the action actually caused.
+
+    arm() before the action, wait() after it. The effect is classified as a
+    new document, a URL change, a DOM mutation in the target's region, or
+    nothing. Nothing returns right away; changes wait for the page to settle
+    and then for any completion predicate registered for the new URL's host.
+    """
+
+    def __init__(self, driver_instance, readiness=None):
+        self.logger = Logger()
+        self.driver = driver_instance
+        self.readiness = readiness or PageReadiness(driver_instance)
+        self.url_before = None
+
+    def arm(self, element=None):
+        self.url_before = self.driver.current_url
+        try:
+            self.driver.execute_script(ARM_SCRIPT, element)
+        except Exception as e:
+            self.logger.log(f" PostActionWaiter: Could not arm effect tracking: {e}")
+
+    def classify(self):
+        """Effect of the action so far: NAVIGATION, URL_CHANGE, DOM_MUTATION or NO_EFFECT"""
+        try:
+            state = self.driver.execute_script(EFFECT_SCRIPT)
+        except Exception:
+            # Script failed mid-unload: the document is being replaced
+            return NAVIGATION
+        if not state['armed']:
+            return NAVIGATION
+        if state['url'] != self.url_before:
+            return URL_CHANGE
+        if state['mutations']:
+            return DOM_MUTATION
+        return NO_EFFECT
+
+    def wait(self):
+        """Wait as the action's effect requires; returns {"effect", "elapsed", "completed"}"""
+        start = time.monotonic()
+        # Effects may start a moment after the event (handlers, timers); watch briefly
+        effect = self.classify()
+        while effect == NO_EFFECT and time.monotonic() - start < Config.POST_ACTION_GRACE:
+            time.sleep(Config.READINESS_POLL_INTERVAL)
+            effect = self.classify()
+
+        completed = True
+        if effect != NO_EFFECT:
+            self.readiness.wait_until_ready()
+            if effect in (NAVIGATION, URL_CHANGE):
+                completed = self.wait_for_completion()
+
+        elapsed = time.monotonic() - start
+        self.logger.log(f" Action effect: {effect}, waited {elapsed * 1000:.0f} ms")
+        return {"effect": effect, "elapsed": elapsed, "completed": completed}
+
+    def wait_for_completion(self, timeout=None):
+        """Wait for the completion predicates registered for the current URL; True when all pass"""
+        url = self.driver.current_url
+        for _, description, predicate in completion_predicates_for(url):
+            try:
+                WebDriverWait(self.driver, timeout or Config.EXPLICIT_WAIT).until(predicate)
+                self.logger.log(f" Completion check passed for {url}: {description}")
+            except Exception as e:
+                self.logger.log(f" Completion check failed for {url}: {description} ({e})")
+                return False
+        return True
@@ -0,0 +1,215 @@
+"""JavaScript snippets injected by UICapturer.
+
+Every script returns plain JSON-serialisable data so the whole page can be
+described in a single WebDriver round trip instead of one call per element.
+"""
+
+# Same selector list the legacy WebDriver loop walks
+INTERACTIVE_SELECTORS = [
+    "input", "button", "a", "select", "textarea",
+    "[role='button']", "[role='link']", "[role='textbox']",
+    "[tabindex]:not([tabindex='-1'])",
+    "div[onclick]", "span[onclick]"
+]
+
+# Helpers shared by the capture scripts. They mirror UICapturer._get_element_type,
+# _get_element_label and the is_displayed/is_enabled/rect checks of the legacy path.
+JS_HELPERS = r"""
+function __shizaIsVisible(el) {
+    if (!el.isConnected) return false;
+    var style = window.getComputedStyle(el);
+    if (style.display === 'none' || style.visibility === 'hidden' || style.visibility === 'collapse') return false;
+    if (parseFloat(style.opacity) === 0) return false;
+    return el.getClientRects().length > 0;
+}
+
+function __shizaIsEnabled(el) {
+    return !(el.disabled === true || el.getAttribute('aria-disabled') === 'true');
+}
+
+function __shizaType(el) {
+    var tag = el.localName;
+    if (tag === 'input') return 'input_' + (el.getAttribute('type') || 'text').toLowerCase();
+    if (tag === 'a') return 'link';
+    if (tag === 'img') return 'image';
+    if (tag === 'select' || tag === 'textarea') return tag;
+    var role = el.getAttribute('role');
+    if (role) return 'role_' + role;
+    return tag;
+}
+
+function __shizaLabel(el) {
+    var attrs = ['aria-label', 'placeholder', 'title', 'alt', 'name', 'value'];
+    for (var i = 0; i < attrs.length; i++) {
+        var label = attrs[i] === 'value' && 'value' in el ? el.value : el.getAttribute(attrs[i]);
+        if (label && String(label).trim()) return String(label).trim().substring(0, 50);
+    }
+    return el.localName + '_' + (el.getAttribute('type') || 'unknown');
+}
+
+// Page-coordinate box: {bounds: [x, y, width, height], center: [x, y]}, or null when empty/off-page
+function __shizaBox(el) {
+    var r = el.getBoundingClientRect();
+    var x = r.left + window.scrollX, y = r.top + window.scrollY;
+    if (r.width <= 0 || r.height <= 0 || x < 0 || y < 0) return null;
+    return {
+        bounds: [Math.round(x), Math.round(y), Math.round(r.width), Math.round(r.height)],
+        center: [Math.floor(x + r.width / 2), Math.floor(y + r.height / 2)]
+    };
+}
+
+// Effective z-index: that of the nearest positioned ancestor-or-self with an explicit z-index
+function __shizaZ(el) {
+    for (var node = el; node && node.nodeType === 1; node = node.parentElement) {
+        var style = window.getComputedStyle(node);
+        if (style.zIndex !== 'auto' && style.position !== 'static') return parseInt(style.zIndex, 10) || 0;
+    }
+    return 0;
+}
+
+function __shizaDescribe(el) {
+    if (!__shizaIsVisible(el) || !__shizaIsEnabled(el)) return null;
+    var box = __shizaBox(el);
+    if (!box) return null;
+    return {type: __shizaType(el), label: __shizaLabel(el), coordinates: box.center, bounds: box.bounds, z: __shizaZ(el)};
+}
+"""
+
+# arguments[0]: selector list, arguments[1]: per-selector element cap
+SNAPSHOT_SCRIPT = JS_HELPERS + r"""
+var selectors = arguments[0], limit = arguments[1];
+var seen = new Set(), elements = [];
+for (var s = 0; s < selectors.length; s++) {
+    var nodes = document.querySelectorAll(selectors[s]), taken = 0;
+    for (var i = 0; i < nodes.length && taken < limit; i++) {
+        var el = nodes[i];
+        if (seen.has(el)) continue;
+        var data = __shizaDescribe(el);
+        if (!data) continue;
+        seen.add(el);
+        elements.push(data);
+        taken++;
+    }
+}
+return {elements: elements};
+"""
+
+# Incremental capture. The first call on a document installs a MutationObserver
+# on window.__shizaCapture and returns a full capture; later calls re-serialize
+# only elements inside dirty subtrees, and re-measure every other tracked element
+# (a class or style change elsewhere can move it) reporting those whose box
+# changed. Navigation discards window state, so a
+# fresh document automatically gets a full capture again. The in-page state
+# outlives any one UICapturer, so a caller without a cached tree passes reset
+# to drop it and start over with a full capture.
+# arguments[0]: selector list, arguments[1]: per-selector element cap, arguments[2]: reset
+INCREMENTAL_SCRIPT = JS_HELPERS + r"""
+var selectors = arguments[0], limit = arguments[1], reset = arguments[2];
+var joined = selectors.join(',');
+var maxTracked = limit * selectors.length;
+var state = window.__shizaCapture;
+
+if (reset && state && state.observer) {
+    state.observer.disconnect();
+    state = window.__shizaCapture = null;
+}
+
+function track(el, data) {
+    var id = state.ids.get(el);
+    if (!id) {
+        id = state.nextId++;
+        state.ids.set(el, id);
+    }
+    state.tracked.set(id, el);
+    state.boxes.set(id, data.bounds.join());
+    return id;
+}
+
+if (!state || !state.observer) {
+    state = window.__shizaCapture = {
+        nextId: 1, ids: new WeakMap(), tracked: new Map(), boxes: new Map(),
+        dirty: new Set(), version: 0
+    };
+    state.observer = new MutationObserver(function (records) {
+        state.version += records.length;
+        for (var i = 0; i < records.length; i++) {
+            var target = records[i].target;
+            var node = target.nodeType === 1 ? target : target.parentElement;
+            if (node) state.dirty.add(node);
+        }
+    });
+    state.observer.observe(document.documentElement, {
+        subtree: true, childList: true, attributes: true, characterData: true
+    });
+    var elements = [], seen = new Set();
+    for (var s = 0; s < selectors.length; s++) {
+        var nodes = document.querySelectorAll(selectors[s]), taken = 0;
+        for (var i = 0; i < nodes.length && taken < limit; i++) {
+            if (seen.has(nodes[i])) continue;
+            var data = __shizaDescribe(nodes[i]);
+            if (!data) continue;
+            seen.add(nodes[i]);
+            data.id = track(nodes[i], data);
+            elements.push(data);
+            taken++;
+        }
+    }
+    return {full: true, version: state.version, elements: elements, moved: [], removed: []};
+}
+
+var updated = [], moved = [], removed = [], touched = new Set();
+
+function untrack(id) {
+    state.tracked.delete(id);
+    state.boxes.delete(id);
+    removed.push(id);
+}
+
+// Keep only the outermost dirty nodes that are still in the document
+var dirty = Array.from(state.dirty).filter(function (n) { return n.isConnected; });
+var dirtySet = new Set(dirty);
+state.dirty.clear();
+var roots = dirty.filter(function (n) {
+    for (var p = n.parentElement; p; p = p.parentElement) {
+        if (dirtySet.has(p)) return false;
+    }
+    return true;
+});
+
+for (var r = 0; r < roots.length; r++) {
+    var candidates = Array.from(roots[r].querySelectorAll(joined));
+    if (roots[r].matches(joined)) candidates.push(roots[r]);
+    for (var c = 0; c < candidates.length; c++) {
+        var el = candidates[c];
+        if (touched.has(el)) continue;
+        touched.add(el);
+        var knownId = state.ids.get(el);
+        var known = knownId !== undefined && state.tracked.has(knownId);
+        var data = __shizaDescribe(el);
+        if (data) {
+            if (!known && state.tracked.size >= maxTracked) continue;
+            data.id = track(el, data);
+            updated.push(data);
+        } else if (known) {
+            untrack(knownId);
+        }
+    }
+}
+
+// Drop elements that left the document or were hidden; report boxes that moved
+state.tracked.forEach(function (el, id) {
+    if (touched.has(el)) return;
+    var box = el.isConnected && __shizaIsVisible(el) ? __shizaBox(el) : null;
+    if (!box) {
+        untrack(id);
+    } else if (box.bounds.join() !== state.boxes.get(id)) {
+        state.boxes.set(id, box.bounds.join());
+        moved.push({id: id, coordinates: box.center, bounds: box.bounds});
+    }
+});
+
+return {full: false, version: state.version, elements: updated, moved: moved, removed: removed};
+"""
+
+# Scroll offset and viewport size, so consumers of page coordinates can tell what is on screen
+VIEWPORT_SCRIPT = "return [window.scrollX, window.scrollY, window.innerWidth, window.innerHeight];"
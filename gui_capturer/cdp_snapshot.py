@@ -0,0 +1,169 @@
+from config import Config
+from utils.logger import Logger
+from gui_capturer.capture_scripts import INTERACTIVE_SELECTORS
+
+# Computed styles requested from DOMSnapshot; indexes into layout.styles follow this order
+SNAPSHOT_STYLES = ['display', 'visibility', 'opacity', 'z-index', 'position']
+
+NODE_TYPE_ELEMENT = 1
+LABEL_ATTRIBUTES = ['aria-label', 'placeholder', 'title', 'alt', 'name', 'value']
+
+
+class CDPSnapshotBackend:
+    """Capture the UI tree for the whole document (iframes included) with one
+    DOMSnapshot.captureSnapshot call and flatten it into the ui_tree schema."""
+
+    def __init__(self):
+        self.logger = Logger()
+
+    def capture(self, driver):
+        """Run DOMSnapshot.captureSnapshot on a Chrome driver and return {"elements": [...]}"""
+        snapshot = driver.execute_cdp_cmd('DOMSnapshot.captureSnapshot', {
+            'computedStyles': SNAPSHOT_STYLES,
+            'includeDOMRects': True
+        })
+        return self.flatten(snapshot)
+
+    def flatten(self, snapshot, limit=None):
+        """Flatten a DOMSnapshot result into the same element dicts UICapturer builds"""
+        if limit is None:
+            limit = Config.MAX_UI_ELEMENTS_TO_CAPTURE
+
+        strings = snapshot.get('strings', [])
+        documents = snapshot.get('documents', [])
+        offsets = self._document_offsets(documents)
+
+        # Mirror the per-selector cap of the selector loop: elements count against the
+        # first selector they would have matched.
+        taken = {}
+        elements = []
+        for doc_index, document in enumerate(documents):
+            offset_x, offset_y = offsets.get(doc_index, (0, 0))
+            nodes = document.get('nodes', {})
+            node_names = nodes.get('nodeName', [])
+            node_types = nodes.get('nodeType', [])
+            attributes = nodes.get('attributes', [])
+            input_values = self._rare_strings(nodes.get('inputValue'))
+
+            layout = document.get('layout', {})
+            for layout_index, node_index in enumerate(layout.get('nodeIndex', [])):
+                if node_types[node_index] != NODE_TYPE_ELEMENT:
+                    continue
+                tag = strings[node_names[node_index]].lower()
+                attrs = self._attributes(attributes[node_index], strings)
+
+                selector_key = self._selector_key(tag, attrs)
+                if selector_key is None or taken.get(selector_key, 0) >= limit:
+                    continue
+                if not self._is_visible(layout['styles'][layout_index], strings):
+                    continue
+                if 'disabled' in attrs or attrs.get('aria-disabled') == 'true':
+                    continue
+
+                x, y, width, height = layout['bounds'][layout_index]
+                x, y = x + offset_x, y + offset_y
+                if width <= 0 or height <= 0 or x < 0 or y < 0:
+                    continue
+
+                if node_index in input_values:
+                    attrs['value'] = input_values[node_index]
+                elements.append({
+                    "type": self._element_type(tag, attrs),
+                    "label": self._element_label(tag, attrs),
+                    "coordinates": [int(x + width / 2), int(y + height / 2)],
+                    "bounds": [round(x), round(y), round(width), round(height)],
+                    "z": self._z_index(layout['styles'][layout_index], strings)
+                })
+                taken[selector_key] = taken.get(selector_key, 0) + 1
+
+        return {"elements": elements}
+
+    def _document_offsets(self, documents):
+        """Page offset of every document; iframe documents are placed at their frame element"""
+        offsets = {0: (0, 0)}
+        for doc_index, document in enumerate(documents):
+            content_docs = document.get('nodes', {}).get('contentDocumentIndex', {})
+            if not content_docs:
+                continue
+            layout = document.get('layout', {})
+            bounds_by_node = dict(zip(layout.get('nodeIndex', []), layout.get('bounds', [])))
+            parent_x, parent_y = offsets.get(doc_index, (0, 0))
+            for node_index, child_index in zip(content_docs.get('index', []), content_docs.get('value', [])):
+                frame_bounds = bounds_by_node.get(node_index)
+                if not frame_bounds:
+                    continue
+                child = documents[child_index] if child_index < len(documents) else {}
+                offsets[child_index] = (
+                    parent_x + frame_bounds[0] - child.get('scrollOffsetX', 0),
+                    parent_y + frame_bounds[1] - child.get('scrollOffsetY', 0)
+                )
+        return offsets
+
+    def _attributes(self, flat_attributes, strings):
+        """Attribute list [name, value, name, value, ...] of string indexes -> dict"""
+        return {
+            strings[flat_attributes[i]].lower(): strings[flat_attributes[i + 1]]
+            for i in range(0, len(flat_attributes) - 1, 2)
+        }
+
+    def _rare_strings(self, rare_data):
+        """RareStringData {index: [...], value: [...]} -> {node_index: string}"""
+        if not rare_data:
+            return {}
+        return dict(zip(rare_data.get('index', []), rare_data.get('value', [])))
+
+    def _selector_key(self, tag, attrs):
+        """The first INTERACTIVE_SELECTORS entry this element would match, or None"""
+        role = attrs.get('role')
+        candidates = [
+            tag,
+            f"[role='{role}']",
+            "[tabindex]:not([tabindex='-1'])" if attrs.get('tabindex', '-1') != '-1' else None,
+            f"{tag}[onclick]" if 'onclick' in attrs else None
+        ]
+        for selector in candidates:
+            if selector in INTERACTIVE_SELECTORS:
+                return selector
+        return None
+
+    def _is_visible(self, style_indexes, strings):
+        """Apply the display/visibility/opacity checks from the computed styles"""
+        styles = dict(zip(SNAPSHOT_STYLES, [strings[i] if i >= 0 else '' for i in style_indexes]))
+        if styles.get('display') == 'none' or styles.get('visibility') in ('hidden', 'collapse'):
+            return False
+        try:
+            return float(styles.get('opacity') or 1) > 0
+        except ValueError:
+            return True
+
+    def _z_index(self, style_indexes, strings):
+        """Own z-index of a positioned element (ancestor stacking contexts are not resolved)"""
+        styles = dict(zip(SNAPSHOT_STYLES, [strings[i] if i >= 0 else '' for i in style_indexes]))
+        if styles.get('position') in ('', 'static'):
+            return 0
+        try:
+            return int(styles.get('z-index'))
+        except (TypeError, ValueError):
+            return 0
+
+    def _element_type(self, tag, attrs):
+        """Same mapping as UICapturer._get_element_type"""
+        if tag == 'input':
+            return f"input_{(attrs.get('type') or 'text').lower()}"
+        elif tag == 'a':
+            return 'link'
+        elif tag == 'img':
+            return 'image'
+        elif tag in ('select', 'textarea'):
+            return tag
+        elif attrs.get('role'):
+            return f"role_{attrs['role']}"
+        return tag
+
+    def _element_label(self, tag, attrs):
+        """Same lookup order as UICapturer._get_element_label"""
+        for attr in LABEL_ATTRIBUTES:
+            label = attrs.get(attr)
+            if label and label.strip():
+                return label.strip()[:50]
+        return f"{tag}_{attrs.get('type') or 'unknown'}"
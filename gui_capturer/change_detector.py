@@ -0,0 +1,70 @@
+import hashlib
+import io
+from utils.screenshot_store import dhash
+
+try:
+    from PIL import Image
+except ImportError:  # Without Pillow the frame is compared by exact content hash
+    Image = None
+
+# DOM mutation counter, installed on the first call on each document (whatever UI_CAPTURE_MODE is,
+# so small updates like a toast or a relabelled button count even when the frame hash misses them),
+# plus a hash of form field state: typing changes .value, which neither the observer nor the frame hash sees
+DOM_VERSION_SCRIPT = r"""
+var c = window.__shizaChanges, h = 0;
+if (!c) {
+    c = window.__shizaChanges = {count: 0};
+    new MutationObserver(function (records) { c.count += records.length; })
+        .observe(document.documentElement, {subtree: true, childList: true, attributes: true, characterData: true});
+}
+var fields = document.querySelectorAll('input, textarea, select');
+for (var i = 0; i < fields.length; i++) {
+    var v = fields[i].value + (fields[i].checked ? '\u0001' : '\u0000');
+    for (var j = 0; j < v.length; j++) h = (h * 31 + v.charCodeAt(j)) | 0;
+}
+return [c.count, h];
+"""
+
+
+class ChangeDetector:
+    """Cheap "did anything change since last step?" check.
+
+    A state fingerprint is (url, DOM mutation counter and form-value hash,
+    perceptual hash of the screenshot). Comparing fingerprints costs one small
+    script call and a hash of the frame the step already grabbed, instead of a
+    full UI tree capture. When the script cannot run, the frame is compared
+    byte for byte instead, since a perceptual hash alone misses small updates.
+    The check is conservative: any differing component counts as a change.
+    """
+
+    def __init__(self):
+        self.previous = None
+
+    def fingerprint(self, driver, png_bytes):
+        try:
+            url = driver.current_url
+            state = driver.execute_script(DOM_VERSION_SCRIPT)
+            dom_version = tuple(state) if state else None
+        except Exception:
+            url, dom_version = None, None
+        return (url, dom_version, self._frame_hash(png_bytes, exact=dom_version is None))
+
+    def check(self, driver, png_bytes):
+        """Record the current fingerprint; returns True if it differs from the previous one"""
+        current = self.fingerprint(driver, png_bytes)
+        changed = current != self.previous
+        self.previous = current
+        return changed
+
+    def reset(self):
+        self.previous = None
+
+    def _frame_hash(self, png_bytes, exact=False):
+        if png_bytes is None:
+            return None
+        if Image is not None and not exact:
+            try:
+                return dhash(Image.open(io.BytesIO(png_bytes)), hash_size=16)
+            except Exception:
+                pass
+        return hashlib.blake2b(png_bytes, digest_size=16).hexdigest()
@@ -0,0 +1,118 @@
+import math
+from config import Config
+
+
+class SpatialIndex:
+    """Uniform-grid index over captured element rectangles (page coordinates).
+
+    Answers "which element is under this point" and "which element is nearest
+    to this point" locally, without a browser round trip. Elements without
+    bounds (e.g. demo ui_trees that only carry coordinates) are indexed as
+    zero-size rectangles at their center. Overlaps are resolved by z-order:
+    higher effective z-index first, then later document order.
+    """
+
+    def __init__(self, elements=None, cell_size=None):
+        self.cell_size = cell_size or Config.SPATIAL_INDEX_CELL_SIZE
+        self.cells = {}
+        self.items = []  # (x, y, width, height, z, order, element)
+        self.extent = None  # (min cell x, max cell x, min cell y, max cell y)
+        for element in elements or []:
+            self.insert(element)
+
+    def insert(self, element):
+        bounds = element.get('bounds')
+        if bounds:
+            x, y, width, height = bounds
+        else:
+            x, y = element['coordinates']
+            width = height = 0
+        item = (x, y, width, height, element.get('z', 0), len(self.items), element)
+        self.items.append(item)
+
+        cells = self._cells_for(x, y, width, height)
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(item)
+
+        (x0, y0), (x1, y1) = cells[0], cells[-1]
+        if self.extent is None:
+            self.extent = (x0, x1, y0, y1)
+        else:
+            self.extent = (min(self.extent[0], x0), max(self.extent[1], x1),
+                           min(self.extent[2], y0), max(self.extent[3], y1))
+
+    def element_at(self, x, y):
+        """Topmost element whose rectangle contains the point, or None"""
+        best = None
+        for item in self.cells.get(self._cell(x, y), []):
+            ix, iy, width, height = item[:4]
+            if ix <= x <= ix + width and iy <= y <= iy + height:
+                if best is None or item[4:6] > best[4:6]:
+                    best = item
+        return best[6] if best else None
+
+    def elements_at(self, x, y):
+        """All elements containing the point, topmost first"""
+        hits = [
+            item for item in self.cells.get(self._cell(x, y), [])
+            if item[0] <= x <= item[0] + item[2] and item[1] <= y <= item[1] + item[3]
+        ]
+        hits.sort(key=lambda item: item[4:6], reverse=True)
+        return [item[6] for item in hits]
+
+    def nearest(self, x, y, max_distance=None):
+        """Element closest to the point (distance 0 inside its rectangle), ties broken by z-order"""
+        if not self.items:
+            return None
+        cx, cy = self._cell(x, y)
+        max_ring = self._max_ring(cx, cy)
+        if max_distance is not None:
+            max_ring = min(max_ring, int(math.ceil(max_distance / self.cell_size)) + 1)
+
+        best, best_key = None, None
+        for ring in range(max_ring + 1):
+            # Everything outside this ring is at least (ring - 1) cells away
+            if best is not None and best_key[0] < ((ring - 1) * self.cell_size) ** 2:
+                break
+            for cell in self._ring(cx, cy, ring):
+                for item in self.cells.get(cell, []):
+                    key = (self._distance_sq(item, x, y), -item[4], -item[5])
+                    if best_key is None or key < best_key:
+                        best, best_key = item, key
+
+        if best is None:
+            return None
+        if max_distance is not None and best_key[0] > max_distance ** 2:
+            return None
+        return best[6]
+
+    def _distance_sq(self, item, x, y):
+        ix, iy, width, height = item[:4]
+        dx = max(ix - x, 0, x - (ix + width))
+        dy = max(iy - y, 0, y - (iy + height))
+        return dx * dx + dy * dy
+
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def _cells_for(self, x, y, width, height):
+        x0, y0 = self._cell(x, y)
+        x1, y1 = self._cell(x + width, y + height)
+        return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+
+    def _ring(self, cx, cy, ring):
+        if ring == 0:
+            return [(cx, cy)]
+        cells = []
+        for dx in range(-ring, ring + 1):
+            cells.append((cx + dx, cy - ring))
+            cells.append((cx + dx, cy + ring))
+        for dy in range(-ring + 1, ring):
+            cells.append((cx - ring, cy + dy))
+            cells.append((cx + ring, cy + dy))
+        return cells
+
+    def _max_ring(self, cx, cy):
+        """Ring count needed to reach every occupied cell from (cx, cy)"""
+        min_x, max_x, min_y, max_y = self.extent
+        return max(abs(cx - min_x), abs(cx - max_x), abs(cy - min_y), abs(cy - max_y))
@@ -1,17 +1,32 @@
 import os
 import json
-from selenium import webdriver
+import time
 from selenium.webdriver.common.by import By
 # Removed Service, ChromeDriverManager as they are now handled by main.py
 from config import Config
 from utils.logger import Logger
+from gui_capturer.capture_scripts import INTERACTIVE_SELECTORS, SNAPSHOT_SCRIPT, INCREMENTAL_SCRIPT, VIEWPORT_SCRIPT
+from gui_capturer.cdp_snapshot import CDPSnapshotBackend
+from gui_capturer.change_detector import ChangeDetector
+from gui_capturer.spatial_index import SpatialIndex
+from utils.screenshot_writer import ScreenshotWriter
 # Removed glob as it's now handled by main.py
 
 class UICapturer:
     #  CHANGED: Constructor now accepts a driver instance
-    def __init__(self, driver_instance):
+    def __init__(self, driver_instance, run_prefix=''):
         self.logger = Logger()
         self.driver = driver_instance #  ASSIGN: Use the provided driver instance
+        self.run_prefix = run_prefix # Screenshot file name prefix, e.g. 'job7_', so concurrent runs do not overwrite each other
+        self.last_capture_stats = {} # Timing of the most recent UI tree capture
+        self._element_cache = {} # Incremental mode: stable element id -> element data
+        self.dom_version = None # Mutation counter reported by the in-page observer
+        self.cdp_backend = CDPSnapshotBackend()
+        self.screenshot_writer = ScreenshotWriter.shared()
+        self.change_detector = ChangeDetector()
+        self.state_changed = True # False when the last capture_state saw the same screen as the one before
+        self._last_ui_tree = None
+        self.spatial_index = SpatialIndex() # Hit-testing over the elements of the latest capture
         self.logger.log(" UICapturer initialized with shared driver.")
 
     #  REMOVED: get_driver method, as the driver is now set externally
@@ -26,33 +41,146 @@ class UICapturer:
             self.logger.log(" UICapturer: Driver not set. Cannot capture state.")
             return None, None
 
-        # Take screenshot
-        screenshot_path = os.path.join(
-            Config.SCREENSHOTS_DIR,
-            f"step{step_number}.png"
-        )
-        self.driver.save_screenshot(screenshot_path)
-        self.logger.log(f" Screenshot saved to: {screenshot_path}")
+        # Take screenshot (written in the background; None if the policy skips step frames)
+        png_bytes = self.driver.get_screenshot_as_png() if Config.DETECT_SCREEN_CHANGES else None
+        screenshot_path = self.capture_screenshot(step_number, png_bytes=png_bytes)
+
+        # Skip rebuilding the UI tree when neither the screen nor the DOM changed
+        self.state_changed = True
+        if Config.DETECT_SCREEN_CHANGES:
+            self.state_changed = self.change_detector.check(self.driver, png_bytes)
+        if not self.state_changed and self._last_ui_tree is not None:
+            self.logger.log(" UICapturer: Screen unchanged since last step, reusing UI tree.")
+            return screenshot_path, self._last_ui_tree
 
         # Build UI tree
-        ui_tree = self._build_ui_tree(self.driver)
+        ui_tree = self.capture_ui_tree()
+        self._last_ui_tree = ui_tree
 
         return screenshot_path, ui_tree
 
+    def capture_screenshot(self, step_number, event='step', png_bytes=None):
+        """Grab the screen as in-memory PNG and queue it for the background writer.
+
+        event is 'step', 'failure' or 'final'; Config.SCREENSHOT_POLICY decides which are kept.
+        png_bytes reuses a frame the caller already grabbed.
+        """
+        if not ScreenshotWriter.wants(event, Config.SCREENSHOT_POLICY):
+            return None
+
+        suffix = '' if event == 'step' else f"_{event}"
+        name = f"{self.run_prefix}step{step_number}{suffix}.png"
+        if png_bytes is None:
+            png_bytes = self.driver.get_screenshot_as_png()
+        screenshot_path = self.screenshot_writer.submit(png_bytes, os.path.join(Config.SCREENSHOTS_DIR, name))
+        if screenshot_path:
+            self.logger.log(f" Screenshot queued for: {screenshot_path}")
+        return screenshot_path
+
+    def capture_ui_tree(self):
+        """Build the UI tree with the configured capture mode and record its timing"""
+        mode = Config.UI_CAPTURE_MODE
+        start = time.perf_counter()
+        self.last_capture_stats = {"mode": mode}
+        if mode == 'incremental':
+            ui_tree = self._build_ui_tree_incremental(self.driver)
+        elif mode == 'cdp':
+            ui_tree = self._build_ui_tree_cdp(self.driver)
+        elif mode == 'snapshot':
+            ui_tree = self._build_ui_tree_snapshot(self.driver)
+        else:
+            ui_tree = self._build_ui_tree(self.driver)
+
+        # Rectangles and z-order feed the spatial index; the ui_tree keeps its compact schema
+        # (no incremental tracking ids either, they mean nothing to the LLM)
+        self.spatial_index = SpatialIndex(ui_tree["elements"])
+        ui_tree = {"elements": [
+            {key: value for key, value in element.items() if key not in ('bounds', 'z', 'id')}
+            for element in ui_tree["elements"]
+        ]}
+        try:
+            ui_tree["viewport"] = self.driver.execute_script(VIEWPORT_SCRIPT) # [scrollX, scrollY, width, height]
+        except Exception:
+            pass
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.last_capture_stats.update({
+            "elapsed_ms": round(elapsed_ms, 1),
+            "elements": len(ui_tree["elements"])
+        })
+        self.logger.log(f" Captured {len(ui_tree['elements'])} interactive UI elements in {elapsed_ms:.1f} ms ({mode}).")
+        return ui_tree
+
+    def _build_ui_tree_cdp(self, driver):
+        """Build the UI tree (iframes included) from one CDP DOMSnapshot.captureSnapshot call"""
+        try:
+            return self.cdp_backend.capture(driver)
+        except Exception as e:
+            # Non-Chrome drivers have no execute_cdp_cmd
+            self.logger.log(f" UICapturer: CDP snapshot failed, falling back to injected snapshot: {e}")
+            return self._build_ui_tree_snapshot(driver)
+
+    def _build_ui_tree_incremental(self, driver):
+        """Merge only the elements the in-page observer marked dirty into the cached tree"""
+        # Without a synced cache (new capturer, or after a fallback) a diff would be merged into
+        # nothing, so make the page drop observer state another capturer may have left behind
+        reset = self.dom_version is None
+        try:
+            result = driver.execute_script(
+                INCREMENTAL_SCRIPT, INTERACTIVE_SELECTORS, Config.MAX_UI_ELEMENTS_TO_CAPTURE, reset
+            )
+        except Exception as e:
+            self.logger.log(f" UICapturer: Incremental capture failed, falling back to full snapshot: {e}")
+            self._element_cache = {}
+            self.dom_version = None
+            return self._build_ui_tree_snapshot(driver)
+
+        if result.get("full"):
+            # New document (first capture or navigation dropped the observer)
+            self._element_cache = {}
+
+        for element in result.get("elements", []):
+            self._element_cache[element["id"]] = element
+        for moved in result.get("moved", []):
+            if moved["id"] in self._element_cache:
+                self._element_cache[moved["id"]]["coordinates"] = moved["coordinates"]
+                self._element_cache[moved["id"]]["bounds"] = moved["bounds"]
+        for element_id in result.get("removed", []):
+            self._element_cache.pop(element_id, None)
+
+        self.dom_version = result.get("version")
+        self.last_capture_stats.update({
+            "full": bool(result.get("full")),
+            "changed": len(result.get("elements", [])),
+            "moved": len(result.get("moved", [])),
+            "removed": len(result.get("removed", []))
+        })
+        if not result.get("full"):
+            self.logger.log(
+                f" UICapturer: Incremental update - {self.last_capture_stats['changed']} changed, "
+                f"{self.last_capture_stats['moved']} moved, {self.last_capture_stats['removed']} removed."
+            )
+
+        return {"elements": [dict(self._element_cache[element_id]) for element_id in sorted(self._element_cache)]}
+
+    def _build_ui_tree_snapshot(self, driver):
+        """Build the UI tree with one injected script instead of per-element WebDriver calls"""
+        try:
+            result = driver.execute_script(
+                SNAPSHOT_SCRIPT, INTERACTIVE_SELECTORS, Config.MAX_UI_ELEMENTS_TO_CAPTURE
+            )
+            return {"elements": result.get("elements", [])}
+        except Exception as e:
+            self.logger.log(f" UICapturer: Snapshot capture failed, falling back to selector loop: {e}")
+            return self._build_ui_tree(driver)
+
     def _build_ui_tree(self, driver):
         """Build minimal UI tree from DOM using the shared driver"""
         elements = []
 
         try:
             # Find interactive elements
-            selectors = [
-                "input", "button", "a", "select", "textarea",
-                "[role='button']", "[role='link']", "[role='textbox']",
-                "[tabindex]:not([tabindex='-1'])", #  ADDED: Elements with tabindex
-                "div[onclick]", "span[onclick]" #  ADDED: Common clickable divs/spans
-            ]
-
-            for selector in selectors:
+            for selector in INTERACTIVE_SELECTORS:
                 web_elements = driver.find_elements(By.CSS_SELECTOR, selector)
                 #  IMPROVED: Filter for visible/enabled elements earlier
                 visible_elements = [el for el in web_elements if el.is_displayed() and el.is_enabled()]
@@ -67,7 +195,8 @@ class UICapturer:
                                 "coordinates": [
                                     int(rect['x'] + rect['width'] / 2),
                                     int(rect['y'] + rect['height'] / 2)
-                                ]
+                                ],
+                                "bounds": [int(rect['x']), int(rect['y']), int(rect['width']), int(rect['height'])]
                             }
                             elements.append(element_data)
                     except Exception as inner_e:
@@ -77,7 +206,6 @@ class UICapturer:
         except Exception as e:
             self.logger.log(f"Error building UI tree: {str(e)}")
 
-        self.logger.log(f" Captured {len(elements)} interactive UI elements.")
         return {"elements": elements}
 
     def _get_element_type(self, element):
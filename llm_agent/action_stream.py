@@ -0,0 +1,74 @@
+import json
+
+ACTION_FIELDS = ('action_type', 'target_element', 'additional_input')
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\r\n'
+
+
+class ActionStreamParser:
+    """Incremental parser for the action JSON in a streamed completion.
+
+    feed() takes text deltas as they arrive and returns the action dict as
+    soon as action_type, target_element and additional_input all have complete
+    values, or when the object closes (missing fields then get the same
+    defaults as LLMAgent._parse_response). Returns None until then.
+    complete() tells whether the text holds a whole action object, i.e. is
+    safe to cache.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self.action = None
+
+    def feed(self, delta):
+        self.text += delta
+        if self.action is None:
+            fields, closed = self._scan()
+            if closed or all(field in fields for field in ACTION_FIELDS):
+                fields.setdefault('action_type', 'wait')
+                fields.setdefault('target_element', 'unknown')
+                self.action = fields
+                return fields
+        return None
+
+    def complete(self):
+        """Whether the text so far contains a closed action object with an action_type"""
+        fields, closed = self._scan()
+        return closed and 'action_type' in fields
+
+    def _scan(self):
+        """(complete top-level fields so far, whether the object has closed)"""
+        text, fields = self.text, {}
+        pos = text.find('{')
+        if pos < 0:
+            return fields, False
+        pos += 1
+        while True:
+            pos = self._skip(text, pos, _WHITESPACE + ',')
+            if pos >= len(text):
+                return fields, False
+            if text[pos] == '}':
+                return fields, True
+            try:
+                key, pos = _decoder.raw_decode(text, pos)
+            except ValueError:
+                return fields, False
+            pos = self._skip(text, pos, _WHITESPACE)
+            if pos >= len(text) or text[pos] != ':':
+                return fields, False
+            pos = self._skip(text, pos + 1, _WHITESPACE)
+            try:
+                value, end = _decoder.raw_decode(text, pos)
+            except ValueError:
+                return fields, False
+            # A number or literal at the end of the buffer may still be growing
+            if not isinstance(value, str) and self._skip(text, end, _WHITESPACE) >= len(text):
+                return fields, False
+            fields[key] = value
+            pos = end
+
+    def _skip(self, text, pos, characters):
+        while pos < len(text) and text[pos] in characters:
+            pos += 1
+        return pos
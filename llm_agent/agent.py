@@ -1,7 +1,13 @@
 import json
-import requests
+import threading
+import time
+from collections import deque
 from config import Config
+from llm_agent.action_stream import ActionStreamParser
+from llm_agent.http_client import LLMHttpClient, LLMRequestError, latency_summary
+from llm_agent.prompt_compiler import estimate_tokens
 from llm_agent.prompt_templates import PromptTemplates
+from llm_agent.response_cache import ResponseCache
 from utils.logger import Logger
 import traceback
 
@@ -9,32 +15,55 @@ class LLMAgent:
     def __init__(self):
         self.logger = Logger()
         self.prompt_templates = PromptTemplates()
-        
+        self.http_client = LLMHttpClient.shared()
+        self.response_cache = ResponseCache.shared() if Config.LLM_CACHE_ENABLED else None
+        self.stream_timings = deque(maxlen=Config.LLM_LATENCY_HISTORY) # time to first action vs total, per streamed call
+        self._init_cache_tracking()
+
+    def _init_cache_tracking(self):
+        self.last_cache_key = None  # cache key of the last suggestion, for invalidate_last()
+        self._draining = set()      # keys whose streamed response is still being read (stored when it ends)
+        self._rejected = set()      # draining keys whose action failed: not stored when the stream ends
+        self._pending_lock = threading.Lock()
+
     def get_action_suggestion(self, instruction, ui_tree, retrieved_examples, screenshot_path, action_history=None):
         """Get action suggestion from LLM with action history"""
+        self.last_cache_key = None
         try:
-            prompt = self.prompt_templates.build_action_prompt(
-                instruction, ui_tree, retrieved_examples, screenshot_path, action_history
-            )
+            prompt = self._build_prompt(instruction, ui_tree, retrieved_examples, screenshot_path, action_history)
             # self.logger.log(f"LLM Prompt:\n{prompt}\n")
             
-            response = self._call_openai_api(prompt)
+            request_data = self._build_request(prompt)
+            cache_key, response = self._cache_lookup(request_data)
+            self.last_cache_key = cache_key
+            if response is None and Config.LLM_STREAMING:
+                return self._stream_action(request_data, cache_key)
+            if response is None:
+                response = self._call_openai_api(request_data)
+                self._cache_store(cache_key, response)
             action_suggestion = self._parse_response(response)
             
             return action_suggestion
             
         except Exception as e:
             self.logger.log(f"Error getting LLM suggestion: {str(e)}")
-            return {"action_type": "wait", "target_element": "unknown"}
+            # 'error' lets the run stop instead of waiting for manual input
+            return {"action_type": "wait", "target_element": "unknown", "error": str(e)}
             
-    def _call_openai_api(self, prompt):
-        """Call OpenAI API"""
-        headers = {
-            'Authorization': f'Bearer {Config.OPENAI_API_KEY}',
-            'Content-Type': 'application/json'
-        }
-        
-        data = {
+    def _build_prompt(self, instruction, ui_tree, retrieved_examples, screenshot_path, action_history=None):
+        """Action prompt, logging how many tokens the compiled UI table saved over raw JSON"""
+        prompt = self.prompt_templates.build_action_prompt(
+            instruction, ui_tree, retrieved_examples, screenshot_path, action_history
+        )
+        stats = self.prompt_templates.last_ui_stats
+        if stats:
+            self.logger.log(f"Prompt UI table: {stats['kept']}/{stats['elements']} elements, ~{stats['tokens']} tokens "
+                            f"(saved ~{stats['saved']} of {stats['raw_tokens']} vs raw JSON; prompt ~{estimate_tokens(prompt)})")
+        return prompt
+
+    def _build_request(self, prompt):
+        """Chat completion request body for a prompt"""
+        return {
             'model': 'gpt-3.5-turbo',
             'messages': [
                 {
@@ -50,15 +79,109 @@ class LLMAgent:
             'temperature': 0.1
         }
         
-        response = requests.post(Config.OPENAI_API_URL, headers=headers, json=data)
+    def _cache_lookup(self, request_data):
+        """(cache key, cached response or None); the key is None when caching is off"""
+        if not self.response_cache:
+            return None, None
+        cache_key = self.response_cache.key(request_data)
+        response = self.response_cache.get(cache_key)
+        if response is not None:
+            self.logger.log(f"LLM response served from cache (hit rate {self.response_cache.hit_rate():.0%})")
+        return cache_key, response
+
+    def _cache_store(self, cache_key, response):
+        if cache_key:
+            self.response_cache.put(cache_key, response)
+
+    def invalidate_last(self):
+        """Forget the cached response behind the last suggestion (its action failed), so an
+        identical prompt asks the model again instead of replaying the same action"""
+        cache_key, self.last_cache_key = self.last_cache_key, None
+        if not cache_key:
+            return
+        with self._pending_lock:
+            if cache_key in self._draining:
+                self._rejected.add(cache_key)
+        self.response_cache.invalidate(cache_key)
+        self.logger.log("Cached LLM response invalidated after the action failed")
+
+    def _start_draining(self, cache_key):
+        if cache_key:
+            with self._pending_lock:
+                self._draining.add(cache_key)
+
+    def _stop_draining(self, cache_key):
+        """True when the key's action failed while its stream was still being read"""
+        with self._pending_lock:
+            self._draining.discard(cache_key)
+            rejected = cache_key in self._rejected
+            self._rejected.discard(cache_key)
+        return rejected
+
+    def _stream_action(self, request_data, cache_key):
+        """Return the action as soon as its fields have streamed in; the rest of the
+        completion is read in the background (for the cache and the total latency)"""
+        start = time.monotonic()
+        parser = ActionStreamParser()
+        stream = self.http_client.stream_content(request_data)
+        for delta in stream:
+            action = parser.feed(delta)
+            if action:
+                first_action = time.monotonic() - start
+                self.logger.log(f"LLM action ready after {first_action * 1000:.0f} ms (streaming)")
+                self._start_draining(cache_key)
+                threading.Thread(target=self._drain_stream, args=(stream, parser, cache_key, start, first_action),
+                                 name="LLMStreamDrain", daemon=True).start()
+                return action
+        # Stream ended without a complete action object
+        self._stream_finished(parser, cache_key, start, None)
+        if not parser.text.strip():
+            raise LLMRequestError("LLM stream ended without any content")
+        return self._parse_response(parser.text)
+
+    def _drain_stream(self, stream, parser, cache_key, start, first_action):
         try:
-            result = response.json()
+            for delta in stream:
+                parser.feed(delta)
         except Exception as e:
-            self.logger.log(f"Error decoding LLM response JSON: {str(e)}")
-            raise
-        response.raise_for_status()
-        
-        return response.json()['choices'][0]['message']['content']
+            self.logger.log(f"LLM stream failed after the action was dispatched: {e}")
+            self._stop_draining(cache_key)
+            self.stream_timings.append({"elapsed": time.monotonic() - start, "first_action": first_action, "ok": False})
+            return
+        self._stream_finished(parser, cache_key, start, first_action)
+
+    def _stream_finished(self, parser, cache_key, start, first_action):
+        total = time.monotonic() - start
+        complete = parser.complete()
+        rejected = self._stop_draining(cache_key)
+        self.stream_timings.append({"elapsed": total, "first_action": first_action, "ok": complete})
+        if complete and not rejected:
+            self._cache_store(cache_key, parser.text)
+        elif complete:
+            self.logger.log("LLM stream complete; not cached since its action failed")
+        else:
+            # Empty or truncated: caching it would serve a bogus action until the TTL expires
+            self.logger.log(f"LLM stream ended without a complete action object; not cached: {parser.text[:200]!r}")
+        if first_action is not None:
+            self.logger.log(f"LLM stream complete after {total * 1000:.0f} ms "
+                            f"(action dispatched {(total - first_action) * 1000:.0f} ms earlier)")
+
+    def latency_summary(self):
+        """Streamed-call latency: total and time to first action"""
+        return latency_summary(self.stream_timings)
+
+    def latency_report(self):
+        """Recent API call latency of the HTTP client (shared by the process's agents) and, when
+        streaming, this agent's time to first action; see latency_summary() for the fields"""
+        report = {"api": self.http_client.latency_summary()}
+        if self.stream_timings:
+            report["streaming"] = self.latency_summary()
+        return report
+
+    def _call_openai_api(self, data):
+        """Call OpenAI API"""
+        result = self.http_client.post_json(data)
+        return result['choices'][0]['message']['content']
         
     def _parse_response(self, response):
         """Parse LLM response to action format"""
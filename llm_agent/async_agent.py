@@ -0,0 +1,94 @@
+import asyncio
+import time
+from collections import deque
+from config import Config
+from llm_agent.action_stream import ActionStreamParser
+from llm_agent.agent import LLMAgent
+from llm_agent.async_client import AsyncLLMHttpClient
+from llm_agent.http_client import LLMRequestError
+from llm_agent.prompt_templates import PromptTemplates
+from llm_agent.response_cache import ResponseCache
+from utils.logger import Logger
+
+
+class AsyncLLMAgent(LLMAgent):
+    """LLMAgent whose API call is a coroutine (see GUIAutomationAgent.run_automation_async).
+
+    Prompt building, response caching and parsing are shared with LLMAgent.
+    Without an explicit http_client, each call uses the running loop's shared
+    client, so one agent can outlive the loop it first ran on.
+    """
+
+    def __init__(self, http_client=None):
+        self.logger = Logger()
+        self.prompt_templates = PromptTemplates()
+        self.response_cache = ResponseCache.shared() if Config.LLM_CACHE_ENABLED else None
+        self._http_client = http_client
+        self.stream_timings = deque(maxlen=Config.LLM_LATENCY_HISTORY)
+        self._drain_tasks = set()
+        self._init_cache_tracking()
+
+    @property
+    def http_client(self):
+        return self._http_client or AsyncLLMHttpClient.shared()
+
+    async def drain(self):
+        """Wait for completions still streaming in the background (call before closing the client)"""
+        if self._drain_tasks:
+            await asyncio.gather(*self._drain_tasks, return_exceptions=True)
+
+    async def get_action_suggestion(self, instruction, ui_tree, retrieved_examples, screenshot_path, action_history=None):
+        """Get action suggestion from LLM with action history"""
+        self.last_cache_key = None
+        try:
+            prompt = self._build_prompt(instruction, ui_tree, retrieved_examples, screenshot_path, action_history)
+            request_data = self._build_request(prompt)
+            cache_key, response = self._cache_lookup(request_data)
+            self.last_cache_key = cache_key
+            if response is None and Config.LLM_STREAMING:
+                return await self._stream_action(request_data, cache_key)
+            if response is None:
+                response = await self._call_openai_api(request_data)
+                self._cache_store(cache_key, response)
+            return self._parse_response(response)
+
+        except Exception as e:
+            self.logger.log(f"Error getting LLM suggestion: {str(e)}")
+            return {"action_type": "wait", "target_element": "unknown", "error": str(e)}
+
+    async def _stream_action(self, request_data, cache_key):
+        """Return the action as soon as its fields have streamed in; the rest is read by a background task"""
+        start = time.monotonic()
+        parser = ActionStreamParser()
+        stream = self.http_client.stream_content(request_data)
+        async for delta in stream:
+            action = parser.feed(delta)
+            if action:
+                first_action = time.monotonic() - start
+                self.logger.log(f"LLM action ready after {first_action * 1000:.0f} ms (streaming)")
+                self._start_draining(cache_key)
+                task = asyncio.get_running_loop().create_task(
+                    self._drain_stream(stream, parser, cache_key, start, first_action))
+                self._drain_tasks.add(task)
+                task.add_done_callback(self._drain_tasks.discard)
+                return action
+        self._stream_finished(parser, cache_key, start, None)
+        if not parser.text.strip():
+            raise LLMRequestError("LLM stream ended without any content")
+        return self._parse_response(parser.text)
+
+    async def _drain_stream(self, stream, parser, cache_key, start, first_action):
+        try:
+            async for delta in stream:
+                parser.feed(delta)
+        except Exception as e:
+            self.logger.log(f"LLM stream failed after the action was dispatched: {e}")
+            self._stop_draining(cache_key)
+            self.stream_timings.append({"elapsed": time.monotonic() - start, "first_action": first_action, "ok": False})
+            return
+        self._stream_finished(parser, cache_key, start, first_action)
+
+    async def _call_openai_api(self, data):
+        """Call OpenAI API"""
+        result = await self.http_client.post_json(data)
+        return result['choices'][0]['message']['content']
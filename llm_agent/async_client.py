@@ -0,0 +1,143 @@
+import asyncio
+import json
+import threading
+import time
+import weakref
+from collections import deque
+import httpx
+from config import Config
+from utils.logger import Logger
+from llm_agent.http_client import RETRY_STATUSES, LLMRequestError, retry_after_seconds, backoff_delay, latency_summary
+
+
+class AsyncLLMHttpClient:
+    """asyncio counterpart of LLMHttpClient, built on httpx.AsyncClient.
+
+    Same timeouts, retry/backoff and latency records, but a pending call only
+    holds a coroutine, so one event loop can have many agents' requests in
+    flight. A semaphore caps them at LLM_MAX_CONCURRENT_REQUESTS. The client
+    and semaphore belong to the loop they were first used on, so shared()
+    keeps one instance per running loop; close_shared() closes it when that
+    loop's work is done.
+    """
+
+    _shared = weakref.WeakKeyDictionary()  # event loop -> instance
+    _shared_lock = threading.Lock()
+
+    def __init__(self, url=None, api_key=None, max_retries=None, max_concurrent=None):
+        self.logger = Logger()
+        self.url = url or Config.OPENAI_API_URL
+        self.api_key = api_key if api_key is not None else Config.OPENAI_API_KEY
+        self.max_retries = Config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.latencies = deque(maxlen=Config.LLM_LATENCY_HISTORY)
+        self.semaphore = asyncio.Semaphore(max_concurrent or Config.LLM_MAX_CONCURRENT_REQUESTS)
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f'Bearer {self.api_key}'  # httpx rejects the bare 'Bearer ' header
+        self.client = httpx.AsyncClient(
+            headers=headers,
+            timeout=httpx.Timeout(Config.LLM_READ_TIMEOUT, connect=Config.LLM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_keepalive_connections=Config.LLM_POOL_SIZE),
+        )
+
+    @classmethod
+    def shared(cls):
+        """Instance for the running event loop, created on first use"""
+        loop = asyncio.get_running_loop()
+        with cls._shared_lock:
+            client = cls._shared.get(loop)
+            if client is None:
+                client = cls._shared[loop] = cls()
+            return client
+
+    @classmethod
+    async def close_shared(cls):
+        """Close the running loop's instance, if any"""
+        with cls._shared_lock:
+            client = cls._shared.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def post_json(self, data):
+        """POST data and return the decoded JSON body, retrying transient failures"""
+        async with self.semaphore:
+            start = time.monotonic()
+            response, attempts = await self._send(data, start)
+            try:
+                result = response.json()
+            except ValueError as e:
+                self._record(start, attempts, response.status_code, False)
+                raise LLMRequestError(f"Invalid JSON in LLM response: {e}", response.status_code)
+            self._record(start, attempts, response.status_code, True)
+            return result
+
+    async def stream_content(self, data):
+        """POST data with stream=True and yield the completion's text deltas as they arrive (SSE)"""
+        async with self.semaphore:
+            start = time.monotonic()
+            response, attempts = await self._send({**data, 'stream': True}, start, stream=True)
+            first_chunk, ok = None, False
+            try:
+                async for line in response.aiter_lines():
+                    if not line.startswith('data:'):
+                        continue
+                    payload = line[len('data:'):].strip()
+                    if payload == '[DONE]':
+                        break
+                    choices = json.loads(payload).get('choices') or [{}]
+                    content = choices[0].get('delta', {}).get('content')
+                    if content:
+                        if first_chunk is None:
+                            first_chunk = time.monotonic() - start
+                        yield content
+                ok = True
+            except (httpx.HTTPError, ValueError) as e:
+                raise LLMRequestError(f"LLM stream failed: {e}", response.status_code)
+            finally:
+                await response.aclose()
+                self._record(start, attempts, response.status_code, ok, first_chunk=first_chunk)
+
+    def latency_summary(self):
+        return latency_summary(self.latencies)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def _send(self, data, start, stream=False):
+        """(response with a success status, attempts made), retrying 429/5xx and transport errors"""
+        attempt = 0
+        while True:
+            attempt += 1
+            status = None
+            try:
+                request = self.client.build_request('POST', self.url, json=data)
+                response = await self.client.send(request, stream=stream)
+                status = response.status_code
+                if status < 400:
+                    return response, attempt
+                body = (await response.aread()).decode(errors='replace')
+                error = f"HTTP {status}: {body[:200]}"
+                retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+                retryable = status in RETRY_STATUSES
+                await response.aclose()
+            except httpx.LocalProtocolError as e:
+                self._record(start, attempt, status, False)
+                raise LLMRequestError(f"Invalid LLM request: {e}")
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+                retry_after = None
+                retryable = True
+
+            if not retryable or attempt > self.max_retries:
+                self._record(start, attempt, status, False)
+                raise LLMRequestError(f"LLM request failed after {attempt} attempt(s): {error}", status)
+            delay = backoff_delay(attempt, retry_after)
+            self.logger.log(f" LLM request attempt {attempt} failed ({error}); retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def _record(self, start, attempts, status, ok, first_chunk=None):
+        record = {"elapsed": time.monotonic() - start, "attempts": attempts, "status": status, "ok": ok}
+        if first_chunk is not None:
+            record["first_chunk"] = first_chunk
+        self.latencies.append(record)
+        self.logger.log(f" LLM call: {record['elapsed'] * 1000:.0f} ms, {attempts} attempt(s), status {status}")
@@ -0,0 +1,180 @@
+import json
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+from utils.logger import Logger
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LLMRequestError(Exception):
+    """Raised when the API call fails for good (non-retryable status or retries exhausted)"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def retry_after_seconds(value):
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Seconds before retry number `attempt`: Retry-After if given, else exponential with full jitter"""
+    if retry_after is not None:
+        return min(retry_after, Config.LLM_BACKOFF_MAX)
+    return random.uniform(0, min(Config.LLM_BACKOFF_MAX, Config.LLM_BACKOFF_BASE * 2 ** (attempt - 1)))
+
+
+def latency_summary(records):
+    """Count, failures, average and p95 total latency (seconds) of call records,
+    plus the average time to first action for streamed calls that recorded it"""
+    records = list(records)
+    if not records:
+        return {"calls": 0}
+    totals = sorted(record["elapsed"] for record in records)
+    summary = {
+        "calls": len(records),
+        "failures": sum(1 for record in records if not record["ok"]),
+        "avg": sum(totals) / len(totals),
+        "p95": totals[min(len(totals) - 1, int(len(totals) * 0.95))],
+    }
+    first_actions = [record["first_action"] for record in records if record.get("first_action") is not None]
+    if first_actions:
+        summary["avg_first_action"] = sum(first_actions) / len(first_actions)
+    return summary
+
+
+class LLMHttpClient:
+    """Pooled, timeout-bounded JSON POST client for the chat completions API.
+
+    One requests.Session keeps connections alive across steps and workers.
+    Every attempt has connect/read timeouts; 429/5xx responses and connection
+    errors are retried with exponential backoff and full jitter, or after the
+    server's Retry-After when given. stream_content() yields a streamed
+    completion's text as it arrives. Per-call latency is kept in `latencies`.
+    The endpoint comes from OPENAI_API_URL, so tests can point it at a local server.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, url=None, api_key=None, max_retries=None):
+        self.logger = Logger()
+        self.url = url or Config.OPENAI_API_URL
+        self.api_key = api_key if api_key is not None else Config.OPENAI_API_KEY
+        self.max_retries = Config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.timeout = (Config.LLM_CONNECT_TIMEOUT, Config.LLM_READ_TIMEOUT)
+        self.latencies = deque(maxlen=Config.LLM_LATENCY_HISTORY)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.LLM_POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        })
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def post_json(self, data):
+        """POST data and return the decoded JSON body, retrying transient failures"""
+        start = time.monotonic()
+        response, attempts = self._send(data, start)
+        try:
+            result = response.json()
+        except ValueError as e:
+            self._record(start, attempts, response.status_code, False)
+            raise LLMRequestError(f"Invalid JSON in LLM response: {e}", response.status_code)
+        self._record(start, attempts, response.status_code, True)
+        return result
+
+    def stream_content(self, data):
+        """POST data with stream=True and yield the completion's text deltas as they arrive (SSE).
+
+        Only opening the stream is retried; a stream that breaks later raises LLMRequestError.
+        """
+        start = time.monotonic()
+        response, attempts = self._send({**data, 'stream': True}, start, stream=True)
+        first_chunk, ok = None, False
+        # text/event-stream without a charset would otherwise decode as ISO-8859-1
+        response.encoding = 'utf-8'
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                payload = line[len('data:'):].strip()
+                if payload == '[DONE]':
+                    break
+                choices = json.loads(payload).get('choices') or [{}]
+                content = choices[0].get('delta', {}).get('content')
+                if content:
+                    if first_chunk is None:
+                        first_chunk = time.monotonic() - start
+                    yield content
+            ok = True
+        except (requests.RequestException, ValueError) as e:
+            raise LLMRequestError(f"LLM stream failed: {e}", response.status_code)
+        finally:
+            response.close()
+            self._record(start, attempts, response.status_code, ok, first_chunk=first_chunk)
+
+    def latency_summary(self):
+        return latency_summary(self.latencies)
+
+    def close(self):
+        self.session.close()
+
+    def _send(self, data, start, stream=False):
+        """(response with a success status, attempts made), retrying 429/5xx and connection errors"""
+        attempt = 0
+        while True:
+            attempt += 1
+            status = None
+            try:
+                response = self.session.post(self.url, json=data, timeout=self.timeout, stream=stream)
+                status = response.status_code
+                if status < 400:
+                    return response, attempt
+                error = f"HTTP {status}: {response.text[:200]}"
+                retry_after = retry_after_seconds(response.headers.get('Retry-After'))
+                retryable = status in RETRY_STATUSES
+                response.close()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = f"{type(e).__name__}: {e}"
+                retry_after = None
+                retryable = True
+
+            if not retryable or attempt > self.max_retries:
+                self._record(start, attempt, status, False)
+                raise LLMRequestError(f"LLM request failed after {attempt} attempt(s): {error}", status)
+            delay = backoff_delay(attempt, retry_after)
+            self.logger.log(f" LLM request attempt {attempt} failed ({error}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    def _record(self, start, attempts, status, ok, first_chunk=None):
+        record = {"elapsed": time.monotonic() - start, "attempts": attempts, "status": status, "ok": ok}
+        if first_chunk is not None:
+            record["first_chunk"] = first_chunk
+        self.latencies.append(record)
+        self.logger.log(f" LLM call: {record['elapsed'] * 1000:.0f} ms, {attempts} attempt(s), status {status}")
@@ -0,0 +1,105 @@
+import json
+import math
+import re
+from config import Config
+
+STOPWORDS = {
+    'a', 'an', 'the', 'and', 'or', 'to', 'of', 'in', 'on', 'for', 'with', 'at', 'by', 'from', 'is', 'it',
+    'my', 'me', 'i', 'then', 'into', 'this', 'that', 'please', 'go', 'open', 'click', 'type', 'find',
+}
+# Element types the agent acts on most; a small boost when nothing else distinguishes elements
+ACTIONABLE_TYPES = ('input_', 'textarea', 'button', 'role_button', 'select')
+
+_WORD = re.compile(r"[a-z0-9]+")
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """Approximate BPE token count: words/punctuation, long words split every 4 characters"""
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in _TOKEN.findall(text))
+
+
+def _terms(text):
+    return {word for word in _WORD.findall((text or '').lower()) if word not in STOPWORDS and len(word) > 1}
+
+
+class PromptCompiler:
+    """Turns a ui_tree into a compact, relevance-ranked element table for the prompt.
+
+    Elements are scored by label overlap with the instruction (and, less, with
+    recent action targets and inputs), duplicates (same type, label and
+    position, e.g. an element captured by two selectors) are dropped, off-screen elements are dropped unless they match the instruction,
+    and rows are added best-first until PROMPT_UI_TOKEN_BUDGET is reached.
+    """
+
+    def __init__(self, token_budget=None):
+        self.token_budget = token_budget or Config.PROMPT_UI_TOKEN_BUDGET
+
+    def compile(self, ui_tree, instruction, action_history=None):
+        """(table text, stats) where stats has element counts and raw/compiled/saved token estimates"""
+        elements = (ui_tree or {}).get('elements', [])
+        raw_tokens = estimate_tokens(json.dumps(ui_tree, indent=None))
+
+        instruction_terms = _terms(instruction)
+        history_terms = set()
+        for entry in (action_history or [])[-3:]:
+            action = entry.get('action', {})
+            history_terms |= _terms(action.get('target_element')) | _terms(action.get('additional_input'))
+
+        viewport = (ui_tree or {}).get('viewport')
+        ranked, seen = [], set()
+        for position, element in enumerate(elements):
+            label = str(element.get('label', '')).strip()
+            if label:
+                # Unlabeled elements (icon buttons, bare inputs) are told apart only by position
+                identity = (element.get('type'), label.lower(), tuple((element.get('coordinates') or [])[:2]))
+                if identity in seen:
+                    continue
+                seen.add(identity)
+            score = self._score(element, label, instruction_terms, history_terms)
+            if viewport and not self._on_screen(element, viewport) and score < 1:
+                continue
+            ranked.append((-score, position, element, label))
+        ranked.sort(key=lambda item: item[:2])
+
+        header = "type|label|x,y"
+        lines, tokens = [header], estimate_tokens(header)
+        for _, _, element, label in ranked:
+            x, y = (element.get('coordinates') or [0, 0])[:2]
+            row = f"{element.get('type', '')}|{label.replace('|', '/')}|{x},{y}"
+            row_tokens = estimate_tokens(row) + 1
+            if tokens + row_tokens > self.token_budget:
+                break
+            lines.append(row)
+            tokens += row_tokens
+        kept = len(lines) - 1
+        omitted = len(elements) - kept
+        if omitted:
+            lines.append(f"({omitted} less relevant, duplicate or off-screen elements omitted)")
+
+        text = "\n".join(lines)
+        compiled_tokens = estimate_tokens(text)
+        return text, {
+            "elements": len(elements),
+            "kept": kept,
+            "raw_tokens": raw_tokens,
+            "tokens": compiled_tokens,
+            "saved": raw_tokens - compiled_tokens,
+        }
+
+    def _score(self, element, label, instruction_terms, history_terms):
+        label_terms = _terms(label)
+        score = 2.0 * len(label_terms & instruction_terms) + 0.5 * len(label_terms & history_terms)
+        lowered = label.lower()
+        # Partial matches such as 'search' in 'searchbox'
+        score += 0.5 * sum(1 for term in instruction_terms if len(term) > 3 and term in lowered and term not in label_terms)
+        if str(element.get('type', '')).startswith(ACTIONABLE_TYPES):
+            score += 0.25
+        return score
+
+    def _on_screen(self, element, viewport):
+        scroll_x, scroll_y, width, height = viewport
+        x, y = (element.get('coordinates') or [0, 0])[:2]
+        margin = Config.PROMPT_OFFSCREEN_MARGIN
+        return (scroll_x - margin <= x <= scroll_x + width + margin and
+                scroll_y - margin <= y <= scroll_y + height + margin)
@@ -1,6 +1,12 @@
 import json
+import os
+from config import Config
+from llm_agent.prompt_compiler import PromptCompiler
 
 class PromptTemplates:
+    def __init__(self):
+        self.compiler = PromptCompiler()
+        self.last_ui_stats = None # Element counts and token estimates of the last compiled UI tree
     
     def get_system_prompt(self):
         """System prompt for GUI automation agent"""
@@ -17,9 +23,15 @@ class PromptTemplates:
         """Build complete action prompt with action history"""
         prompt_parts = [
             f"Instruction: {instruction}",
-            f"Current Screenshot: {screenshot_path.split('/')[-1]}",
-            f"Current UI Tree: {json.dumps(ui_tree, indent=None)}"
+            f"Current Screenshot: {os.path.basename(screenshot_path) if screenshot_path else 'not captured'}",
         ]
+        if Config.PROMPT_COMPILER_ENABLED:
+            # Most relevant elements first, as a table within PROMPT_UI_TOKEN_BUDGET
+            ui_table, self.last_ui_stats = self.compiler.compile(ui_tree, instruction, action_history)
+            prompt_parts.append(f"Current UI Elements (most relevant first):\n{ui_table}")
+        else:
+            self.last_ui_stats = None
+            prompt_parts.append(f"Current UI Tree: {json.dumps(ui_tree, indent=None)}")
         
         # Add action history to prevent repetition
         if action_history:
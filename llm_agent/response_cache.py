@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+from utils.logger import Logger
+
+# Prompt lines that change between otherwise identical requests; the model only sees
+# the screenshot's file name, so it is left out of the key
+VOLATILE_PROMPT_LINES = re.compile(r'^Current Screenshot:.*$', re.MULTILINE)
+
+
+class ResponseCache:
+    """Cache of LLM responses keyed by normalized prompt and model parameters.
+
+    Two tiers: an in-memory LRU (LLM_CACHE_MEMORY_ENTRIES) in front of a SQLite
+    table at LLM_CACHE_PATH that survives restarts and is shared by worker
+    processes. Entries older than LLM_CACHE_TTL seconds are ignored and purged.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path=None, memory_entries=None, ttl=None):
+        self.logger = Logger()
+        self.path = path or Config.LLM_CACHE_PATH
+        self.memory_entries = memory_entries or Config.LLM_CACHE_MEMORY_ENTRIES
+        self.ttl = ttl or Config.LLM_CACHE_TTL
+        self.memory = OrderedDict()  # key -> (response, created)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        self._db = None
+        self._open()
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def key(self, payload):
+        """Hash of the request payload (model, parameters, messages) with prompts normalized"""
+        normalized = dict(payload)
+        normalized['messages'] = [
+            {**message, 'content': self._normalize(message.get('content', ''))}
+            for message in payload.get('messages', [])
+        ]
+        normalized.pop('stream', None)
+        return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key):
+        """Cached response text, or None"""
+        now = time.time()
+        with self._lock:
+            cached = self.memory.get(key)
+            if cached and now - cached[1] <= self.ttl:
+                self.memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return cached[0]
+            if cached:
+                del self.memory[key]
+
+            row = self._query("SELECT response, created FROM responses WHERE key = ?", (key,))
+            if row and now - row[1] <= self.ttl:
+                self._remember(key, row[0], row[1])
+                self.stats["disk_hits"] += 1
+                return row[0]
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, response):
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            if self._db:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO responses (key, response, created) VALUES (?, ?, ?)",
+                                     (key, response, now))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    self.logger.log(f" ResponseCache: Could not write {self.path}: {e}")
+
+    def invalidate(self, key):
+        """Forget a response (e.g. one that led the automation astray)"""
+        with self._lock:
+            self.memory.pop(key, None)
+            if self._db:
+                try:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+                except sqlite3.Error:
+                    pass
+
+    def hit_rate(self):
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def _normalize(self, text):
+        text = VOLATILE_PROMPT_LINES.sub('', text)
+        return re.sub(r'\s+', ' ', text).strip()
+
+    def _remember(self, key, response, created):
+        self.memory[key] = (response, created)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _query(self, sql, params):
+        if not self._db:
+            return None
+        try:
+            return self._db.execute(sql, params).fetchone()
+        except sqlite3.Error as e:
+            self.logger.log(f" ResponseCache: Could not read {self.path}: {e}")
+            return None
+
+    def _open(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # One connection guarded by self._lock; SQLite's file locking covers other processes
+            self._db = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses "
+                             "(key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL)")
+            self._db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+            self._db.commit()
+        except sqlite3.Error as e:
+            self.logger.log(f" ResponseCache: Persistent tier unavailable ({self.path}), memory only: {e}")
+            self._db = None
@@ -1,19 +1,55 @@
-import json
-import time
-from config import Config
-from gui_capturer.ui_capturer import UICapturer
-from retriever.task_retriever import TaskRetriever
-from llm_agent.agent import LLMAgent
-from executor.action_executor import ActionExecutor
-from utils.logger import Logger
-from ui.ui_server import UIServer
-from selenium import webdriver # ADDED: Import webdriver for initialization
-from selenium.webdriver.chrome.service import Service # ADDED
-from selenium.webdriver.chrome.options import Options # ADDED
-from webdriver_manager.chrome import ChromeDriverManager # ADDED
-import os # ADDED
-import glob # ADDED
-import hashlib
+import asyncio
+import sys
+import threading
+from contextlib import nullcontext
+from utils.startup_timer import StartupTimer
+
+# Heavy dependencies load on first use: selenium with the first task (the pool imports
+# it in its warm-up thread), sklearn with the first retrieval and gradio with the UI.
+startup_timer = StartupTimer.shared()
+with startup_timer.measure("import config/logger"):
+    from config import Config
+    from utils.logger import Logger
+with startup_timer.measure("import retriever"):
+    from retriever.task_retriever import TaskRetriever
+with startup_timer.measure("import llm_agent"):
+    from llm_agent.agent import LLMAgent
+with startup_timer.measure("import ui"):
+    from ui.ui_server import UIServer
+with startup_timer.measure("import browser pool"):
+    from browser.pool import BrowserPool
+    from browser.contexts import ContextPool
+    from browser.load_profiles import LoadProfile
+    from browser.profiles import ProfileManager
+with startup_timer.measure("import scheduler"):
+    from scheduler.job_scheduler import JobScheduler
+    from scheduler.process_scheduler import ProcessJobScheduler
+    from scheduler.async_scheduler import AsyncJobScheduler
+
+
+def _advance(step, value):
+    """Resume an automation generator; returns (finished, yielded request or run result)"""
+    try:
+        return False, step(value)
+    except StopIteration as done:
+        return True, done.value
+
+
+def _wait_for_manual_input(timeout):
+    """Give the user up to timeout seconds to act in the browser; Enter on an interactive console resumes early.
+
+    Never blocks indefinitely: worker threads of a headless server have no one to press Enter.
+    """
+    done = threading.Event()
+    if sys.stdin is not None and sys.stdin.isatty():
+        def read_enter():
+            try:
+                input(f"Press Enter to continue (resuming in {timeout}s)...")
+            except (EOFError, OSError):
+                pass
+            done.set()
+        threading.Thread(target=read_enter, name="ManualInput", daemon=True).start()
+    return done.wait(timeout)
 
 
 class GUIAutomationAgent:
@@ -21,108 +57,160 @@ class GUIAutomationAgent:
         Config.create_directories()
         self.logger = Logger()
         self.driver = None # ADDED: Centralized WebDriver instance
+        with startup_timer.measure("init BrowserPool"):
+            # 'contexts' mode: one Chrome, an isolated browser context per task
+            self.browser_pool = ContextPool.shared() if Config.EXECUTION_MODE == 'contexts' else BrowserPool.shared()
+            self.browser_pool.warm() # Launch sessions in the background before the first task
         self.ui_capturer = None # Will be initialized with shared driver
-        self.retriever = TaskRetriever()
-        self.llm_agent = LLMAgent()
+        with startup_timer.measure("init TaskRetriever"):
+            self.retriever = TaskRetriever()
+        with startup_timer.measure("init LLMAgent"):
+            self.llm_agent = LLMAgent()
+        self.async_llm_agent = None # Created by the first run_automation_async
         self.executor = None # Will be initialized with shared driver
+        self.load_profile = None # Resource blocking for the current run
+        self.browser_profile = None # Persistent profile held by the current run (its driver is not pooled)
         self.step_count = 0
         self.action_history = [] # 25 June
+        self.step_listener = None # Optional callable(dict) notified after every executed step
 
-    def _hash_ui_tree(self,ui_tree):
-        return hashlib.md5(json.dumps(ui_tree, sort_keys=True).encode()).hexdigest()
-
-
-    def _initialize_shared_browser(self):
-        """Initializes and returns a single shared Chrome browser instance."""
+    def _initialize_shared_browser(self, load_profile=None, browser_profile=None):
+        """Checks out a warm, reset browser session from the pool, or opens a persistent profile."""
         if self.driver:
             self.logger.log("Browser already initialized, skipping.")
             return self.driver
 
-        chrome_options = Options()
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-
-        if Config.CHROME_HEADLESS:
-            chrome_options.add_argument('--headless=new')
-            chrome_options.add_argument('--window-size=1920,1080')
+        if browser_profile:
+            # Logged-in, warm-cache profile: launched for this run only, locked against other workers
+            from browser.driver_factory import create_driver
+            profiles = ProfileManager.shared()
+            user_data_dir = profiles.acquire(browser_profile, restore_snapshot=Config.PROFILE_RESTORE_SNAPSHOT)
+            try:
+                self.driver = create_driver(user_data_dir=user_data_dir)
+            except Exception:
+                profiles.release(browser_profile)
+                raise
+            self.browser_profile = browser_profile
         else:
-            # For non-headless, ensure the window starts maximized
-            chrome_options.add_argument('--start-maximized')
-
-        os.makedirs(Config.SCREENSHOTS_DIR, exist_ok=True)
-
-        # --- CRITICAL FIX START: Robust ChromeDriver Path Finding (Copied from Executor) ---
-        self.logger.log("Main Agent: Attempting to install/locate ChromeDriver...")
-        driver_candidate_path = ChromeDriverManager().install()
-
-        actual_driver_path = None
-
-        if not driver_candidate_path.lower().endswith('.exe'):
-            self.logger.log(f"Main Agent: WebDriverManager returned an unexpected path: {driver_candidate_path}")
-
-            found_exe = glob.glob(os.path.join(driver_candidate_path, 'chromedriver.exe'))
+            self.driver = self.browser_pool.checkout()
+        # Block resources before the first page load; the profile is set on every checkout
+        self.load_profile = LoadProfile(self.driver, load_profile or Config.LOAD_PROFILE)
+        self.driver.get("https://www.google.com") # Start with Google homepage
+        self.load_profile.report_page_load()
+        self.logger.log("Shared browser checked out and navigated to Google.")
+        return self.driver
 
-            if not found_exe:
-                parent_dir = os.path.dirname(driver_candidate_path)
-                found_exe = glob.glob(os.path.join(parent_dir, 'chromedriver.exe'))
+    def _exclusive_driver(self):
+        """Keep a browser-context tab active while WebElements are in use (no-op for plain drivers)"""
+        exclusive = getattr(self.driver, 'exclusive', None)
+        return exclusive() if exclusive else nullcontext()
 
-            if found_exe:
-                actual_driver_path = found_exe[0]
-                self.logger.log(f"Main Agent: Corrected ChromeDriver path to: {actual_driver_path}")
-            else:
-                raise FileNotFoundError(
-                    f"Main Agent: Could not find 'chromedriver.exe' after webdriver_manager install. "
-                    f"WebDriverManager returned: {driver_candidate_path}"
-                )
+    def _release_browser(self):
+        """Return the driver to the pool, or quit it and unlock its persistent profile"""
+        if self.browser_profile:
+            try:
+                self.driver.quit()
+            finally:
+                ProfileManager.shared().release(self.browser_profile)
+                self.browser_profile = None
         else:
-            actual_driver_path = driver_candidate_path
-            self.logger.log(f"Main Agent: WebDriverManager returned a direct path to chromedriver.exe: {actual_driver_path}")
-
-        self.logger.log(f"Main Agent: Final ChromeDriver path used: {actual_driver_path}")
-        service = Service(executable_path=actual_driver_path)
-        # --- CRITICAL FIX END ---
-
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        self.driver.implicitly_wait(Config.IMPLICIT_WAIT)
-
-        # Hide webdriver property
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-
-        self.driver.get("https://www.google.com") # Start with Google homepage
-        self.logger.log("Shared browser initialized and navigated to Google.")
-        return self.driver
+            self.browser_pool.release(self.driver)
+        self.driver = None # Reset the driver for potential new runs
+
+    def run_automation(self, instruction, load_profile=None, browser_profile=None, job_id=None):
+        """Main automation loop; load_profile / browser_profile override Config.LOAD_PROFILE / BROWSER_PROFILE.
+        job_id (set by the schedulers) keeps concurrent runs' screenshot files apart."""
+        steps = self._automation_steps(instruction, load_profile, browser_profile, job_id, self.llm_agent)
+        finished, value = _advance(steps.send, None)
+        while not finished:
+            finished, value = _advance(steps.send, self.llm_agent.get_action_suggestion(*value))
+        return self._report_latency(value, self.llm_agent)
+
+    async def run_automation_async(self, instruction, load_profile=None, browser_profile=None, executor=None,
+                                   job_id=None):
+        """run_automation for an asyncio event loop.
+
+        Browser work runs on `executor` (a thread pool; None uses the loop's
+        default) while the LLM call is awaited, so one loop can drive many agents.
+        """
+        if self.async_llm_agent is None:
+            from llm_agent.async_agent import AsyncLLMAgent
+            self.async_llm_agent = AsyncLLMAgent()
+        loop = asyncio.get_running_loop()
+        steps = self._automation_steps(instruction, load_profile, browser_profile, job_id, self.async_llm_agent)
+        finished, value = await loop.run_in_executor(executor, _advance, steps.send, None)
+        while not finished:
+            try:
+                suggestion = await self.async_llm_agent.get_action_suggestion(*value)
+            except BaseException:
+                # Cancelled or failed mid-run: let the loop clean up (final screenshot, release browser)
+                await loop.run_in_executor(executor, steps.close)
+                raise
+            finished, value = await loop.run_in_executor(executor, _advance, steps.send, suggestion)
+        return self._report_latency(value, self.async_llm_agent) # on the loop: its client is per event loop
+
+    def _report_latency(self, result, llm_agent):
+        """Add the LLM latency summary to a run result and log it with the final status"""
+        report = result["llm_latency"] = llm_agent.latency_report()
+        message = f"Run {result['status']} after {result['steps']} steps"
+        api = report["api"]
+        if api["calls"]:
+            message += (f"; LLM API (last {api['calls']} calls): avg {api['avg'] * 1000:.0f} ms, "
+                        f"p95 {api['p95'] * 1000:.0f} ms, {api['failures']} failed")
+        streaming = report.get("streaming", {})
+        if streaming.get("avg_first_action") is not None:
+            message += f"; first action after {streaming['avg_first_action'] * 1000:.0f} ms on average (streaming)"
+        self.logger.log(message)
+        return result
 
-    def run_automation(self, instruction):
-        """Main automation loop"""
+    def _automation_steps(self, instruction, load_profile=None, browser_profile=None, job_id=None, llm_agent=None):
+        """The automation loop as a generator: yields get_action_suggestion arguments,
+        receives the suggestion, and returns the run result (shared by the sync and async runners).
+        llm_agent is the runner's agent; a suggestion whose action fails is dropped from its response cache."""
         self.logger.log(f"Starting automation: {instruction}")
         self.step_count = 0
+        self.action_history = [] # History is per run; earlier runs must not leak into the prompt
+        status, stop_reason = "error", None
+        unchanged_steps = 0
 
         try:
             # INITIALIZE THE SINGLE BROWSER INSTANCE AND PASS IT
-            shared_driver = self._initialize_shared_browser()
-            self.ui_capturer = UICapturer(shared_driver) # Pass driver to UICapturer
+            shared_driver = self._initialize_shared_browser(load_profile, browser_profile or Config.BROWSER_PROFILE)
+            # Imported here so selenium is not loaded at startup
+            from gui_capturer.ui_capturer import UICapturer
+            from executor.action_executor import ActionExecutor
+            run_prefix = f"job{job_id}_" if job_id is not None else ''
+            self.ui_capturer = UICapturer(shared_driver, run_prefix) # Pass driver to UICapturer
             self.executor = ActionExecutor(shared_driver) # Pass driver to ActionExecutor
 
             while True:
+                if self.step_count >= Config.MAX_AUTOMATION_STEPS:
+                    status, stop_reason = "max_steps", f"Reached MAX_AUTOMATION_STEPS ({Config.MAX_AUTOMATION_STEPS})"
+                    self.logger.log(stop_reason)
+                    break
                 self.step_count += 1
                 self.logger.log(f"Step {self.step_count}")
 
                 # Capture current UI state using the shared driver
-                screenshot_path, ui_tree = self.ui_capturer.capture_state(self.step_count)
-
-                # 25 June added
-                # current_ui_hash = self._hash_ui_tree(ui_tree)
-                # if hasattr(self, 'prev_ui_hash') and self.prev_ui_hash == current_ui_hash:
-                #     self.logger.log("UI tree did not change — possibly stuck. Breaking loop.")
-                #     break
-                # self.prev_ui_hash = current_ui_hash
+                with self._exclusive_driver():
+                    screenshot_path, ui_tree = self.ui_capturer.capture_state(self.step_count)
+
+                # Stop early when actions no longer change the screen
+                if self.ui_capturer.state_changed:
+                    unchanged_steps = 0
+                else:
+                    unchanged_steps += 1
+                    if unchanged_steps >= Config.MAX_UNCHANGED_STEPS:
+                        status = "stuck"
+                        stop_reason = f"Screen unchanged for {unchanged_steps} consecutive steps - agent appears stuck"
+                        self.logger.log(stop_reason)
+                        break
 
                 # Retrieve similar examples
                 retrieved_examples = self.retriever.retrieve_similar(instruction)
 
-                # Get LLM suggestion
-                action_suggestion = self.llm_agent.get_action_suggestion(
+                # Get LLM suggestion (the runner makes the call; an identical prompt is served from the LLM cache)
+                action_suggestion = yield (
                     instruction, ui_tree, retrieved_examples, screenshot_path, self.action_history
                 )
 
@@ -131,36 +219,55 @@ class GUIAutomationAgent:
                 # Execute action using the shared driver
                 if action_suggestion['action_type'] == 'finish':
                     self.logger.log("Task completed")
+                    status, stop_reason = "completed", "LLM reported the task as finished"
                     break
                 elif action_suggestion['action_type'] == 'wait':
-                    self.logger.log("Waiting for manual input...")
-                    input("Press Enter to continue...")
+                    if action_suggestion.get('error'):
+                        # No suggestion could be obtained: waiting would not produce one either
+                        status, stop_reason = "error", f"LLM call failed: {action_suggestion['error']}"
+                        self.logger.log(stop_reason)
+                        break
+                    self.logger.log(f"Waiting up to {Config.MANUAL_INPUT_TIMEOUT}s for manual input...")
+                    _wait_for_manual_input(Config.MANUAL_INPUT_TIMEOUT)
                     continue
 
-                success = self.executor.execute_action(action_suggestion)
+                # Not under _exclusive_driver: the executor holds the tab only while it acts, not while it waits
+                success = self.executor.execute_action(action_suggestion, ui_tree, self.ui_capturer.spatial_index)
                 self.action_history.append({
                     "step": self.step_count,
                     "action": action_suggestion,
                     "success": success
                 })
+                if self.step_listener:
+                    self.step_listener(self.action_history[-1])
                 if not success:
                     self.logger.log("Action execution failed")
+                    if llm_agent:
+                        llm_agent.invalidate_last() # A cached copy would replay the same failing action
+                    self.ui_capturer.capture_screenshot(self.step_count, 'failure')
+                    status, stop_reason = "failed", f"Action execution failed: {action_suggestion}"
                     break
 
-                time.sleep(Config.ACTION_DELAY) # CHANGED: Use a config value for delay
-                                              # You'll need to add ACTION_DELAY to your config.py
-                                              # e.g., ACTION_DELAY = 2
+                # The executor already waited for whatever the action caused (see PostActionWaiter)
+                self.load_profile.report_page_load() # Logs only when the step loaded a new document
 
         except Exception as e:
             self.logger.log(f"Error in automation: {str(e)}")
+            status, stop_reason = "error", str(e)
         finally:
             # CLEANUP THE SINGLE SHARED BROWSER INSTANCE
             if self.driver:
-                self.logger.log("Cleaning up shared browser.")
-                self.driver.quit()
-                self.driver = None # Reset the driver for potential new runs
+                if self.ui_capturer:
+                    try:
+                        self.ui_capturer.capture_screenshot(self.step_count, 'final')
+                    except Exception as e:
+                        self.logger.log(f"Final screenshot failed: {e}")
+                self.logger.log("Releasing shared browser.")
+                self._release_browser()
             # No need to call cleanup on executor/capturer as they don't own the driver anymore.
 
+        return {"status": status, "reason": stop_reason, "steps": self.step_count}
+
 
     def process_instruction(self, instruction, audio_file=None):
         """Process user instruction and start automation"""
@@ -177,14 +284,28 @@ class GUIAutomationAgent:
         # Run automation in separate thread for production
         # For this refactor, we'll keep it direct for easier debugging.
         # If running in a UI server, consider threading this.
-        self.run_automation(instruction)
+        outcome = self.run_automation(instruction)
+        result.update({
+            "status": outcome["status"],
+            "reason": outcome["reason"],
+            "steps_completed": outcome["steps"]
+        })
 
         return result
 
 def main():
-    agent = GUIAutomationAgent()
-    ui_server = UIServer(agent) # UIServer still takes the agent, which now manages the browser
-    ui_server.launch()
+    # One agent (and browser session) per worker slot; the UI only queues jobs
+    if Config.EXECUTION_MODE == 'processes':
+        scheduler = ProcessJobScheduler(GUIAutomationAgent).start()
+    elif Config.EXECUTION_MODE == 'async':
+        scheduler = AsyncJobScheduler(GUIAutomationAgent).start()
+    else:
+        scheduler = JobScheduler(GUIAutomationAgent).start()
+    ui_server = UIServer(scheduler)
+    with startup_timer.measure("build UI (gradio)"):
+        interface = ui_server.create_interface()
+    startup_timer.report()
+    ui_server.launch(interface)
 
 if __name__ == "__main__":
     main()
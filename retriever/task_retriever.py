@@ -1,8 +1,5 @@
 import json
 import os
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
 from config import Config
 from utils.logger import Logger
 
@@ -12,8 +9,8 @@ class TaskRetriever:
         self.dataset = []
         self.vectorizer = None
         self.task_vectors = None
+        self._index_built = False # TF-IDF index (and sklearn) is built on the first retrieval
         self._load_dataset()
-        self._build_index()
         
     def _load_dataset(self):
         """Load GUI automation dataset"""
@@ -99,15 +96,19 @@ class TaskRetriever:
             
     def _build_index(self):
         """Build TF-IDF index for retrieval"""
+        self._index_built = True
         if not self.dataset:
             return
             
+        from sklearn.feature_extraction.text import TfidfVectorizer
         queries = [item['query'] for item in self.dataset]
         self.vectorizer = TfidfVectorizer(stop_words='english', max_features=1000)
         self.task_vectors = self.vectorizer.fit_transform(queries)
         
     def retrieve_similar(self, query, top_k=None):
         """Retrieve similar tasks using TF-IDF"""
+        if not self._index_built:
+            self._build_index()
         if not self.vectorizer or not self.task_vectors.shape[0]:
             return []
             
@@ -115,6 +116,9 @@ class TaskRetriever:
             top_k = Config.TOP_K_RESULTS
             
         try:
+            import numpy as np
+            from sklearn.metrics.pairwise import cosine_similarity
+
             query_vector = self.vectorizer.transform([query])
             similarities = cosine_similarity(query_vector, self.task_vectors).flatten()
             
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from scheduler.job_scheduler import JobScheduler
+
+
+class AsyncJobScheduler(JobScheduler):
+    """JobScheduler whose worker slots are coroutines on one event loop.
+
+    Each slot still owns its own agent and browser, but runs it with
+    run_automation_async: WebDriver work goes to a thread pool (one thread per
+    slot) while LLM calls are awaited together on the loop, capped by
+    LLM_MAX_CONCURRENT_REQUESTS.
+    """
+
+    def start(self):
+        agents = [self.agent_factory() for _ in range(self.workers)]
+        self._browser_threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="AutomationBrowser")
+        thread = threading.Thread(target=self._run_loop, args=(agents,), name="AutomationEventLoop", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        self.logger.log(f"AsyncJobScheduler: Started {self.workers} workers on one event loop "
+                        f"(queue size {self.pending.maxsize}).")
+        return self
+
+    def shutdown(self, wait=True):
+        """Stop workers after the jobs already queued"""
+        for _ in range(self.workers):
+            self.pending.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+            self._browser_threads.shutdown()
+
+    def _run_loop(self, agents):
+        asyncio.run(self._run_workers(agents))
+
+    async def _run_workers(self, agents):
+        try:
+            await asyncio.gather(*(self._worker_async(slot, agent) for slot, agent in enumerate(agents)))
+        finally:
+            # The loop ends here: finish background streams, then close this loop's connections
+            from llm_agent.async_client import AsyncLLMHttpClient
+            for agent in agents:
+                if agent.async_llm_agent is not None:
+                    await agent.async_llm_agent.drain()
+            await AsyncLLMHttpClient.close_shared()
+
+    async def _worker_async(self, slot, agent):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await loop.run_in_executor(None, self.pending.get)
+            if job is None:
+                return
+            self._start_job(job, slot)
+            agent.step_listener = job.steps.append
+            try:
+                result = await agent.run_automation_async(job.instruction, job.load_profile, job.browser_profile,
+                                                          executor=self._browser_threads, job_id=job.id)
+                self._finish_job(job, slot, result=result)
+            except Exception as e:
+                self._finish_job(job, slot, error=str(e))
+            finally:
+                agent.step_listener = None
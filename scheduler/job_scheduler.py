@@ -0,0 +1,164 @@
+import itertools
+import queue
+import threading
+import time
+from collections import OrderedDict
+from config import Config
+from utils.logger import Logger
+
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'  # run_automation returned (its own status is in result)
+FAILED = 'failed'        # run_automation raised
+
+
+class QueueFullError(Exception):
+    """Raised by JobScheduler.submit when the pending queue is full"""
+
+
+class Job:
+    """One submitted instruction: its status, timing and final result"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, instruction, load_profile=None, browser_profile=None):
+        self.id = next(self._ids)
+        self.instruction = instruction
+        self.load_profile = load_profile
+        self.browser_profile = browser_profile
+        self.status = QUEUED
+        self.worker = None
+        self.result = None
+        self.error = None
+        self.steps = []  # step events reported by the agent while the job runs
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the job finishes; returns True if it did"""
+        return self._done.wait(timeout)
+
+    def done(self):
+        return self._done.is_set()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "instruction": self.instruction,
+            "status": self.status,
+            "worker": self.worker,
+            "result": self.result,
+            "error": self.error,
+            "steps": len(self.steps),
+            "queued_seconds": (self.started_at or time.time()) - self.submitted_at,
+            "run_seconds": (self.finished_at or time.time()) - self.started_at if self.started_at else None,
+        }
+
+
+class JobScheduler:
+    """Runs automation jobs on a fixed number of worker slots.
+
+    Each worker thread owns its own agent (browser session, executor, capturer
+    and action history), so jobs never share a driver. Pending jobs wait in a
+    bounded queue; submit() raises QueueFullError when it is full.
+    """
+
+    def __init__(self, agent_factory, workers=None, queue_size=None):
+        self.logger = Logger()
+        self.agent_factory = agent_factory
+        self.workers = workers or Config.SCHEDULER_WORKERS
+        self.pending = queue.Queue(maxsize=queue_size or Config.SCHEDULER_QUEUE_SIZE)
+        self.jobs = OrderedDict()  # id -> Job, oldest first; finished jobs are trimmed
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        """Build one agent per slot (here, so setup errors surface at startup) and start the workers"""
+        for slot in range(self.workers):
+            self._start_thread(slot, self.agent_factory())
+        self.logger.log(f"JobScheduler: Started {self.workers} workers (queue size {self.pending.maxsize}).")
+        return self
+
+    def _start_thread(self, slot, agent):
+        thread = threading.Thread(target=self._worker, args=(slot, agent), name=f"AutomationWorker-{slot}", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def submit(self, instruction, load_profile=None, browser_profile=None):
+        """Queue an instruction; returns its Job or raises QueueFullError"""
+        job = Job(instruction, load_profile, browser_profile)
+        with self._lock:
+            try:
+                self.pending.put_nowait(job)
+            except queue.Full:
+                raise QueueFullError(
+                    f"{self.pending.qsize()} jobs already waiting; try again when a worker is free"
+                )
+            self.jobs[job.id] = job
+            self._trim_history()
+        self.logger.log(f"JobScheduler: Queued job {job.id}: {instruction}")
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def recent(self):
+        """Known jobs, newest first"""
+        with self._lock:
+            return list(reversed(self.jobs.values()))
+
+    def status(self):
+        """Counts per job status plus queue depth"""
+        with self._lock:
+            counts = {}
+            for job in self.jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+        counts["waiting"] = self.pending.qsize()
+        return counts
+
+    def shutdown(self, wait=True):
+        """Stop workers after the jobs already queued"""
+        for _ in self._threads:
+            self.pending.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _worker(self, slot, agent):
+        while True:
+            job = self.pending.get()
+            if job is None:
+                return
+            self._start_job(job, slot)
+            agent.step_listener = job.steps.append
+            try:
+                result = agent.run_automation(job.instruction, job.load_profile, job.browser_profile, job_id=job.id)
+                self._finish_job(job, slot, result=result)
+            except Exception as e:
+                self._finish_job(job, slot, error=str(e))
+            finally:
+                agent.step_listener = None
+
+    def _start_job(self, job, slot):
+        job.worker = slot
+        job.started_at = time.time()
+        job.status = RUNNING
+
+    def _finish_job(self, job, slot, result=None, error=None):
+        job.result = result
+        job.error = error
+        job.status = FAILED if error else COMPLETED
+        job.finished_at = time.time()
+        job._done.set()
+        if error:
+            self.logger.log(f"JobScheduler: Job {job.id} failed: {error}")
+        self.logger.log(f"JobScheduler: Job {job.id} {job.status} on worker {slot} "
+                        f"in {job.finished_at - job.started_at:.1f}s.")
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done()]
+        for job_id in finished[:max(0, len(self.jobs) - Config.SCHEDULER_JOB_HISTORY)]:
+            del self.jobs[job_id]
@@ -0,0 +1,84 @@
+import multiprocessing
+import queue
+from config import Config
+from scheduler.job_scheduler import JobScheduler
+
+# Worker processes are spawned (not forked) on every platform: each one imports the
+# agent fresh and owns its own browser, so nothing is shared with the coordinator.
+_mp = multiprocessing.get_context('spawn')
+
+
+def _worker_process_main(agent_factory, tasks, events):
+    """Worker process: one agent and one browser session, running one instruction at a time"""
+    Config.BROWSER_POOL_SIZE = 1
+    agent = agent_factory()
+    agent.step_listener = lambda step: events.put(('step', step))
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        try:
+            events.put(('result', agent.run_automation(*task)))
+        except Exception as e:
+            events.put(('error', str(e)))
+    agent.browser_pool.close()
+
+
+class ProcessJobScheduler(JobScheduler):
+    """JobScheduler whose worker slots are separate processes.
+
+    Each slot thread in the coordinator owns one worker process and relays its
+    step events and results into the Job objects over multiprocessing queues.
+    A worker that dies fails only its current job and is restarted; one found
+    dead while idle is restarted before it is given the next job.
+    """
+
+    def start(self):
+        for slot in range(self.workers):
+            self._start_thread(slot, None)
+        self.logger.log(f"ProcessJobScheduler: Started {self.workers} worker processes "
+                        f"(queue size {self.pending.maxsize}).")
+        return self
+
+    def _spawn(self, slot):
+        tasks, events = _mp.Queue(), _mp.Queue()
+        process = _mp.Process(target=_worker_process_main, args=(self.agent_factory, tasks, events),
+                              name=f"AutomationProcess-{slot}", daemon=True)
+        process.start()
+        return process, tasks, events
+
+    def _worker(self, slot, _agent):
+        process, tasks, events = self._spawn(slot)
+        while True:
+            job = self.pending.get()
+            if job is None:
+                tasks.put(None)
+                process.join(Config.SCHEDULER_PROCESS_STOP_TIMEOUT)
+                if process.is_alive():
+                    process.terminate()
+                return
+            if not process.is_alive():
+                # Died while idle (e.g. the browser crashed it): respawn before handing it this job
+                self.logger.log(f"ProcessJobScheduler: Worker process {slot} exited with code {process.exitcode} "
+                                f"while idle; restarting.")
+                process, tasks, events = self._spawn(slot)
+            self._start_job(job, slot)
+            tasks.put((job.instruction, job.load_profile, job.browser_profile, job.id))
+            while True:
+                try:
+                    kind, payload = events.get(timeout=1)
+                except queue.Empty:
+                    if process.is_alive():
+                        continue
+                    self._finish_job(job, slot, error=f"Worker process exited with code {process.exitcode}")
+                    self.logger.log(f"ProcessJobScheduler: Restarting worker process {slot}.")
+                    process, tasks, events = self._spawn(slot)
+                    break
+                if kind == 'step':
+                    job.steps.append(payload)
+                elif kind == 'result':
+                    self._finish_job(job, slot, result=payload)
+                    break
+                else:
+                    self._finish_job(job, slot, error=payload)
+                    break
@@ -0,0 +1,60 @@
+import json
+from llm_agent.action_stream import ActionStreamParser
+
+
+def feed_chunks(parser, text, size):
+    results = []
+    for i in range(0, len(text), size):
+        results.append(parser.feed(text[i:i + size]))
+    return results
+
+
+def test_action_returned_once_all_fields_are_complete():
+    text = 'Sure:\n{"action_type": "type", "target_element": "Search", "additional_input": "python tutorials"}'
+    parser = ActionStreamParser()
+    results = feed_chunks(parser, text, 1)
+    ready = [i for i, r in enumerate(results) if r]
+    # Exactly once, as soon as the last string value closed (before the closing brace)
+    assert ready == [text.rindex('"')]
+    assert parser.action == {"action_type": "type", "target_element": "Search", "additional_input": "python tutorials"}
+    assert parser.complete()
+
+
+def test_every_split_point_gives_the_same_action():
+    action = {"action_type": "click", "target_element": 'Sign in "now" é', "additional_input": ""}
+    text = json.dumps(action)
+    for split in range(1, len(text)):
+        parser = ActionStreamParser()
+        first = parser.feed(text[:split])
+        second = parser.feed(text[split:])
+        assert (first or second) == action
+        assert first is None or split >= len(text) - 2
+
+
+def test_number_or_literal_at_end_of_buffer_waits_for_more():
+    parser = ActionStreamParser()
+    assert parser.feed('{"action_type": "click", "target_element": "Next", "additional_input": 12') is None
+    assert parser.feed('3') is None
+    assert parser.feed('}') == {"action_type": "click", "target_element": "Next", "additional_input": 123}
+
+    parser = ActionStreamParser()
+    assert parser.feed('{"action_type": "click", "target_element": "Next", "additional_input": nu') is None
+    assert parser.feed('ll') is None
+    assert parser.feed(' ,') == {"action_type": "click", "target_element": "Next", "additional_input": None}
+
+
+def test_closed_object_without_all_fields_gets_defaults():
+    parser = ActionStreamParser()
+    assert parser.feed('{"action_type": "fin') is None
+    assert parser.feed('ish"}') == {"action_type": "finish", "target_element": "unknown"}
+    assert parser.complete()
+
+
+def test_empty_or_truncated_stream_is_not_complete():
+    assert not ActionStreamParser().complete()
+    parser = ActionStreamParser()
+    parser.feed('{"action_type": "click", "target_el')
+    assert not parser.complete()
+    parser = ActionStreamParser()
+    parser.feed('{}')
+    assert not parser.complete()
@@ -0,0 +1,19 @@
+import asyncio
+import pytest
+
+pytest.importorskip('httpx')
+
+from llm_agent.async_client import AsyncLLMHttpClient
+
+
+def test_one_client_per_event_loop_closed_with_the_loop():
+    async def run():
+        client = AsyncLLMHttpClient.shared()
+        assert AsyncLLMHttpClient.shared() is client
+        await AsyncLLMHttpClient.close_shared()
+        return client
+
+    first = asyncio.run(run())
+    second = asyncio.run(run())
+    assert first is not second
+    assert first.client.is_closed and second.client.is_closed
@@ -0,0 +1,77 @@
+import io
+import pytest
+from gui_capturer.change_detector import ChangeDetector
+
+
+class FakeDriver:
+    def __init__(self, url='https://example.com/', version=1, values_hash=0):
+        self.current_url = url
+        self.state = [version, values_hash]
+
+    def execute_script(self, script, *args):
+        return list(self.state) if self.state is not None else None
+
+
+def test_first_check_counts_as_change():
+    assert ChangeDetector().check(FakeDriver(), b'frame')
+
+
+def test_same_state_is_unchanged():
+    detector, driver = ChangeDetector(), FakeDriver()
+    detector.check(driver, b'frame')
+    assert not detector.check(driver, b'frame')
+
+
+def test_each_component_is_a_change():
+    detector, driver = ChangeDetector(), FakeDriver()
+    detector.check(driver, b'frame')
+    assert detector.check(driver, b'other frame')
+    driver.state[0] += 1
+    assert detector.check(driver, b'other frame')
+    driver.current_url = 'https://example.com/next'
+    assert detector.check(driver, b'other frame')
+
+
+def test_typed_value_is_a_change_without_dom_mutation():
+    detector, driver = ChangeDetector(), FakeDriver()
+    detector.check(driver, b'frame')
+    driver.state[1] = 12345
+    assert detector.check(driver, b'frame')
+
+
+def test_reset_forgets_previous_state():
+    detector, driver = ChangeDetector(), FakeDriver()
+    detector.check(driver, b'frame')
+    detector.reset()
+    assert detector.check(driver, b'frame')
+
+
+def slightly_different_frames():
+    """Two PNGs one pixel apart: same 16x16 dHash, different bytes"""
+    Image = pytest.importorskip('PIL.Image')
+    frames = []
+    for shade in (200, 201):
+        image = Image.new('RGB', (320, 200), 'white')
+        image.putpixel((100, 100), (shade, shade, shade))
+        buffer = io.BytesIO()
+        image.save(buffer, 'PNG')
+        frames.append(buffer.getvalue())
+    return frames
+
+
+def test_small_dom_update_is_a_change_when_frames_hash_alike():
+    first, second = slightly_different_frames()
+    detector, driver = ChangeDetector(), FakeDriver()
+    assert detector._frame_hash(first) == detector._frame_hash(second)
+    detector.check(driver, first)
+    driver.state[0] += 1  # e.g. a toast appeared
+    assert detector.check(driver, second)
+
+
+def test_frames_compared_exactly_without_dom_counter():
+    first, second = slightly_different_frames()
+    detector, driver = ChangeDetector(), FakeDriver()
+    driver.state = None  # script unavailable
+    detector.check(driver, first)
+    assert not detector.check(driver, first)
+    assert detector.check(driver, second)
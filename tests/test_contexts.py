@@ -0,0 +1,122 @@
+import threading
+import pytest
+from browser import contexts
+from browser.contexts import LOADED_SCRIPT, BrowserContextHost, ContextPool
+
+
+class FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def window(self, handle):
+        self.driver.current_window_handle = handle
+
+
+class FakeChrome:
+    """Enough of a Chrome WebDriver for BrowserContextHost: targets are window handles"""
+
+    def __init__(self, loads_after=0):
+        self.current_window_handle = 'home'
+        self.handles = ['home']
+        self.switch_to = FakeSwitchTo(self)
+        self.dead = False
+        self.loads_after = loads_after  # LOADED_SCRIPT polls answered False before the page counts as loaded
+        self.commands = []
+
+    @property
+    def window_handles(self):
+        if self.dead:
+            raise ConnectionError('chromedriver is gone')
+        return list(self.handles)
+
+    def execute_cdp_cmd(self, command, params):
+        if self.dead:
+            raise ConnectionError('chromedriver is gone')
+        self.commands.append((self.current_window_handle, command, params))
+        if command == 'Target.createBrowserContext':
+            return {'browserContextId': f"ctx{len(self.handles)}"}
+        if command == 'Target.createTarget':
+            handle = f"target{len(self.handles)}"
+            self.handles.append(handle)
+            return {'targetId': handle}
+        if command == 'Page.navigate':
+            return {} if '#' in params['url'] else {'frameId': 'f', 'loaderId': 'l'}
+        return {}
+
+    def execute_script(self, script, *args):
+        if script == LOADED_SCRIPT:
+            self.loads_after -= 1
+            return self.loads_after < 0
+        return None
+
+    def quit(self):
+        self.dead = True
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Replace polling sleeps; each records whether another thread could take the host lock then"""
+    lock_free = []
+
+    def try_lock():
+        acquired = host_lock[0].acquire(blocking=False)
+        if acquired:
+            host_lock[0].release()
+        lock_free.append(acquired)
+
+    def sleep(seconds):
+        thread = threading.Thread(target=try_lock)
+        thread.start()
+        thread.join()
+
+    host_lock = [None]
+    monkeypatch.setattr(contexts.time, 'sleep', sleep)
+    return host_lock, lock_free
+
+
+def test_navigation_waits_for_the_load_without_holding_the_host_lock(no_sleep):
+    host_lock, lock_free = no_sleep
+    chrome = FakeChrome(loads_after=3)
+    host = BrowserContextHost(chrome)
+    host_lock[0] = host.lock
+    tab = host.new_context()
+    tab.get('https://example.com/')
+    assert (tab.window_handle, 'Page.navigate', {'url': 'https://example.com/'}) in chrome.commands
+    assert lock_free == [True, True, True]
+
+
+def test_same_document_navigation_returns_at_once(no_sleep):
+    host_lock, lock_free = no_sleep
+    chrome = FakeChrome(loads_after=3)
+    tab = BrowserContextHost(chrome).new_context()
+    tab.get('https://example.com/#section')
+    assert lock_free == []
+
+
+def test_checkout_relaunches_a_dead_host(monkeypatch):
+    launched = []
+
+    def create_driver(driver_path=None):
+        launched.append(FakeChrome())
+        return launched[-1]
+
+    monkeypatch.setattr(contexts, 'create_driver', create_driver)
+    monkeypatch.setattr(contexts, 'resolve_chromedriver_path', lambda logger=None: 'chromedriver')
+    pool = ContextPool()
+    pool.checkout()
+    launched[0].dead = True
+    tab = pool.checkout()
+    assert len(launched) == 2
+    assert tab._host.driver is launched[1]
+
+
+def test_checkout_error_on_a_live_host_is_raised(monkeypatch):
+    chrome = FakeChrome()
+    monkeypatch.setattr(contexts, 'create_driver', lambda driver_path=None: chrome)
+    monkeypatch.setattr(contexts, 'resolve_chromedriver_path', lambda logger=None: 'chromedriver')
+    pool = ContextPool()
+    pool.checkout()
+    monkeypatch.setattr(chrome, 'execute_cdp_cmd', lambda command, params: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        pool.checkout()
+    assert pool.host.driver is chrome
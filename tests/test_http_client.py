@@ -0,0 +1,112 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+
+pytest.importorskip('requests')
+
+from config import Config
+from llm_agent import http_client
+from llm_agent.http_client import LLMHttpClient, LLMRequestError, backoff_delay, retry_after_seconds
+
+
+class StubServer:
+    """Local chat completions endpoint answering from a list of (status, headers, body)"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                stub.requests.append(json.loads(self.rfile.read(int(self.headers['Content-Length']))))
+                status, headers, body = stub.responses.pop(0)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v1/chat/completions"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+COMPLETION = json.dumps({'choices': [{'message': {'content': 'ok'}}]}).encode()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff sleeps instead of sleeping"""
+    recorded = []
+    monkeypatch.setattr(http_client.time, 'sleep', recorded.append)
+    return recorded
+
+
+def test_retry_after_parsing():
+    assert retry_after_seconds('3') == 3.0
+    assert retry_after_seconds('-1') == 0.0
+    assert retry_after_seconds('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert retry_after_seconds('soon') is None
+    assert backoff_delay(1, retry_after=Config.LLM_BACKOFF_MAX + 100) == Config.LLM_BACKOFF_MAX
+    assert 0 <= backoff_delay(3) <= min(Config.LLM_BACKOFF_MAX, Config.LLM_BACKOFF_BASE * 4)
+
+
+def test_retries_429_after_retry_after_then_succeeds(sleeps):
+    server = StubServer([(429, {'Retry-After': '2'}, b'slow down'),
+                         (503, {}, b'busy'),
+                         (200, {'Content-Type': 'application/json'}, COMPLETION)])
+    try:
+        client = LLMHttpClient(url=server.url, api_key='key', max_retries=2)
+        assert client.post_json({'model': 'm'})['choices'][0]['message']['content'] == 'ok'
+    finally:
+        server.close()
+    assert len(server.requests) == 3
+    assert sleeps[0] == min(2.0, Config.LLM_BACKOFF_MAX)
+    assert client.latencies[-1]['attempts'] == 3 and client.latencies[-1]['ok']
+
+
+def test_non_retryable_status_fails_at_once(sleeps):
+    server = StubServer([(400, {}, b'bad request')])
+    try:
+        client = LLMHttpClient(url=server.url, api_key='key', max_retries=3)
+        with pytest.raises(LLMRequestError) as error:
+            client.post_json({'model': 'm'})
+    finally:
+        server.close()
+    assert error.value.status == 400
+    assert sleeps == []
+
+
+def test_gives_up_after_max_retries(sleeps):
+    server = StubServer([(500, {}, b'error')] * 2)
+    try:
+        client = LLMHttpClient(url=server.url, api_key='key', max_retries=1)
+        with pytest.raises(LLMRequestError) as error:
+            client.post_json({'model': 'm'})
+    finally:
+        server.close()
+    assert error.value.status == 500
+    assert len(server.requests) == 2 and len(sleeps) == 1
+    assert not client.latencies[-1]['ok']
+
+
+def test_stream_yields_utf8_deltas(sleeps):
+    events = ''.join(f"data: {json.dumps({'choices': [{'delta': {'content': text}}]})}\n\n"
+                     for text in ('Café ', '→ done')) + 'data: [DONE]\n\n'
+    server = StubServer([(200, {'Content-Type': 'text/event-stream'}, events.encode('utf-8'))])
+    try:
+        client = LLMHttpClient(url=server.url, api_key='key')
+        assert ''.join(client.stream_content({'model': 'm'})) == 'Café → done'
+    finally:
+        server.close()
+    assert server.requests[0]['stream'] is True
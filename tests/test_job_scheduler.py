@@ -0,0 +1,61 @@
+import threading
+import pytest
+from scheduler.job_scheduler import COMPLETED, FAILED, QUEUED, RUNNING, JobScheduler, QueueFullError
+
+
+class FakeAgent:
+    def __init__(self, gate=None):
+        self.step_listener = None
+        self.gate = gate
+        self.calls = []
+
+    def run_automation(self, instruction, load_profile=None, browser_profile=None, job_id=None):
+        self.calls.append((instruction, job_id))
+        if self.gate:
+            self.gate.wait(5)
+        if instruction == 'explode':
+            raise RuntimeError('boom')
+        self.step_listener({"step": 1})
+        return {"status": "completed", "reason": None, "steps": 1}
+
+
+def test_job_completes_with_result_and_steps():
+    agent = FakeAgent()
+    scheduler = JobScheduler(lambda: agent, workers=1, queue_size=4).start()
+    job = scheduler.submit('open example.com')
+    assert job.wait(5)
+    assert job.status == COMPLETED
+    assert job.result["status"] == "completed"
+    assert job.to_dict()["steps"] == 1
+    assert agent.calls == [('open example.com', job.id)]
+    scheduler.shutdown()
+
+
+def test_agent_exception_marks_job_failed_and_worker_survives():
+    scheduler = JobScheduler(FakeAgent, workers=1, queue_size=4).start()
+    failed = scheduler.submit('explode')
+    after = scheduler.submit('next')
+    assert failed.wait(5) and after.wait(5)
+    assert failed.status == FAILED and failed.error == 'boom'
+    assert after.status == COMPLETED
+    scheduler.shutdown()
+
+
+def test_full_queue_rejects_and_states_progress():
+    gate = threading.Event()
+    scheduler = JobScheduler(lambda: FakeAgent(gate), workers=1, queue_size=1).start()
+    running = scheduler.submit('first')
+    for _ in range(100):
+        if running.status == RUNNING:
+            break
+        threading.Event().wait(0.01)
+    assert running.status == RUNNING
+    queued = scheduler.submit('second')
+    assert queued.status == QUEUED
+    with pytest.raises(QueueFullError):
+        scheduler.submit('third')
+    assert scheduler.status() == {RUNNING: 1, QUEUED: 1, "waiting": 1}
+    gate.set()
+    assert running.wait(5) and queued.wait(5)
+    assert [job.id for job in scheduler.recent()] == [queued.id, running.id]
+    scheduler.shutdown()
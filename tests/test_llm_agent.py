@@ -0,0 +1,80 @@
+import json
+import threading
+import pytest
+
+pytest.importorskip('requests')
+
+from config import Config
+from llm_agent.agent import LLMAgent
+from llm_agent.response_cache import ResponseCache
+
+ACTION = json.dumps({"action_type": "click", "target_element": "Search", "reasoning": "r"})
+ARGS = ('search for cats', {'elements': []}, [], 'step1.png')
+
+
+class FakeClient:
+    def __init__(self, release=None):
+        self.calls = 0
+        self.release = release
+
+    def post_json(self, data):
+        self.calls += 1
+        return {'choices': [{'message': {'content': ACTION}}]}
+
+    def stream_content(self, data):
+        self.calls += 1
+        yield ACTION
+        self.release.wait(5)  # the rest of the completion arrives after the action was dispatched
+        yield '\n'
+
+
+def make_agent(tmp_path, client):
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(Config, 'LLM_CACHE_ENABLED', False)  # keep the shared cache out of data/
+        agent = LLMAgent()
+    agent.http_client = client
+    agent.response_cache = ResponseCache(path=str(tmp_path / 'cache.sqlite'))
+    return agent
+
+
+def test_failed_action_is_not_served_from_cache_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_STREAMING', False)
+    client = FakeClient()
+    agent = make_agent(tmp_path, client)
+    assert agent.get_action_suggestion(*ARGS)['action_type'] == 'click'
+    agent.get_action_suggestion(*ARGS)
+    assert client.calls == 1  # second identical prompt came from the cache
+    agent.invalidate_last()
+    agent.get_action_suggestion(*ARGS)
+    assert client.calls == 2
+
+
+def test_action_failing_while_its_stream_drains_is_not_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_STREAMING', True)
+    release = threading.Event()
+    agent = make_agent(tmp_path, FakeClient(release))
+    assert agent.get_action_suggestion(*ARGS)['target_element'] == 'Search'
+    key = agent.last_cache_key
+    agent.invalidate_last()
+    release.set()
+    for thread in threading.enumerate():
+        if thread.name == 'LLMStreamDrain':
+            thread.join(5)
+    assert agent.stream_timings[-1]['ok']
+    assert agent.response_cache.get(key) is None
+
+
+def test_latency_report_covers_api_calls_and_streaming(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_STREAMING', True)
+    release = threading.Event()
+    release.set()
+    client = FakeClient(release)
+    client.latency_summary = lambda: {"calls": 1, "failures": 0, "avg": 0.2, "p95": 0.2}
+    agent = make_agent(tmp_path, client)
+    assert agent.latency_report() == {"api": client.latency_summary()}
+    agent.get_action_suggestion(*ARGS)
+    for thread in threading.enumerate():
+        if thread.name == 'LLMStreamDrain':
+            thread.join(5)
+    streaming = agent.latency_report()["streaming"]
+    assert streaming["calls"] == 1 and streaming["avg_first_action"] <= streaming["avg"]
@@ -0,0 +1,59 @@
+from browser import load_profiles
+from browser.load_profiles import IMAGE_PATTERNS, TRACKER_PATTERNS, LoadProfile
+
+
+class FakeDriver:
+    """Accepts CDP commands but offers no DevTools event connection"""
+
+    def __init__(self):
+        self.blocked_urls = None
+
+    def execute_cdp_cmd(self, command, params):
+        if command == 'Network.setBlockedURLs':
+            self.blocked_urls = params['urls']
+        return {}
+
+
+class FakeBlocker:
+    started = []
+
+    def __init__(self, driver, resource_types):
+        self.resource_types = resource_types
+        self.stopped = False
+
+    def start(self):
+        self.started.append(self)
+        return True
+
+    def stop(self):
+        self.stopped = True
+
+
+def test_resource_types_are_blocked_by_interception_not_url(monkeypatch):
+    monkeypatch.setattr(load_profiles, 'ResourceTypeBlocker', FakeBlocker)
+    driver = FakeDriver()
+    assert LoadProfile(driver, 'no-media').name == 'no-media'
+    assert driver.blocked_urls == TRACKER_PATTERNS
+    assert FakeBlocker.started[-1].resource_types == ['Image', 'Media', 'Font']
+
+    first = FakeBlocker.started[-1]
+    LoadProfile(driver, 'text-only')
+    assert first.stopped
+    assert 'Stylesheet' in FakeBlocker.started[-1].resource_types
+
+    LoadProfile(driver, 'full')
+    assert FakeBlocker.started[-1].stopped
+    assert driver.blocked_urls == []
+
+
+def test_url_suffix_patterns_when_interception_is_unavailable():
+    driver = FakeDriver()
+    assert LoadProfile(driver, 'no-media').name == 'no-media'
+    assert set(IMAGE_PATTERNS + TRACKER_PATTERNS) <= set(driver.blocked_urls)
+    assert '*.css*' not in driver.blocked_urls
+
+
+def test_unknown_profile_falls_back_to_full():
+    driver = FakeDriver()
+    assert LoadProfile(driver, 'everything').name == 'full'
+    assert driver.blocked_urls == []
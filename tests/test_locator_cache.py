@@ -0,0 +1,59 @@
+import json
+from executor import locator_cache
+from executor.locator_cache import LocatorCache, page_key_for_url
+
+
+def make_cache(tmp_path, **kwargs):
+    return LocatorCache(path=str(tmp_path / 'locators.json'), **kwargs)
+
+
+def read(tmp_path):
+    with open(tmp_path / 'locators.json') as f:
+        return json.load(f)
+
+
+def test_page_key_uses_host_and_first_segment():
+    assert page_key_for_url('https://Mail.Google.com/mail/u/0/#inbox') == ('mail.google.com', 'mail')
+    assert page_key_for_url('https://example.com/') == ('example.com', 'root')
+
+
+def test_store_and_lookup_ignore_target_case(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store('example.com', 'root', 'Search', 'css', '#q')
+    assert cache.lookup('example.com', 'root', '  search ')['selector'] == '#q'
+    assert read(tmp_path)[cache.key('example.com', 'root', 'search')]['selector'] == '#q'
+
+
+def test_hits_are_written_in_batches(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store('example.com', 'root', 'search', 'css', '#q')
+    cache.record_hit('example.com', 'root', 'search')
+    cache.record_hit('example.com', 'root', 'search')
+    key = cache.key('example.com', 'root', 'search')
+    assert read(tmp_path)[key]['hits'] == 0
+    cache.flush()
+    assert read(tmp_path)[key]['hits'] == 2
+    assert cache.hit_rate() == 1.0
+
+
+def test_entry_dropped_after_excess_misses(tmp_path, monkeypatch):
+    monkeypatch.setattr(locator_cache.Config, 'LOCATOR_CACHE_MAX_EXCESS_MISSES', 1)
+    cache = make_cache(tmp_path)
+    cache.store('example.com', 'root', 'search', 'css', '#q')
+    cache.record_miss('example.com', 'root', 'search')
+    assert cache.lookup('example.com', 'root', 'search')
+    cache.record_miss('example.com', 'root', 'search')
+    assert cache.lookup('example.com', 'root', 'search') is None
+
+
+def test_least_recently_used_entry_evicted_when_full(tmp_path, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(locator_cache.time, 'time', lambda: next(clock))
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.store('a.com', 'root', 'one', 'css', '#one')
+    cache.store('a.com', 'root', 'two', 'css', '#two')
+    cache.record_hit('a.com', 'root', 'one')
+    cache.store('a.com', 'root', 'three', 'css', '#three')
+    assert cache.lookup('a.com', 'root', 'two') is None
+    assert cache.lookup('a.com', 'root', 'one')
+    assert cache.lookup('a.com', 'root', 'three')
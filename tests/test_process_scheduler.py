@@ -0,0 +1,38 @@
+import multiprocessing
+import time
+from scheduler.job_scheduler import COMPLETED
+from scheduler.process_scheduler import ProcessJobScheduler
+
+
+class FakeBrowserPool:
+    def close(self):
+        pass
+
+
+class FakeAgent:
+    """Picklable stand-in for GUIAutomationAgent, built inside the worker process"""
+
+    def __init__(self):
+        self.step_listener = None
+        self.browser_pool = FakeBrowserPool()
+
+    def run_automation(self, instruction, load_profile=None, browser_profile=None, job_id=None):
+        self.step_listener({"step": 1})
+        return {"status": "completed", "reason": instruction, "steps": 1}
+
+
+def test_worker_that_died_while_idle_is_restarted_before_the_next_job():
+    scheduler = ProcessJobScheduler(FakeAgent, workers=1, queue_size=2).start()
+    try:
+        first = scheduler.submit('first')
+        assert first.wait(60) and first.status == COMPLETED
+        for process in multiprocessing.active_children():
+            process.kill()
+            process.join(10)
+        time.sleep(0.1)
+        second = scheduler.submit('second')
+        assert second.wait(60)
+        assert second.status == COMPLETED, second.error
+        assert second.result["reason"] == 'second' and len(second.steps) == 1
+    finally:
+        scheduler.shutdown()
@@ -0,0 +1,47 @@
+import json
+import os
+import socket
+import subprocess
+import sys
+from browser.profiles import LOCK_FILE, ProfileManager
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def write_lock(lock_path, pid):
+    owner = {"pid": pid, "host": socket.gethostname(), "thread": 1, "since": 0}
+    with open(lock_path, 'w') as f:
+        json.dump(owner, f)
+    return owner
+
+
+def test_stale_lock_is_reclaimed(tmp_path):
+    manager = ProfileManager(root=str(tmp_path / 'profiles'), snapshots_root=str(tmp_path / 'snapshots'))
+    os.makedirs(manager.path('work'))
+    write_lock(os.path.join(manager.path('work'), LOCK_FILE), dead_pid())
+    manager.acquire('work', timeout=0)
+    with open(os.path.join(manager.path('work'), LOCK_FILE)) as f:
+        assert json.load(f)["pid"] == os.getpid()
+
+
+def test_late_reclaimer_leaves_the_new_lock_alone(tmp_path):
+    manager = ProfileManager(root=str(tmp_path / 'profiles'), snapshots_root=str(tmp_path / 'snapshots'))
+    os.makedirs(manager.path('work'))
+    lock_path = os.path.join(manager.path('work'), LOCK_FILE)
+    stale_owner = write_lock(lock_path, dead_pid())
+    manager.acquire('work', timeout=0)  # first waiter reclaims and takes the profile
+
+    # Second waiter read the dead owner before the first one replaced the lock
+    late = ProfileManager(root=manager.root, snapshots_root=manager.snapshots_root)
+    reads = iter([stale_owner])
+    real_owner = late._lock_owner
+    late._lock_owner = lambda path: next(reads, None) or real_owner(path)
+    assert not late._reclaim_stale_lock(lock_path)
+
+    with open(lock_path) as f:
+        assert json.load(f)["pid"] == os.getpid()
+    assert os.listdir(manager.path('work')) == [LOCK_FILE]
@@ -0,0 +1,54 @@
+from llm_agent.prompt_compiler import PromptCompiler, estimate_tokens
+
+
+def element(element_type, label, x, y):
+    return {"type": element_type, "label": label, "coordinates": [x, y]}
+
+
+def rows(text):
+    return [line for line in text.splitlines()[1:] if not line.startswith('(')]
+
+
+def test_rows_ranked_by_instruction_overlap():
+    tree = {"elements": [element('link', 'Privacy', 10, 10), element('input_text', 'Search', 50, 20)]}
+    text, stats = PromptCompiler(token_budget=500).compile(tree, 'search for python tutorials')
+    assert rows(text) == ['input_text|Search|50,20', 'link|Privacy|10,10']
+    assert stats['kept'] == 2 and stats['elements'] == 2
+
+
+def test_budget_cuts_off_least_relevant_rows():
+    tree = {"elements": [element('link', f'Footer link {i}', i, 900) for i in range(50)]
+                        + [element('button', 'Compose', 20, 100)]}
+    budget = 40
+    text, stats = PromptCompiler(token_budget=budget).compile(tree, 'compose an email')
+    kept = rows(text)
+    assert kept[0] == 'button|Compose|20,100'
+    assert 1 < len(kept) < 51
+    assert stats['kept'] == len(kept)
+    assert estimate_tokens("\n".join(text.splitlines()[:-1])) <= budget + len(kept)
+    assert text.splitlines()[-1] == f"({51 - len(kept)} less relevant, duplicate or off-screen elements omitted)"
+    assert stats['saved'] > 0
+
+
+def test_offscreen_elements_dropped_unless_relevant(monkeypatch):
+    monkeypatch.setattr('llm_agent.prompt_compiler.Config.PROMPT_OFFSCREEN_MARGIN', 100)
+    tree = {"viewport": [0, 0, 800, 600], "elements": [
+        element('button', 'Visible', 100, 100),
+        element('link', 'Careers', 100, 3000),
+        element('button', 'Send', 100, 3000),
+    ]}
+    text, _ = PromptCompiler(token_budget=500).compile(tree, 'send the email')
+    assert rows(text) == ['button|Send|100,3000', 'button|Visible|100,100']
+
+
+def test_duplicates_need_same_label_and_position():
+    tree = {"elements": [
+        element('button', 'Reply', 10, 10),
+        element('button', 'Reply', 10, 10),
+        element('button', 'Reply', 10, 400),
+        element('button', '', 30, 30),
+        element('button', '', 60, 30),
+    ]}
+    text, stats = PromptCompiler(token_budget=500).compile(tree, 'reply')
+    assert sorted(rows(text)) == sorted(['button||30,30', 'button||60,30', 'button|Reply|10,10', 'button|Reply|10,400'])
+    assert stats['kept'] == 4
@@ -0,0 +1,49 @@
+from llm_agent.response_cache import ResponseCache
+
+
+def make_cache(tmp_path, **kwargs):
+    return ResponseCache(path=str(tmp_path / 'cache.sqlite'), **kwargs)
+
+
+def test_key_ignores_screenshot_line_whitespace_and_stream_flag():
+    cache = ResponseCache.__new__(ResponseCache)
+    first = {'model': 'm', 'messages': [{'role': 'user', 'content': 'Click  it\nCurrent Screenshot: a.png'}]}
+    second = {'model': 'm', 'stream': True,
+              'messages': [{'role': 'user', 'content': 'Click it\nCurrent Screenshot: b.png'}]}
+    assert cache.key(first) == cache.key(second)
+    assert cache.key(first) != cache.key({**first, 'model': 'other'})
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path, memory_entries=2)
+    cache.put('a', 'A')
+    cache.put('b', 'B')
+    assert cache.get('a') == 'A'  # 'b' is now the least recently used
+    cache.put('c', 'C')
+    assert list(cache.memory) == ['a', 'c']
+    # Evicted from memory, still served by the persistent tier
+    assert cache.get('b') == 'B'
+    assert cache.stats['disk_hits'] == 1
+
+
+def test_expired_entries_are_ignored_and_purged(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('llm_agent.response_cache.time.time', lambda: now[0])
+    cache = make_cache(tmp_path, ttl=10)
+    cache.put('a', 'A')
+    now[0] += 5
+    assert cache.get('a') == 'A'
+    now[0] += 10
+    assert cache.get('a') is None
+    assert 'a' not in cache.memory
+    # A fresh instance drops the expired row on open
+    assert make_cache(tmp_path, ttl=10)._query("SELECT COUNT(*) FROM responses", ())[0] == 0
+
+
+def test_entries_survive_restart_and_invalidate(tmp_path):
+    make_cache(tmp_path).put('a', 'A')
+    cache = make_cache(tmp_path)
+    assert cache.get('a') == 'A'
+    cache.invalidate('a')
+    assert cache.get('a') is None
+    assert cache.hit_rate() == 0.5
@@ -0,0 +1,99 @@
+import json
+import os
+import pytest
+from utils import screenshot_store
+from utils.screenshot_store import ScreenshotStore
+
+
+def make_store(tmp_path, **kwargs):
+    kwargs.setdefault('max_bytes', 0)
+    kwargs.setdefault('max_age', 0)
+    kwargs.setdefault('phash_threshold', -1)
+    return ScreenshotStore(root=str(tmp_path), **kwargs)
+
+
+def test_identical_name_is_not_written_twice(tmp_path):
+    store = make_store(tmp_path)
+    store.add('a.png', b'frame')
+    store.add('a.png', b'frame')
+    assert store.stats['writes'] == 1
+    assert store.stats['exact_hits'] == 1
+
+
+def test_matching_phash_alone_does_not_share_a_frame(tmp_path):
+    store = make_store(tmp_path, phash_threshold=4)
+    store.add('a.png', b'first', phash=0b1010)
+    store.add('b.png', b'second', phash=0b1010)
+    assert store.stats['perceptual_hits'] == 0
+    with open(store.path('b.png'), 'rb') as f:
+        assert f.read() == b'second'
+
+
+def test_perceptual_match_is_confirmed_by_pixels(tmp_path):
+    pytest.importorskip('PIL')
+    import io
+    from PIL import Image, ImageDraw
+
+    def png(text):
+        image = Image.new('RGB', (64, 32), 'white')
+        if text:
+            ImageDraw.Draw(image).text((2, 10), text, fill='black')
+        output = io.BytesIO()
+        image.save(output, format='PNG')
+        return output.getvalue()
+
+    store = make_store(tmp_path, phash_threshold=64)
+    store.add('blank.png', png(''), phash=0)
+    store.add('typed.png', png('hello'), phash=0)
+    assert store.stats['perceptual_hits'] == 0
+    store.add('blank2.png', png(''), phash=0)
+    assert store.stats['perceptual_hits'] == 1
+
+
+def test_size_retention_evicts_least_recently_used(tmp_path, monkeypatch):
+    clock = iter(range(100))
+    monkeypatch.setattr(screenshot_store.time, 'time', lambda: next(clock))
+    store = make_store(tmp_path, max_bytes=10)
+    store.add('a.png', b'aaaa')
+    store.add('b.png', b'bbbb')
+    store.touch('a.png')
+    store.add('c.png', b'cccc')
+    assert set(store.entries) == {'a.png', 'c.png'}
+    assert store.total_bytes() == 8
+    assert not os.path.exists(store.path('b.png'))
+
+
+def test_index_writes_are_batched(tmp_path):
+    store = make_store(tmp_path)
+    store.add('a.png', b'a')
+    store.add('b.png', b'b')
+    with open(store.index_path) as f:
+        assert set(json.load(f)) == {'a.png'}
+    store.save()
+    with open(store.index_path) as f:
+        assert set(json.load(f)) == {'a.png', 'b.png'}
+    assert set(make_store(tmp_path).entries) == {'a.png', 'b.png'}
+
+
+def test_reencoded_frame_is_shared_with_default_threshold(tmp_path):
+    pytest.importorskip('PIL')
+    import io
+    from PIL import Image, ImageDraw
+    from utils.screenshot_store import dhash
+
+    screen = Image.new('RGB', (320, 200), 'white')
+    ImageDraw.Draw(screen).rectangle((20, 20, 200, 60), fill='navy')
+    ImageDraw.Draw(screen).text((30, 100), 'Search results', fill='black')
+    encodings = []
+    for level in (1, 9):
+        output = io.BytesIO()
+        screen.save(output, format='PNG', compress_level=level)
+        encodings.append(output.getvalue())
+    assert encodings[0] != encodings[1]
+
+    store = ScreenshotStore(root=str(tmp_path), max_bytes=0, max_age=0)
+    assert store.phash_threshold >= 0
+    for number, data in enumerate(encodings):
+        store.add(f"frame{number}.png", data, phash=dhash(Image.open(io.BytesIO(data))))
+    assert store.stats['perceptual_hits'] == 1 and store.stats['writes'] == 1
+    assert os.path.samefile(store.path('frame0.png'), store.path('frame1.png'))
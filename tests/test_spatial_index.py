@@ -0,0 +1,45 @@
+from executor.coordinate_resolver import CoordinateResolver
+from gui_capturer.spatial_index import SpatialIndex
+
+
+def element(label, bounds, z=0, element_type='button'):
+    x, y, width, height = bounds
+    return {"type": element_type, "label": label, "bounds": list(bounds),
+            "coordinates": [x + width // 2, y + height // 2], "z": z}
+
+
+def test_point_in_rect_prefers_higher_z_then_later_order():
+    page = element('page', (0, 0, 1000, 1000))
+    dialog = element('dialog', (100, 100, 200, 200), z=10)
+    button = element('ok', (150, 150, 40, 20), z=10)
+    index = SpatialIndex([page, dialog, button], cell_size=64)
+    assert index.element_at(160, 160) is button
+    assert index.elements_at(160, 160) == [button, dialog, page]
+    assert index.element_at(500, 500) is page
+    assert index.element_at(2000, 2000) is None
+
+
+def test_nearest_respects_max_distance():
+    left = element('left', (0, 0, 10, 10))
+    right = element('right', (300, 0, 10, 10))
+    index = SpatialIndex([left, right], cell_size=32)
+    assert index.nearest(40, 5) is left
+    assert index.nearest(250, 5) is right
+    assert index.nearest(150, 500, max_distance=50) is None
+
+
+def test_coordinate_only_elements_are_points():
+    demo = {"type": "input", "label": "Search Box", "coordinates": [297, 161]}
+    index = SpatialIndex([demo])
+    assert index.element_at(297, 161) is demo
+    assert index.nearest(300, 170) is demo
+
+
+def test_match_point_skips_non_typeable_elements_for_type():
+    field = element('Search', (0, 0, 200, 30), element_type='input_text')
+    submit = element('Go', (150, 0, 50, 30), z=1, element_type='input_submit')
+    index = SpatialIndex([field, submit])
+    resolver = CoordinateResolver(driver_instance=None)
+    assert resolver.match_point(170, 10, index, 'click') is submit
+    assert resolver.match_point(170, 10, index, 'type') is field
+    assert resolver.match_point(600, 600, index, 'click') is None
@@ -1,10 +1,9 @@
-import gradio as gr
-import threading
 from config import Config
+from scheduler.job_scheduler import QueueFullError
 
 class UIServer:
-    def __init__(self, agent):
-        self.agent = agent
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
         
     def process_text_input(self, instruction):
         """Process text instruction"""
@@ -12,19 +11,24 @@ class UIServer:
             return "Please enter a valid instruction."
             
         try:
-            # Run automation in separate thread
-            thread = threading.Thread(
-                target=self.agent.run_automation,
-                args=(instruction,)
-            )
-            thread.daemon = True
-            thread.start()
-            
-            return f"Automation started for: {instruction}"
+            # Queue for the next free worker; each worker has its own browser
+            job = self.scheduler.submit(instruction)
+            return f"Automation queued as job {job.id}: {instruction}"
             
+        except QueueFullError as e:
+            return f"Too many automations pending, not queued: {str(e)}"
         except Exception as e:
             return f"Error starting automation: {str(e)}"
     
+    def job_status_text(self):
+        """Summary of recent jobs, newest first"""
+        lines = [", ".join(f"{name}: {count}" for name, count in self.scheduler.status().items())]
+        for job in self.scheduler.recent():
+            info = job.to_dict()
+            outcome = info["result"]["status"] if info["result"] else (info["error"] or "")
+            lines.append(f"#{info['id']} [{info['status']}] {info['instruction']} {outcome}".rstrip())
+        return "\n".join(lines)
+    
     def process_audio_input(self, audio_file, instruction):
         """Process audio input with fallback to text"""
         if audio_file is not None:
@@ -35,6 +39,8 @@ class UIServer:
     
     def create_interface(self):
         """Create Gradio interface"""
+        import gradio as gr  # Loaded on first use: importing gradio takes seconds
+
         with gr.Blocks(title="GUI Automation Agent") as interface:
             gr.Markdown("# GUI Automation Agent")
             gr.Markdown("Enter instructions for web automation tasks")
@@ -60,6 +66,10 @@ class UIServer:
                 audio_submit = gr.Button("Process Audio")
                 audio_output = gr.Textbox(label="Status", lines=5)
             
+            with gr.Tab("Jobs"):
+                jobs_refresh = gr.Button("Refresh")
+                jobs_output = gr.Textbox(label="Jobs", lines=10)
+            
             # Event handlers
             text_submit.click(
                 fn=self.process_text_input,
@@ -73,11 +83,17 @@ class UIServer:
                 outputs=[audio_output]
             )
             
+            jobs_refresh.click(
+                fn=self.job_status_text,
+                inputs=[],
+                outputs=[jobs_output]
+            )
+            
         return interface
     
-    def launch(self):
+    def launch(self, interface=None):
         """Launch Gradio interface"""
-        interface = self.create_interface()
+        interface = interface or self.create_interface()
         interface.launch(
             server_port=Config.GRADIO_PORT,
             share=Config.GRADIO_SHARE,
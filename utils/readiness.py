@@ -0,0 +1,108 @@
+import time
+from config import Config
+from utils.logger import Logger
+
+# In-page tracker: counts in-flight fetch/XHR requests and remembers the time of the
+# last DOM mutation. Installed on every new document through CDP when available so
+# requests issued during page load are counted too; otherwise lazily by READY_STATE_SCRIPT.
+TRACKER_SOURCE = r"""
+(function () {
+    if (window.__shizaReady) return;
+    var state = window.__shizaReady = {inflight: 0, lastMutation: performance.now()};
+
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            state.inflight++;
+            var done = function () { state.inflight = Math.max(0, state.inflight - 1); };
+            var request = originalFetch.apply(this, arguments);
+            request.then(done, done);
+            return request;
+        };
+    }
+
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        state.inflight++;
+        this.addEventListener('loadend', function () { state.inflight = Math.max(0, state.inflight - 1); });
+        return originalSend.apply(this, arguments);
+    };
+
+    var observe = function () {
+        new MutationObserver(function () { state.lastMutation = performance.now(); })
+            .observe(document.documentElement, {subtree: true, childList: true, attributes: true, characterData: true});
+    };
+    if (document.documentElement) observe();
+    else document.addEventListener('DOMContentLoaded', observe);
+})();
+"""
+
+READY_STATE_SCRIPT = TRACKER_SOURCE + r"""
+var state = window.__shizaReady;
+var animations = 0;
+if (document.getAnimations) {
+    var running = document.getAnimations();
+    for (var i = 0; i < running.length; i++) {
+        var timing = running[i].effect ? running[i].effect.getComputedTiming() : null;
+        // Infinite animations (spinners, carousels) never settle; ignore them
+        if (running[i].playState === 'running' && timing && isFinite(timing.endTime)) animations++;
+    }
+}
+return {
+    readyState: document.readyState,
+    inflight: state.inflight,
+    quietMs: performance.now() - state.lastMutation,
+    animations: animations
+};
+"""
+
+
+class PageReadiness:
+    """Wait only as long as the page actually needs to settle.
+
+    A page is ready when document.readyState is 'complete', no fetch/XHR is in
+    flight, the DOM has been quiet for READINESS_QUIET_MS and no finite
+    animation is running. READINESS_MAX_WAIT is the hard cap.
+    """
+
+    def __init__(self, driver_instance, max_wait=None, quiet_ms=None, poll_interval=None):
+        self.logger = Logger()
+        self.driver = driver_instance
+        self.max_wait = max_wait if max_wait is not None else Config.READINESS_MAX_WAIT
+        self.quiet_ms = quiet_ms if quiet_ms is not None else Config.READINESS_QUIET_MS
+        self.poll_interval = poll_interval or Config.READINESS_POLL_INTERVAL
+
+    def install(self):
+        """Register the tracker for every future document (Chrome only; optional)"""
+        try:
+            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': TRACKER_SOURCE})
+            return True
+        except Exception:
+            return False
+
+    def is_ready(self, state):
+        return (
+            state.get('readyState') == 'complete'
+            and state.get('inflight', 0) == 0
+            and state.get('quietMs', 0) >= self.quiet_ms
+            and state.get('animations', 0) == 0
+        )
+
+    def wait_until_ready(self, max_wait=None):
+        """Poll until the page is ready or the cap passes. Returns (ready, settle seconds)."""
+        max_wait = self.max_wait if max_wait is None else max_wait
+        start = time.monotonic()
+        state = {}
+        while True:
+            try:
+                state = self.driver.execute_script(READY_STATE_SCRIPT) or {}
+            except Exception:
+                # Document is being replaced (navigation); keep polling
+                state = {}
+            elapsed = time.monotonic() - start
+            if self.is_ready(state):
+                return True, elapsed
+            if elapsed + self.poll_interval > max_wait:
+                self.logger.log(f" Page not settled after {elapsed * 1000:.0f} ms (last state: {state}).")
+                return False, elapsed
+            time.sleep(self.poll_interval)
@@ -0,0 +1,222 @@
+import atexit
+import io
+import json
+import os
+import threading
+import time
+from config import Config
+from utils.logger import Logger
+
+try:
+    from PIL import Image, ImageChops
+except ImportError:  # without Pillow perceptual matches cannot be confirmed, so only exact frames are shared
+    Image = None
+
+# Largest per-channel difference still treated as the same pixel (lossy re-encoding noise)
+PIXEL_TOLERANCE = 8
+
+
+def dhash(image, hash_size=8):
+    """64-bit difference hash of a PIL image: robust to re-encoding and tiny rendering noise"""
+    pixels = image.convert('L').resize((hash_size + 1, hash_size)).tobytes()  # one byte per pixel
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+class ScreenshotStore:
+    """Content-addressed screenshot directory with a perceptual-hash index.
+
+    Frames are stored as <content hash>.<ext>, so a byte-identical frame costs a
+    hash lookup instead of a write. With SCREENSHOT_PHASH_THRESHOLD >= 0, a frame
+    whose perceptual hash matches a stored one is hard-linked to it only after a
+    pixel comparison confirms the two images are the same; the coarse hash alone
+    would merge frames that differ in typed text or an error banner. index.json
+    keeps last-access times so the directory can be bounded by total size and
+    idle age with LRU eviction; it is written at most every INDEX_SAVE_INTERVAL
+    seconds and once more at exit.
+    """
+
+    INDEX_NAME = 'index.json'
+    INDEX_SAVE_INTERVAL = 5
+
+    def __init__(self, root=None, max_bytes=None, max_age=None, phash_threshold=None):
+        self.logger = Logger()
+        self.root = root or Config.SCREENSHOTS_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else Config.SCREENSHOT_STORE_MAX_BYTES
+        self.max_age = max_age if max_age is not None else Config.SCREENSHOT_STORE_MAX_AGE
+        self.phash_threshold = phash_threshold if phash_threshold is not None else Config.SCREENSHOT_PHASH_THRESHOLD
+        self.index_path = os.path.join(self.root, self.INDEX_NAME)
+        self.entries = {}  # file name -> {"blob", "size", "phash", "created", "last_access"}
+        self.stats = {"exact_hits": 0, "perceptual_hits": 0, "writes": 0, "evictions": 0}
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._last_save = 0.0
+
+        os.makedirs(self.root, exist_ok=True)
+        self._load_index()
+        atexit.register(self.save)
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def touch(self, name):
+        """Mark a stored frame as used; returns False if it is not in the store"""
+        with self._lock:
+            entry = self.entries.get(name)
+            if not entry:
+                return False
+            entry["last_access"] = time.time()
+            self.stats["exact_hits"] += 1
+            self._dirty = True
+            return True
+
+    def add(self, name, data, phash=None):
+        """Store encoded frame data under name, reusing a perceptually identical frame if one exists"""
+        with self._lock:
+            now = time.time()
+            if name in self.entries:
+                self.entries[name]["last_access"] = now
+                self.stats["exact_hits"] += 1
+                return self.path(name)
+
+            similar = self._find_similar(phash, data)
+            if similar and self._link(similar, name):
+                blob = self.entries[similar]["blob"]
+                size = self.entries[similar]["size"]
+                self.entries[similar]["last_access"] = now
+                self.stats["perceptual_hits"] += 1
+            else:
+                self._write(name, data)
+                blob, size = name, len(data)
+                self.stats["writes"] += 1
+
+            self.entries[name] = {
+                "blob": blob, "size": size, "phash": phash,
+                "created": now, "last_access": now
+            }
+            self.enforce_retention()
+            self._dirty = True
+            if now - self._last_save >= self.INDEX_SAVE_INTERVAL:
+                self.save()
+            return self.path(name)
+
+    def save(self):
+        """Write index.json if anything changed since the last write"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self._save_index()
+                self._dirty = False
+                self._last_save = time.time()
+            except OSError as e:
+                self.logger.log(f"ScreenshotStore: Could not save index: {e}")
+
+    def total_bytes(self):
+        """Bytes on disk; hard-linked names sharing one blob are counted once"""
+        with self._lock:
+            blobs = {}
+            for entry in self.entries.values():
+                blobs[entry["blob"]] = entry["size"]
+            return sum(blobs.values())
+
+    def enforce_retention(self):
+        """Evict frames idle for longer than max_age, then least recently used ones until under max_bytes"""
+        with self._lock:
+            now = time.time()
+            if self.max_age:
+                for name, entry in list(self.entries.items()):
+                    if now - entry["last_access"] > self.max_age:
+                        self._evict(name)
+
+            if self.max_bytes:
+                # Running total: a blob's bytes are freed when its last name is evicted
+                references, sizes = {}, {}
+                for entry in self.entries.values():
+                    references[entry["blob"]] = references.get(entry["blob"], 0) + 1
+                    sizes[entry["blob"]] = entry["size"]
+                total = sum(sizes.values())
+                by_access = sorted(self.entries, key=lambda n: self.entries[n]["last_access"])
+                for name in by_access:
+                    if total <= self.max_bytes:
+                        break
+                    blob = self.entries[name]["blob"]
+                    self._evict(name)
+                    references[blob] -= 1
+                    if not references[blob]:
+                        total -= sizes[blob]
+
+    def _find_similar(self, phash, data):
+        """Stored frame whose perceptual hash is within the threshold and whose pixels match data"""
+        if phash is None or Image is None or self.phash_threshold is None or self.phash_threshold < 0:
+            return None
+        candidates = []
+        for name, entry in self.entries.items():
+            if entry.get("phash") is None:
+                continue
+            distance = bin(phash ^ entry["phash"]).count('1')
+            if distance <= self.phash_threshold:
+                candidates.append((distance, name))
+        for _, name in sorted(candidates):
+            if self._same_pixels(name, data):
+                return name
+        return None
+
+    def _same_pixels(self, name, data):
+        try:
+            with Image.open(self.path(name)) as stored:
+                stored = stored.convert('RGB')
+            with Image.open(io.BytesIO(data)) as frame:
+                frame = frame.convert('RGB')
+        except OSError:
+            return False
+        if stored.size != frame.size:
+            return False
+        extrema = ImageChops.difference(stored, frame).getextrema()
+        return max(high for _, high in extrema) <= PIXEL_TOLERANCE
+
+    def _link(self, existing, name):
+        """Hard-link name to an existing frame (no data write); False if links are unsupported"""
+        try:
+            os.link(self.path(existing), self.path(name))
+            return True
+        except OSError as e:
+            self.logger.log(f"ScreenshotStore: Hard link failed, writing a copy instead: {e}")
+            return False
+
+    def _write(self, name, data):
+        temp_path = f"{self.path(name)}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, self.path(name))
+
+    def _evict(self, name):
+        self.entries.pop(name, None)
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            pass
+        self.stats["evictions"] += 1
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            self.logger.log(f"ScreenshotStore: Could not read index, starting empty: {e}")
+            return
+        # Drop entries whose file was removed outside the store
+        self.entries = {name: entry for name, entry in entries.items() if os.path.exists(self.path(name))}
+
+    def _save_index(self):
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(temp_path, self.index_path)
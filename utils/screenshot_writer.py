@@ -0,0 +1,151 @@
+import hashlib
+import io
+import os
+import queue
+import threading
+import time
+from config import Config
+from utils.logger import Logger
+from utils.screenshot_store import ScreenshotStore, dhash
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional: without it frames are written as captured PNG
+    Image = None
+
+# Which capture events each SCREENSHOT_POLICY keeps. 'manual' (explicit user request) is always kept.
+POLICY_EVENTS = {
+    'always': ('step', 'failure'),
+    'on_failure': ('failure',),
+    'final': ('final',)
+}
+
+FORMAT_EXTENSIONS = {'png': 'png', 'jpeg': 'jpg', 'webp': 'webp'}
+
+
+class ScreenshotWriter:
+    """Encode and write screenshots on a background thread.
+
+    Callers hand over in-memory PNG bytes and get the destination path back
+    immediately; downscaling, re-encoding and the disk write happen off the
+    step loop. The queue is bounded and submit() never blocks: when it is
+    full the frame is dropped and counted instead.
+
+    With a ScreenshotStore attached, frames are content-addressed: the given
+    path is ignored and a repeated frame is resolved by hash without queueing.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, image_format=None, max_width=None, quality=None, queue_size=None, store=None):
+        self.logger = Logger()
+        self.store = store
+        self.image_format = (image_format or Config.SCREENSHOT_FORMAT).lower()
+        self.max_width = max_width if max_width is not None else Config.SCREENSHOT_MAX_WIDTH
+        self.quality = quality or Config.SCREENSHOT_QUALITY
+        self.queue = queue.Queue(maxsize=queue_size or Config.SCREENSHOT_QUEUE_SIZE)
+        self.dropped = 0
+        self.written = 0
+
+        if Image is None and (self.image_format != 'png' or self.max_width):
+            self.logger.log("ScreenshotWriter: Pillow not available, writing unscaled PNG.")
+            self.image_format = 'png'
+            self.max_width = None
+
+        self._thread = threading.Thread(target=self._run, name='screenshot-writer', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def shared(cls):
+        """Process-wide writer configured from Config"""
+        with cls._shared_lock:
+            if cls._shared is None:
+                store = ScreenshotStore() if Config.SCREENSHOT_STORE_ENABLED else None
+                cls._shared = cls(store=store)
+            return cls._shared
+
+    @staticmethod
+    def wants(event, policy):
+        """Whether a capture event should be kept under the given SCREENSHOT_POLICY"""
+        return event == 'manual' or event in POLICY_EVENTS.get(policy, POLICY_EVENTS['always'])
+
+    def target_path(self, path):
+        """Destination path with the extension of the configured output format"""
+        return f"{os.path.splitext(path)[0]}.{FORMAT_EXTENSIONS.get(self.image_format, 'png')}"
+
+    def submit(self, png_bytes, path):
+        """Queue PNG bytes for writing; returns the final path, or None if the frame was dropped"""
+        name = None
+        if self.store:
+            # Content-addressed: an already stored frame costs a hash, not a write
+            name = os.path.basename(self.target_path(hashlib.blake2b(png_bytes, digest_size=16).hexdigest()))
+            target = self.store.path(name)
+            if self.store.touch(name):
+                return target
+        else:
+            target = self.target_path(path)
+        try:
+            self.queue.put_nowait((png_bytes, target, name))
+        except queue.Full:
+            self.dropped += 1
+            self.logger.log(f"ScreenshotWriter: Queue full, dropped frame for {target} ({self.dropped} dropped so far).")
+            return None
+        return target
+
+    def flush(self, timeout=None):
+        """Block until every queued frame has been written (or the timeout passes)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _run(self):
+        while True:
+            png_bytes, target, name = self.queue.get()
+            try:
+                data, phash = self._encode(png_bytes)
+                if name:
+                    self.store.add(name, data, phash)
+                else:
+                    self._write(data, target)
+                self.written += 1
+            except Exception as e:
+                self.logger.log(f"ScreenshotWriter: Failed to write {target}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _encode(self, png_bytes):
+        """Downscale and re-encode if configured. Returns (data, perceptual hash or None)."""
+        if Image is None:
+            return png_bytes, None
+
+        image = Image.open(io.BytesIO(png_bytes))
+        phash = dhash(image) if self.store else None
+        if self.image_format == 'png' and not self.max_width:
+            return png_bytes, phash
+
+        if self.max_width and image.width > self.max_width:
+            height = int(image.height * self.max_width / image.width)
+            image = image.resize((self.max_width, height), Image.BILINEAR)
+        if self.image_format == 'jpeg' and image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        output = io.BytesIO()
+        if self.image_format == 'png':
+            image.save(output, format='PNG')
+        else:
+            image.save(output, format=self.image_format.upper(), quality=self.quality)
+        return output.getvalue(), phash
+
+    def _write(self, data, target):
+        """Write via a temp file so readers never see a half-written image"""
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+        temp_path = f"{target}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, target)
@@ -0,0 +1,40 @@
+import threading
+import time
+from contextlib import contextmanager
+from utils.logger import Logger
+
+
+class StartupTimer:
+    """Records how long each startup phase (imports, component init) takes and logs a breakdown"""
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []  # (name, seconds)
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self):
+        """Log each phase with its share of the time since the timer started"""
+        total = time.perf_counter() - self.started
+        lines = [f"Startup took {total * 1000:.0f} ms:"]
+        for name, seconds in self.phases:
+            share = seconds / total if total else 0
+            lines.append(f"  {name:<32} {seconds * 1000:8.0f} ms  {share:5.1%}")
+        Logger().log("\n".join(lines))
+        return {"total": total, "phases": dict(self.phases)}
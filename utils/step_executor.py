@@ -2,11 +2,13 @@ import time
 import re
 from typing import Dict, List, Tuple, Any
 from utils.ui_analyzer import UIAnalyzer
+from executor.locator_cache import LocatorCache, page_key_for_url
 
 class StepExecutor:
     def __init__(self, browser_controller):
         self.browser = browser_controller
         self.ui_analyzer = UIAnalyzer(browser_controller)
+        self.locator_cache = LocatorCache.shared()
         self.execution_log = []
     
     def execute_step(self, step: str, context: Dict = None) -> Tuple[bool, str, str]:
@@ -79,9 +81,45 @@ class StepExecutor:
                 return success, f"Executed generic step: {step}" if success else f"Failed to execute: {step}", screenshot
         
         except Exception as e:
-            screenshot = self.browser.take_screenshot("error")
+            screenshot = self.browser.take_screenshot("error", event="failure")
             return False, f"Error executing step: {str(e)}", screenshot
     
+    def _run_cached_strategies(self, target: str, strategies: List[Tuple[str, str]], attempt) -> bool:
+        """
+        Try locator strategies in order, starting with the one that last
+        resolved this target on the current host and page type
+        """
+        host, page_type = page_key_for_url(self.browser.get_current_url())
+        cached = self.locator_cache.lookup(host, page_type, target)
+        if cached:
+            preferred = (cached["by"], cached["selector"])
+            if attempt(*preferred):
+                self.locator_cache.record_hit(host, page_type, target)
+                return True
+            strategies = [strategy for strategy in strategies if strategy != preferred]
+        self.locator_cache.record_miss(host, page_type, target)
+        
+        for strategy_type, selector in strategies:
+            if attempt(strategy_type, selector):
+                self.locator_cache.store(host, page_type, target, strategy_type, selector)
+                return True
+        
+        return False
+    
+    def _attempt_click(self, strategy_type: str, selector: str) -> bool:
+        if strategy_type == "xpath":
+            return bool(self.browser.find_and_click(element_xpath=selector))
+        return False
+    
+    def _attempt_type(self, text: str):
+        def attempt(strategy_type: str, selector: str) -> bool:
+            if strategy_type == "name":
+                return bool(self.browser.find_and_type(text, element_name=selector))
+            elif strategy_type == "xpath":
+                return bool(self.browser.find_and_type(text, element_xpath=selector))
+            return False
+        return attempt
+    
     def _click_compose_button(self) -> bool:
         """
         Click Gmail compose button using multiple strategies
@@ -93,12 +131,7 @@ class StepExecutor:
             ("xpath", "//button[contains(text(), 'Compose')]")
         ]
         
-        for strategy_type, selector in strategies:
-            if strategy_type == "xpath":
-                if self.browser.find_and_click(element_xpath=selector):
-                    return True
-        
-        return False
+        return self._run_cached_strategies("Compose", strategies, self._attempt_click)
     
     def _enter_email_recipient(self, recipient: str) -> bool:
         """
@@ -111,15 +144,7 @@ class StepExecutor:
             ("xpath", "//*[@role='combobox']")
         ]
         
-        for strategy_type, selector in strategies:
-            if strategy_type == "name":
-                if self.browser.find_and_type(recipient, element_name=selector):
-                    return True
-            elif strategy_type == "xpath":
-                if self.browser.find_and_type(recipient, element_xpath=selector):
-                    return True
-        
-        return False
+        return self._run_cached_strategies("Recipient", strategies, self._attempt_type(recipient))
     
     def _enter_email_subject(self, subject: str) -> bool:
         """
@@ -131,15 +156,7 @@ class StepExecutor:
             ("xpath", "//input[contains(@aria-label, 'Subject')]")
         ]
         
-        for strategy_type, selector in strategies:
-            if strategy_type == "name":
-                if self.browser.find_and_type(subject, element_name=selector):
-                    return True
-            elif strategy_type == "xpath":
-                if self.browser.find_and_type(subject, element_xpath=selector):
-                    return True
-        
-        return False
+        return self._run_cached_strategies("Subject", strategies, self._attempt_type(subject))
     
     def _enter_email_message(self) -> bool:
         """
@@ -158,12 +175,7 @@ class StepExecutor:
             ("xpath", "//button[contains(text(), 'Send')]")
         ]
         
-        for strategy_type, selector in strategies:
-            if strategy_type == "xpath":
-                if self.browser.find_and_click(element_xpath=selector):
-                    return True
-        
-        return False
+        return self._run_cached_strategies("Send", strategies, self._attempt_click)
     
     def _generic_click(self, target: str) -> bool:
         """